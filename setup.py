@@ -56,6 +56,8 @@ def main():
             # to the functioning of Tarski, better be conservative here and install only on Linux.
             'psutil; platform_system=="Linux"',
 
+            # Tarski itself dispatches through tarski.syntax.walker.dispatch; multipledispatch is kept only so that
+            # existing third-party walker subclasses that decorate their visit methods with it keep working.
             'multipledispatch',
 
             # Antlr pinned to a specific version to avoid messages "ANTLR runtime and generated code versions disagree"
@@ -45,7 +45,7 @@ def generate_fstrips_bw_language(nblocks=4):
     return lang
 
 
-def generate_strips_blocksworld_problem(nblocks=4, use_inequalities=True):
+def generate_strips_blocksworld_problem(nblocks=4, use_inequalities=True, init="random", goal="random"):
     """ Generate the standard BW encoding, untyped and with 4 action schemas """
     lang = generate_strips_bw_language(nblocks=nblocks)
     problem = create_fstrips_problem(lang, domain_name=BASE_DOMAIN_NAME, problem_name='test-instance')
@@ -53,7 +53,14 @@ def generate_strips_blocksworld_problem(nblocks=4, use_inequalities=True):
     clear, on, ontable, handempty, holding = lang.get('clear', 'on', 'ontable', 'handempty', 'holding')
 
     # Generate init pattern
-    clearplaces, locations = generate_random_bw_pattern(lang)
+    if init == 'random':
+        clearplaces, locations = generate_random_bw_pattern(lang)
+    else:
+        if len(init) != nblocks:
+            raise ValueError(f"Blocksworld configuration ({init}) does not match given number of blocks ({nblocks})")
+        locations = init
+        clearplaces = compute_clear_from_pattern(lang, locations)
+
     for x, y in locations:
         if y == 'table':
             problem.init.add(ontable, lang.get(x))
@@ -65,7 +72,12 @@ def generate_strips_blocksworld_problem(nblocks=4, use_inequalities=True):
     problem.init.add(handempty)
 
     # Generate goal pattern
-    _, locations = generate_random_bw_pattern(lang)
+    if goal == 'random':
+        _, locations = generate_random_bw_pattern(lang)
+    else:
+        if len(goal) != nblocks:
+            raise ValueError(f"Blocksworld configuration ({goal}) does not match given number of blocks ({nblocks})")
+        locations = goal
     conjuncts = []
     for x, y in locations:
         if y == 'table':
@@ -1,4 +1,6 @@
 from . import simple
+from .compiled import compile_expression, StaticLayout
+from .batch import BatchEvaluator, evaluate_batch
 
 factory_entries = {'simple': simple.evaluate}
 
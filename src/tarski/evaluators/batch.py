@@ -0,0 +1,258 @@
+"""
+ Vectorized evaluation of ground formulas and terms over a batch of states at once.
+
+ States are represented as the rows of a NumPy matrix whose columns correspond to the state variables (i.e. ground
+ atoms and ground function terms) of a SymbolIndex, such as the one returned by
+ `LPGroundingStrategy.ground_state_variables()`. Column j of a state holds the truth value of the j-th ground atom
+ of the index, or the (numeric) value of the j-th ground function term. Each expression is compiled once into
+ a function over the whole matrix, where conjunctions and disjunctions are column reductions, and builtin
+ comparisons and arithmetic are NumPy ufuncs.
+"""
+from typing import Optional
+
+from .. import errors as err
+from .. import funcsym, modules
+from ..model import Model
+from ..syntax import Connective, Atom, CompoundFormula, Constant, CompoundTerm, Tautology, Contradiction, Formula, \
+    Predicate, builtins
+from ..util import SymbolIndex
+from .simple import evaluate
+
+
+class _Folded:
+    """ An expression that has the same value over all states, computed at compilation time. """
+    __slots__ = ('value', )
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Column:
+    """ An expression whose value over each state is given by some column of the state matrix. """
+    __slots__ = ('index', 'boolean')
+
+    def __init__(self, index, boolean):
+        self.index = index
+        self.boolean = boolean
+
+
+# The builtin functions whose `funcsym` implementation is already a NumPy (or SciPy) ufunc
+_funcsym_ufuncs = {"abs", "sin", "cos", "tan", "atan", "asin", "exp", "log", "erf", "erfc", "sgn", "sqrt",
+                   "normal", "gamma"}
+
+
+def _key(symbol, point):
+    return symbol.name, tuple(c.name for c in point)
+
+
+class BatchEvaluator:
+    """ Evaluate ground formulas and terms over a matrix of states whose columns follow the given index of state
+    variables. The denotation of the atoms and terms that are not in the index is taken from the given `static`
+    model, if any; otherwise, those atoms are taken to be false, and those terms to be undefined.
+
+    :param index: A SymbolIndex of StateVariableLite objects.
+    :param static: A Model with the denotation of all static symbols, typically the initial state of the problem.
+    """
+    def __init__(self, index: SymbolIndex, static: Optional[Model] = None):
+        self.np = modules.import_numpy()
+        self.index = index
+        self.static = static
+        self.columns = {_key(sv.symbol, sv.binding): idx for idx, sv in index.enumerate()}
+        self.boolean = all(isinstance(sv.symbol, Predicate) for sv in index)
+
+        np = self.np
+        bfs, bps = builtins.BuiltinFunctionSymbol, builtins.BuiltinPredicateSymbol
+        self.predicate_ufuncs = {
+            bps.EQ: np.equal, bps.NE: np.not_equal, bps.LT: np.less,
+            bps.LE: np.less_equal, bps.GT: np.greater, bps.GE: np.greater_equal,
+        }
+        self.function_ufuncs = {
+            bfs.ADD: np.add, bfs.SUB: np.subtract, bfs.MUL: np.multiply, bfs.DIV: np.true_divide,
+            bfs.POW: np.power, bfs.MOD: np.mod, bfs.MIN: np.minimum, bfs.MAX: np.maximum,
+        }
+
+    def states_to_matrix(self, states):
+        """ Return the matrix with one row per each of the given states, which can be standard Model objects or any
+        other object offering the same `holds` and `value` interface (e.g. packed states). """
+        np = self.np
+        matrix = np.zeros((len(states), len(self.index)), dtype=bool if self.boolean else float)
+        for i, state in enumerate(states):
+            for j, sv in self.index.enumerate():
+                if isinstance(sv.symbol, Predicate):
+                    matrix[i, j] = state.holds(sv.symbol, sv.binding)
+                else:
+                    matrix[i, j] = state.value(sv.symbol, sv.binding).symbol
+        return matrix
+
+    def vectorize(self, element):
+        """ Compile the given ground formula or term into a function `f(matrix)` that returns the 1-dimensional
+        array with the value of the element over each of the rows (states) of the given matrix. """
+        compiled = self._compile(element)
+        np = self.np
+        if isinstance(compiled, _Folded):
+            value = _numeric(compiled.value, element)
+            return lambda matrix: np.full(matrix.shape[0], value)
+        if isinstance(compiled, _Column):
+            return self._as_function(compiled)
+        return compiled
+
+    def evaluate(self, expressions, states):
+        """ Evaluate the given list of ground formulas and terms over the given states, which can be a state matrix or
+        a list of states (see `states_to_matrix`). Return a matrix with one row per state and one column per
+        expression, of boolean type if all expressions are formulas, and of float type otherwise. """
+        np = self.np
+        matrix = states if isinstance(states, np.ndarray) else self.states_to_matrix(states)
+        dtype = bool if all(isinstance(e, Formula) for e in expressions) else float
+        result = np.empty((matrix.shape[0], len(expressions)), dtype=dtype)
+        for j, expression in enumerate(expressions):
+            result[:, j] = self.vectorize(expression)(matrix)
+        return result
+
+    def _as_function(self, compiled):
+        """ Return a function `f(matrix)` computing the given compiled expression, which must not be folded. """
+        if isinstance(compiled, _Column):
+            j = compiled.index
+            if compiled.boolean:
+                return lambda matrix: matrix[:, j].astype(bool, copy=False)
+            return lambda matrix: matrix[:, j]
+        return compiled
+
+    def _compile(self, element):
+        # pylint: disable=too-many-return-statements
+        if isinstance(element, Tautology):
+            return _Folded(True)
+
+        if isinstance(element, Contradiction):
+            return _Folded(False)
+
+        if isinstance(element, Constant):
+            return _Folded(element)
+
+        if isinstance(element, Atom):
+            if builtins.is_builtin_predicate(element.predicate):
+                return self._compile_builtin_atom(element)
+            return self._compile_lookup(element, element.predicate, True)
+
+        if isinstance(element, CompoundFormula):
+            return self._compile_compound_formula(element)
+
+        if isinstance(element, CompoundTerm):
+            if builtins.is_builtin_function(element.symbol):
+                return self._compile_builtin_function(element)
+            return self._compile_lookup(element, element.symbol, False)
+
+        raise err.TarskiError(f'Cannot perform batch evaluation of expression "{element}": only ground atoms, '
+                              f'terms and connectives are supported')
+
+    def _compile_lookup(self, element, symbol, boolean):
+        subterms = [self._compile(t) for t in element.subterms]
+        if not all(isinstance(t, _Folded) and isinstance(t.value, Constant) for t in subterms):
+            raise err.TarskiError(f'Cannot perform batch evaluation of non-ground or nested expression "{element}"')
+
+        point = tuple(t.value for t in subterms)
+        j = self.columns.get(_key(symbol, point))
+        if j is not None:
+            return _Column(j, boolean)
+
+        if self.static is not None:
+            return _Folded(evaluate(element, self.static))
+        if boolean:
+            return _Folded(False)
+        raise err.UndefinedTerm(element)
+
+    def _compile_builtin_atom(self, atom):
+        ufunc = self.predicate_ufuncs[atom.predicate.symbol]
+        lhs, rhs = (self._compile(t) for t in atom.subterms)
+        if isinstance(lhs, _Folded) and isinstance(rhs, _Folded):
+            return _Folded(bool(ufunc(_symbol(lhs.value), _symbol(rhs.value))))
+        lhs, rhs = self._operand(lhs, atom), self._operand(rhs, atom)
+        return lambda matrix: ufunc(lhs(matrix), rhs(matrix))
+
+    def _compile_builtin_function(self, term):
+        symbol = term.symbol.symbol
+        subterms = [self._compile(t) for t in term.subterms]
+        random = symbol in (builtins.BuiltinFunctionSymbol.NORMAL, builtins.BuiltinFunctionSymbol.GAMMA)
+
+        if symbol in self.function_ufuncs:
+            ufunc = self.function_ufuncs[symbol]
+        elif symbol.value in _funcsym_ufuncs:
+            ufunc = funcsym.impl(symbol.value)
+        else:
+            raise err.TarskiError(f'Builtin function "{symbol}" not supported by the batch evaluator')
+
+        if all(isinstance(t, _Folded) for t in subterms) and not random:
+            return _Folded(ufunc(*(_numeric(t.value, term) for t in subterms)).item())
+
+        np = self.np
+        operands = [self._operand(t, term) for t in subterms]
+        if random:
+            # Random functions need to be sampled once per state, hence their parameters need to be full arrays
+            return lambda matrix: ufunc(*(np.broadcast_to(o(matrix), matrix.shape[0]) for o in operands))
+        if len(operands) == 1:
+            operand, = operands
+            return lambda matrix: ufunc(operand(matrix))
+        lhs, rhs = operands
+        return lambda matrix: ufunc(lhs(matrix), rhs(matrix))
+
+    def _operand(self, compiled, element):
+        """ Return a function `f(matrix)` for the given compiled subexpression of a builtin function or predicate.
+        Folded subexpressions return a scalar, that NumPy broadcasts as necessary. """
+        if isinstance(compiled, _Folded):
+            value = _numeric(compiled.value, element)
+            return lambda matrix: value
+        return self._as_function(compiled)
+
+    def _compile_compound_formula(self, formula):
+        np = self.np
+        subformulas = [self._compile(f) for f in formula.subformulas]
+        if formula.connective == Connective.Not:
+            sub, = subformulas
+            if isinstance(sub, _Folded):
+                return _Folded(not sub.value)
+            sub = self._as_function(sub)
+            return lambda matrix: np.logical_not(sub(matrix))
+
+        # True subformulas can be dropped from conjunctions, and a false subformula makes the whole conjunction false.
+        # The other way around for disjunctions.
+        isand = formula.connective == Connective.And
+        columns, others = [], []
+        for sub in subformulas:
+            if isinstance(sub, _Folded):
+                if bool(sub.value) != isand:
+                    return _Folded(not isand)
+            elif isinstance(sub, _Column):
+                columns.append(sub.index)
+            else:
+                others.append(sub)
+
+        if not columns and not others:
+            return _Folded(isand)
+
+        # All subformulas that are plain state variables are reduced at once over the corresponding columns
+        reduction = np.all if isand else np.any
+        combine = np.logical_and if isand else np.logical_or
+        columns = np.array(columns, dtype=int)
+
+        def evaluate_connective(matrix):
+            result = reduction(matrix[:, columns], axis=1) if len(columns) else None
+            for sub in others:
+                value = sub(matrix)
+                result = value if result is None else combine(result, value)
+            return result
+        return evaluate_connective
+
+
+def _symbol(value):
+    return value.symbol if isinstance(value, Constant) else value
+
+
+def _numeric(value, element):
+    value = _symbol(value)
+    if not isinstance(value, (bool, int, float)):
+        raise err.TarskiError(f'Cannot perform batch evaluation of "{element}": non-numeric value "{value}"')
+    return value
+
+
+def evaluate_batch(expressions, states, index: SymbolIndex, static: Optional[Model] = None):
+    """ Evaluate the given ground formulas and terms over the given states. See `BatchEvaluator.evaluate`. """
+    return BatchEvaluator(index, static).evaluate(expressions, states)
@@ -0,0 +1,216 @@
+"""
+ Compilation of formulas and terms into Python closures that evaluate them over a given model, as an alternative to
+ `evaluators.simple.evaluate` for expressions that need to be evaluated many times (e.g. goal and precondition checks).
+
+ The expression is walked only once, at compilation time, and each node is turned into a closure specialized on the
+ type of the node. Closures for atoms and compound terms with constant arguments directly look up the extension of
+ the corresponding symbol. If a layout is given, subexpressions that involve only static symbols are evaluated at
+ compilation time (i.e. constant-folded) over the static model of the layout.
+"""
+from .. import errors as err
+from ..model import Model, wrap_tuple
+from ..syntax import Connective, Atom, CompoundFormula, Constant, CompoundTerm, Tautology, Contradiction, builtins
+from .simple import evaluate, builtin_predicate_operators, get_builtin_function_operation, apply_unary_operation, \
+    apply_binary_operation
+
+
+class StaticLayout:
+    """ A minimal layout for the compilation of expressions, made up of a model with the denotation of static symbols,
+    and the set of static symbols. `tarski.search.StateLayout` objects can be used as well. """
+    def __init__(self, static: Model, static_symbols):
+        self.static = static
+        self.static_symbols = static_symbols
+
+    def is_fluent(self, symbol):
+        return symbol not in self.static_symbols
+
+
+class _Folded:
+    """ The compilation result of a subexpression that has been evaluated at compilation time. """
+    __slots__ = ('value', )
+
+    def __init__(self, value):
+        self.value = value
+
+
+def compile_expression(element, layout=None):
+    """ Compile the given formula or term into a function `f(model, sigma=None)` that returns the same value as
+    `evaluate(element, model, sigma)`. The returned function works both with standard Model objects and with any
+    other object offering the same `holds` and `value` interface (e.g. packed states).
+
+    :param element: The formula or term to compile.
+    :param layout: An optional object with a `static` Model and an `is_fluent(symbol)` method. If given,
+                   subexpressions involving only static symbols are evaluated once, at compilation time, over the
+                   static model, which is assumed to agree with all models on which the function will be used.
+    """
+    compiled = _compile(element, layout)
+    if isinstance(compiled, _Folded):
+        value = compiled.value
+        return lambda model, sigma=None: value
+    return compiled
+
+
+def _compile(element, layout):
+    # pylint: disable=too-many-return-statements
+    if isinstance(element, Tautology):
+        return _Folded(True)
+
+    if isinstance(element, Contradiction):
+        return _Folded(False)
+
+    if isinstance(element, Constant):
+        return _Folded(element)
+
+    if isinstance(element, Atom):
+        if builtins.is_builtin_predicate(element.predicate):
+            return _compile_builtin_atom(element, layout)
+        return _compile_lookup(element, element.predicate, layout, _holds, _extension_holds)
+
+    if isinstance(element, CompoundFormula):
+        return _compile_compound_formula(element, layout)
+
+    if isinstance(element, CompoundTerm):
+        if builtins.is_builtin_function(element.symbol):
+            return _compile_builtin_function(element, layout)
+        return _compile_lookup(element, element.symbol, layout, _value, _extension_value)
+
+    # For any other element, e.g. quantified formulas or variables, fall back to the standard evaluation
+    return lambda model, sigma=None: evaluate(element, model, sigma)
+
+
+def _is_static(symbol, layout):
+    return layout is not None and layout.static is not None and not layout.is_fluent(symbol)
+
+
+def _fold(element, layout):
+    """ Try to evaluate the given element over the static model of the layout. """
+    try:
+        return _Folded(evaluate(element, layout.static))
+    except (err.UndefinedTerm, KeyError):
+        return None  # e.g. a partial static function, better to fail at evaluation time, as `evaluate` would do
+
+
+def _compile_lookup(element, symbol, layout, generic, direct):
+    """ Compile an atom or compound term that is evaluated by looking up the extension of its symbol. """
+    subterms = [_compile(t, layout) for t in element.subterms]
+    if all(isinstance(t, _Folded) for t in subterms):
+        if _is_static(symbol, layout):
+            folded = _fold(element, layout)
+            if folded is not None:
+                return folded
+        return direct(element, symbol, tuple(t.value for t in subterms))
+
+    subterms = [(lambda m, s=None, v=t.value: v) if isinstance(t, _Folded) else t for t in subterms]
+
+    def evaluate_lookup(model, sigma=None):
+        return generic(element, symbol, model, tuple(t(model, sigma) for t in subterms))
+    return evaluate_lookup
+
+
+def _holds(element, predicate, model, point):  # pylint: disable=unused-argument
+    return model.holds(predicate, point)
+
+
+def _value(element, function, model, point):
+    try:
+        return model.value(function, point)
+    except KeyError:
+        raise err.UndefinedTerm(element) from None
+
+
+def _extension_holds(element, predicate, point):  # pylint: disable=unused-argument
+    """ Compile a ground atom into a direct membership test on the predicate extension of standard models. """
+    signature, key = predicate.signature, wrap_tuple(point)
+
+    def holds(model, sigma=None):  # pylint: disable=unused-argument
+        if not isinstance(model, Model):
+            return model.holds(predicate, point)
+        extension = model.predicate_extensions.get(signature)
+        return extension is not None and key in extension
+    return holds
+
+
+def _extension_value(element, function, point):
+    """ Compile a ground compound term into a direct lookup on the function extension of standard models. """
+    signature, key = function.signature, wrap_tuple(point)
+
+    def value(model, sigma=None):  # pylint: disable=unused-argument
+        try:
+            if not isinstance(model, Model):
+                return model.value(function, point)
+            return model.function_extensions[signature].data[key]
+        except KeyError:
+            raise err.UndefinedTerm(element) from None
+    return value
+
+
+def _compile_builtin_atom(atom, layout):
+    op = builtin_predicate_operators[atom.predicate.symbol]
+    lhs, rhs = (_compile(t, layout) for t in atom.subterms)
+    if isinstance(lhs, _Folded) and isinstance(rhs, _Folded):
+        return _Folded(op(lhs.value.symbol, rhs.value.symbol))
+
+    if isinstance(lhs, _Folded):
+        lsymbol = lhs.value.symbol
+        return lambda model, sigma=None: op(lsymbol, rhs(model, sigma).symbol)
+    if isinstance(rhs, _Folded):
+        rsymbol = rhs.value.symbol
+        return lambda model, sigma=None: op(lhs(model, sigma).symbol, rsymbol)
+    return lambda model, sigma=None: op(lhs(model, sigma).symbol, rhs(model, sigma).symbol)
+
+
+def _compile_compound_formula(formula, layout):
+    subformulas = [_compile(f, layout) for f in formula.subformulas]
+    if formula.connective == Connective.Not:
+        sub, = subformulas
+        if isinstance(sub, _Folded):
+            return _Folded(not sub.value)
+        return lambda model, sigma=None: not sub(model, sigma)
+
+    # For conjunctions, true subformulas can be dropped, and a false subformula makes the whole formula false.
+    # The other way around for disjunctions.
+    isand = formula.connective == Connective.And
+    pending = []
+    for sub in subformulas:
+        if not isinstance(sub, _Folded):
+            pending.append(sub)
+        elif bool(sub.value) != isand:
+            return _Folded(not isand)
+
+    if not pending:
+        return _Folded(isand)
+    if len(pending) == 1:
+        sub = pending[0]
+        return lambda model, sigma=None: bool(sub(model, sigma))
+    if len(pending) == 2:
+        first, second = pending[0], pending[1]
+        if isand:
+            return lambda model, sigma=None: bool(first(model, sigma) and second(model, sigma))
+        return lambda model, sigma=None: bool(first(model, sigma) or second(model, sigma))
+
+    pending = tuple(pending)
+    if isand:
+        return lambda model, sigma=None: all(sub(model, sigma) for sub in pending)
+    return lambda model, sigma=None: any(sub(model, sigma) for sub in pending)
+
+
+def _is_random(symbol):
+    return symbol.symbol in (builtins.BuiltinFunctionSymbol.NORMAL, builtins.BuiltinFunctionSymbol.GAMMA)
+
+
+def _compile_builtin_function(term, layout):
+    arity, operation = get_builtin_function_operation(term.symbol.symbol)
+    subterms = [_compile(t, layout) for t in term.subterms]
+    if all(isinstance(t, _Folded) for t in subterms) and layout is not None and not _is_random(term.symbol):
+        folded = _fold(term, layout)
+        if folded is not None:
+            return folded
+
+    subterms = [(lambda m, s=None, v=t.value: v) if isinstance(t, _Folded) else t for t in subterms]
+    if arity == 1:
+        sub, = subterms
+        return lambda model, sigma=None: apply_unary_operation(operation, sub(model, sigma))
+
+    lhs, rhs = subterms
+    return lambda model, sigma=None: apply_binary_operation(
+        operation, lhs(model, sigma), rhs(model, sigma), model, sigma)
@@ -1,10 +1,11 @@
 import operator
-from typing import List
+from functools import lru_cache
+from typing import Any, Dict, List, Set, Tuple
 
 from .. import funcsym
 from .. import errors as err
-from ..syntax import ops, Connective, Atom, Formula, CompoundFormula, QuantifiedFormula, builtins, Variable, \
-    Constant, CompoundTerm, Tautology, Contradiction, IfThenElse, AggregateCompoundTerm, Term
+from ..syntax import ops, Connective, Atom, CompoundFormula, QuantifiedFormula, Quantifier, builtins, Variable, \
+    Constant, CompoundTerm, Tautology, Contradiction, IfThenElse, AggregateCompoundTerm, Term, symref
 from ..syntax.algebra import Matrix
 from ..model import Model
 
@@ -33,7 +34,7 @@ def evaluate(element, m: Model, sigma=None):
 
     # Terms
     if isinstance(element, Variable):
-        return sigma[element]  # TODO Finish this, ATM it will raise a runtime error
+        return sigma[symref(element)]  # The substitution sigma maps (references to) variables to constants
 
     if isinstance(element, (Constant, CompoundTerm, IfThenElse, Matrix, AggregateCompoundTerm)):
         return evaluate_term(element, m, sigma)
@@ -57,9 +58,161 @@ def evaluate_atom(atom: Atom, m: Model, sigma):
     return m.holds(atom.predicate, point)
 
 
-def evaluate_quantified(formula: Formula, m: Model, sigma):
-    # pylint: disable=unused-argument
-    raise NotImplementedError()
+def evaluate_quantified(formula: QuantifiedFormula, m: Model, sigma):
+    """ Evaluate the given quantified formula on the given model, under the given substitution for its free variables.
+    An existential formula is evaluated as a conjunctive query: the atoms of its body (if a conjunction) over
+    non-builtin predicates are joined through hash indexes over the predicate extensions of the model, in order of
+    increasing estimated selectivity, and the rest of conjuncts are checked as soon as their variables are bound.
+    A universal formula "forall x: phi" is evaluated as "not exists x: not phi", so that e.g. the negated atoms of an
+    implication "p(x) -> q(x)" become the atoms of the query. The search stops as soon as a witness (for existential
+    formulas) or counterexample (for universal formulas) is found. """
+    if formula.quantifier == Quantifier.Exists:
+        return _exists_binding(formula.variables, formula.formula, m, sigma)
+    return not _exists_binding(formula.variables, _negate(formula.formula), m, sigma)
+
+
+def _negate(phi):
+    """ Return the negation of the given formula, pushing the negation over disjunctions and double negations. """
+    if isinstance(phi, CompoundFormula):
+        if phi.connective == Connective.Not:
+            return phi.subformulas[0]
+        if phi.connective == Connective.Or:
+            return CompoundFormula(Connective.And, [_negate(sub) for sub in phi.subformulas])
+    return CompoundFormula(Connective.Not, [phi])
+
+
+def _conjuncts(phi):
+    if isinstance(phi, CompoundFormula) and phi.connective == Connective.And:
+        return [c for sub in phi.subformulas for c in _conjuncts(sub)]
+    return [phi]
+
+
+def _is_joinable(phi, quantified, sigma):
+    """ Return whether the given conjunct can be evaluated by a lookup on a predicate extension, i.e. it is an atom
+    over a non-builtin predicate whose arguments are constants and (quantified or bound) variables, some of them being
+    quantified. """
+    return isinstance(phi, Atom) and not builtins.is_builtin_predicate(phi.predicate) and \
+        all(isinstance(t, Constant) or (isinstance(t, Variable) and (symref(t) in quantified or symref(t) in sigma))
+            for t in phi.subterms) and \
+        any(isinstance(t, Variable) and symref(t) in quantified for t in phi.subterms)
+
+
+def _exists_binding(variables, phi, m: Model, sigma):
+    """ Return whether there is some binding of the given variables to objects of their sort that makes the given
+    formula true on the given model, extending the given substitution. """
+    # pylint: disable=too-many-locals
+    quantified = [symref(v) for v in variables]
+    qset = set(quantified)
+    sigma = {ref: value for ref, value in sigma.items() if ref not in qset}  # Quantified variables shadow free ones
+    conjuncts = _conjuncts(phi)
+    has_extensions = isinstance(getattr(m, 'predicate_extensions', None), dict)
+    atoms: List[Atom] = []
+    filters: List[Any] = []
+    for c in conjuncts:
+        (atoms if has_extensions and _is_joinable(c, qset, sigma) else filters).append(c)
+
+    # Greedily order the atoms to be joined: at each step, pick the atom with most bound arguments, breaking ties
+    # in favor of smaller extensions.
+    bound: Set[Any] = set()
+    plan: List[Tuple[str, Any]] = []
+    pending = list(atoms)
+    while pending:
+        def score(atom):
+            nbound = sum(1 for t in atom.subterms if not isinstance(t, Variable) or symref(t) not in qset
+                         or symref(t) in bound)
+            return -nbound, len(m.predicate_extensions.get(atom.predicate.signature, ()))
+        atom = min(pending, key=score)
+        pending.remove(atom)
+        plan.append(('join', atom))
+        bound.update(symref(t) for t in atom.subterms if isinstance(t, Variable) and symref(t) in qset)
+    # Variables not appearing in any joinable atom need to be enumerated over their domain
+    plan += [('enumerate', ref) for ref in quantified if ref not in bound]
+
+    # Schedule each remaining conjunct right after the step that binds its last quantified variable
+    steps: List[List[Any]] = [[] for _ in range(len(plan) + 1)]
+    for f in filters:
+        free = {symref(v) for v in ops.free_variables(f)} & qset
+        last = 0
+        for i, (kind, x) in enumerate(plan, start=1):
+            binds = {x} if kind == 'enumerate' else \
+                {symref(t) for t in x.subterms if isinstance(t, Variable) and symref(t) in qset}
+            if binds & free:
+                last = i
+        steps[last].append(f)
+
+    sorts = {symref(v): v.sort for v in variables}
+    indexes: Dict[Tuple[Any, ...], Dict[Tuple[Any, ...], List[Any]]] = {}
+
+    def search(k):
+        if not all(evaluate(f, m, sigma) for f in steps[k]):
+            return False
+        if k == len(plan):
+            return True
+
+        kind, x = plan[k]
+        if kind == 'enumerate':
+            for c in sorts[x].domain():
+                sigma[x] = c
+                if search(k + 1):
+                    return True
+            sigma.pop(x, None)
+            return False
+
+        # Retrieve the tuples of the atom extension compatible with the current binding through a hash index
+        positions, key, free = [], [], []
+        for i, t in enumerate(x.subterms):
+            ref = symref(t)
+            if isinstance(t, Constant):
+                positions.append(i)
+                key.append(ref)
+            elif ref in sigma:
+                positions.append(i)
+                key.append(symref(sigma[ref]))
+            else:
+                free.append((i, ref))
+        if isinstance(m, Model):
+            candidates = m.match(x.predicate, tuple(positions), tuple(key))
+        else:
+            candidates = _index_lookup(m, indexes, x.predicate, tuple(positions), tuple(key))
+
+        for point in candidates:
+            binding = {}
+            for i, ref in free:
+                value = point[i]
+                previous = binding.get(ref)
+                if previous is None:
+                    if not sorts[ref].contains(value.expr):
+                        break
+                    binding[ref] = value
+                elif previous != value:
+                    break  # A variable appearing more than once in the atom
+            else:
+                sigma.update((ref, value.expr) for ref, value in binding.items())
+                if search(k + 1):
+                    return True
+                for ref in binding:
+                    del sigma[ref]
+        return False
+
+    return search(0)
+
+
+def _index_lookup(m, indexes, predicate, positions, key):
+    """ Return the points in the extension of the given predicate whose (wrapped) values at the given positions
+    are those given by the key, building a hash index on those positions the first time it is needed. This is used
+    on model-like objects with predicate extensions other than Models, which maintain their own indexes. """
+    extension = m.predicate_extensions.get(predicate.signature, ())
+    if not positions:
+        return extension
+    if len(positions) == predicate.arity:
+        return (key, ) if key in extension else ()
+
+    index = indexes.get((predicate.signature, positions))
+    if index is None:
+        index = indexes[(predicate.signature, positions)] = {}
+        for point in extension:
+            index.setdefault(tuple(point[i] for i in positions), []).append(point)
+    return index.get(key, ())
 
 
 def evaluate_term(term, m: Model, sigma):
@@ -106,18 +259,22 @@ def evaluate_term(term, m: Model, sigma):
         raise err.UndefinedTerm(term) from None
 
 
-def evaluate_builtin_predicate(atom, model, sigma):
-    bip = builtins.BuiltinPredicateSymbol
-    _evaluators = {
-        bip.EQ: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol == evaluate(f.subterms[1], m, s).symbol,
-        bip.NE: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol != evaluate(f.subterms[1], m, s).symbol,
-        bip.LT: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol < evaluate(f.subterms[1], m, s).symbol,
-        bip.LE: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol <= evaluate(f.subterms[1], m, s).symbol,
-        bip.GT: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol > evaluate(f.subterms[1], m, s).symbol,
-        bip.GE: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol >= evaluate(f.subterms[1], m, s).symbol,
-    }
+# The Python operators corresponding to each builtin predicate, to be applied on the symbols of the denotations
+# of the atom subterms
+builtin_predicate_operators = {
+    builtins.BuiltinPredicateSymbol.EQ: operator.eq,
+    builtins.BuiltinPredicateSymbol.NE: operator.ne,
+    builtins.BuiltinPredicateSymbol.LT: operator.lt,
+    builtins.BuiltinPredicateSymbol.LE: operator.le,
+    builtins.BuiltinPredicateSymbol.GT: operator.gt,
+    builtins.BuiltinPredicateSymbol.GE: operator.ge,
+}
+
 
-    return _evaluators[atom.predicate.symbol](atom, model, sigma)
+def evaluate_builtin_predicate(atom, model, sigma):
+    lhs, rhs = atom.subterms
+    return builtin_predicate_operators[atom.predicate.symbol](
+        evaluate(lhs, model, sigma).symbol, evaluate(rhs, model, sigma).symbol)
 
 
 def symbolic_matrix_multiplication(lhs: Matrix, rhs: Matrix):
@@ -132,37 +289,38 @@ def symbolic_matrix_multiplication(lhs: Matrix, rhs: Matrix):
              for col_b in zip_b] for row_a in lhs.matrix]
 
 
-def evaluate_builtin_function(term, model, sigma):
+_unary_builtin_functions = {"abs", "sin", "cos", "tan", "atan", "asin", "exp", "log", "erf", "erfc", "sgn", "sqrt"}
+_binary_builtin_functions = {"min", "max", "normal", "gamma"}
+
+
+@lru_cache(maxsize=None)
+def get_builtin_function_operation(symbol: builtins.BuiltinFunctionSymbol):
+    """ Return a pair (arity, operation) with the arity of the given builtin function symbol and the Python function
+    that implements it. Raise KeyError if the symbol has no implementation. """
     bif = builtins.BuiltinFunctionSymbol
-    ae1 = _arithmetic_evaluator_1
-    ae2 = _arithmetic_evaluator_2
-    _evaluators = {
-        bif.ADD: lambda f, m, s: ae2(operator.add, f.subterms[0], f.subterms[1], m, s),
-        bif.SUB: lambda f, m, s: ae2(operator.sub, f.subterms[0], f.subterms[1], m, s),
-        bif.MUL: lambda f, m, s: ae2(operator.mul, f.subterms[0], f.subterms[1], m, s),
-        bif.MATMUL: lambda f, m, s: ae2(symbolic_matrix_multiplication, f.subterms[0], f.subterms[1], m, s),
-        bif.DIV: lambda f, m, s: ae2(operator.truediv, f.subterms[0], f.subterms[1], m, s),
-        bif.POW: lambda f, m, s: ae2(operator.pow, f.subterms[0], f.subterms[1], m, s),
-        bif.MOD: lambda f, m, s: ae2(operator.mod, f.subterms[0], f.subterms[1], model, s),
-        bif.MIN: lambda f, m, s: ae2(funcsym.impl(bif.MIN.value), f.subterms[0], f.subterms[1], m, s),
-        bif.MAX: lambda f, m, s: ae2(funcsym.impl(bif.MAX.value), f.subterms[0], f.subterms[1], m, s),
-        bif.ABS: lambda f, m, s: ae1(funcsym.impl(bif.ABS.value), f.subterms[0], m, s),
-        bif.SIN: lambda f, m, s: ae1(funcsym.impl(bif.SIN.value), f.subterms[0], m, s),
-        bif.COS: lambda f, m, s: ae1(funcsym.impl(bif.COS.value), f.subterms[0], m, s),
-        bif.TAN: lambda f, m, s: ae1(funcsym.impl(bif.TAN.value), f.subterms[0], m, s),
-        bif.ATAN: lambda f, m, s: ae1(funcsym.impl(bif.ATAN.value), f.subterms[0], m, s),
-        bif.ASIN: lambda f, m, s: ae1(funcsym.impl(bif.ASIN.value), f.subterms[0], m, s),
-        bif.EXP: lambda f, m, s: ae1(funcsym.impl(bif.EXP.value), f.subterms[0], m, s),
-        bif.LOG: lambda f, m, s: ae1(funcsym.impl(bif.LOG.value), f.subterms[0], m, s),
-        bif.ERF: lambda f, m, s: ae1(funcsym.impl(bif.ERF.value), f.subterms[0], m, s),
-        bif.ERFC: lambda f, m, s: ae1(funcsym.impl(bif.ERFC.value), f.subterms[0], m, s),
-        bif.SGN: lambda f, m, s: ae1(funcsym.impl(bif.SGN.value), f.subterms[0], m, s),
-        bif.SQRT: lambda f, m, s: ae1(funcsym.impl(bif.SQRT.value), f.subterms[0], m, s),
-        bif.NORMAL: lambda f, m, s: ae2(funcsym.impl(bif.NORMAL.value), f.subterms[0], f.subterms[1], m, s),
-        bif.GAMMA: lambda f, m, s: ae2(funcsym.impl(bif.GAMMA.value), f.subterms[0], f.subterms[1], m, s),
+    binary = {
+        bif.ADD: operator.add,
+        bif.SUB: operator.sub,
+        bif.MUL: operator.mul,
+        bif.MATMUL: symbolic_matrix_multiplication,
+        bif.DIV: operator.truediv,
+        bif.POW: operator.pow,
+        bif.MOD: operator.mod,
     }
+    if symbol in binary:
+        return 2, binary[symbol]
+    if symbol.value in _binary_builtin_functions:
+        return 2, funcsym.impl(symbol.value)
+    if symbol.value in _unary_builtin_functions:
+        return 1, funcsym.impl(symbol.value)
+    raise KeyError(symbol)
+
 
-    return _evaluators[term.symbol.symbol](term, model, sigma)
+def evaluate_builtin_function(term, model, sigma):
+    arity, operation = get_builtin_function_operation(term.symbol.symbol)
+    if arity == 1:
+        return _arithmetic_evaluator_1(operation, term.subterms[0], model, sigma)
+    return _arithmetic_evaluator_2(operation, term.subterms[0], term.subterms[1], model, sigma)
 
 
 def _arithmetic_evaluator_1(operation, expr, model, sigma):
@@ -170,7 +328,11 @@ def _arithmetic_evaluator_1(operation, expr, model, sigma):
     # _rhs = args[1].symbol
     # assert self.domain[0].contains(_lhs)
     # assert self.domain[1].contains(_rhs)
-    expr = evaluate_term(expr, model, sigma)
+    return apply_unary_operation(operation, evaluate_term(expr, model, sigma))
+
+
+def apply_unary_operation(operation, expr):
+    """ Apply the given arithmetic operation to the given (already evaluated) constant. """
     value = operation(ops.cast_to_number(expr))
     sort = ops.infer_numeric_sort(value, expr.language)
     return Constant(value, sort)
@@ -181,8 +343,12 @@ def _arithmetic_evaluator_2(operation, lhs, rhs, model, sigma):
     # _rhs = args[1].symbol
     # assert self.domain[0].contains(_lhs)
     # assert self.domain[1].contains(_rhs)
-    lhs = evaluate_term(lhs, model, sigma)
-    rhs = evaluate_term(rhs, model, sigma)
+    return apply_binary_operation(operation, evaluate_term(lhs, model, sigma), evaluate_term(rhs, model, sigma),
+                                  model, sigma)
+
+
+def apply_binary_operation(operation, lhs, rhs, model, sigma):
+    """ Apply the given arithmetic operation to the given (already evaluated) operands. """
     if isinstance(lhs, Matrix) and isinstance(rhs, Matrix):
         # print("Matrix op Matrix")
         value = operation(lhs, rhs)
@@ -50,10 +50,11 @@ class GroundOperator:
 class PlainOperator(GroundOperator):
     """ A ground STRIPS operator possibly extended with negated preconditions
     and conditional effects. """
-    def __init__(self, language, name, precondition, effects):
+    def __init__(self, language, name, precondition, effects, cost=None):
         super().__init__(language, name)
         self.precondition = flatten(precondition)
         self.effects = effects
+        self.cost = cost
         # self.validate(self)
 
 
@@ -9,6 +9,8 @@ from .errors import InvalidEffectError
 
 class BaseEffect:
     """ A base class for all FSTRIPS effects, which might have an (optional) condition. """
+    __slots__ = ('condition', )
+
     def __init__(self, condition):
         self.condition = condition
 
@@ -17,6 +19,8 @@ class BaseEffect:
 
 
 class SingleEffect(BaseEffect):
+    __slots__ = ()
+
     def __str__(self):
         return "({} -> {})".format(self.condition, self.tostring())
 
@@ -28,6 +32,8 @@ class SingleEffect(BaseEffect):
 
 class AddEffect(SingleEffect):
     """ A standard add-effect, possibly with a condition. """
+    __slots__ = ('atom', )
+
     def __init__(self, atom, condition=top):
         super().__init__(condition)
         self.atom = atom
@@ -38,6 +44,8 @@ class AddEffect(SingleEffect):
 
 class DelEffect(SingleEffect):
     """ A standard delete-effect, possibly with a condition. """
+    __slots__ = ('atom', )
+
     def __init__(self, atom, condition=top):
         super().__init__(condition)
         self.atom = atom
@@ -47,6 +55,8 @@ class DelEffect(SingleEffect):
 
 
 class LiteralEffect(SingleEffect):
+    __slots__ = ('lit', )
+
     def __init__(self, lit, condition=top):
         super().__init__(condition)
         self.lit = lit
@@ -57,6 +67,8 @@ class LiteralEffect(SingleEffect):
 
 class FunctionalEffect(SingleEffect):
     """ A functional effect of the form f(t) := g(u), possibly with a condition. """
+    __slots__ = ('lhs', 'rhs')
+
     def __init__(self, lhs, rhs, condition=top):
         super().__init__(condition)
         self.lhs, self.rhs = self.check_well_formed(lhs, rhs)
@@ -82,6 +94,7 @@ class FunctionalEffect(SingleEffect):
 class UniversalEffect(BaseEffect):
     """ A forall-effect that represents a number of effects that results from all possible
     substitutions to the forall-effect variables. """
+    __slots__ = ('variables', 'effects')
 
     def __init__(self, variables, effects, condition=top):
         super().__init__(condition)
@@ -96,7 +109,7 @@ class UniversalEffect(BaseEffect):
 
 
 class IncreaseEffect(FunctionalEffect):
-    pass
+    __slots__ = ()
 
 
 class OptimizationType(Enum):
@@ -113,6 +126,7 @@ class OptimizationType(Enum):
 
 
 class ProceduralEffect(SingleEffect):
+    __slots__ = ('input', 'output')
 
     def __init__(self, input_: List[CompoundTerm], output: List[CompoundTerm]):
         super().__init__(top)
@@ -125,6 +139,7 @@ class ProceduralEffect(SingleEffect):
 
 
 class ChoiceEffect(SingleEffect):
+    __slots__ = ('obj', 'obj_type', 'variables')
 
     def __init__(self, obj_type: OptimizationType, obj, variables: List[CompoundTerm], constraints=top):
         super().__init__(constraints)
@@ -148,6 +163,7 @@ class ChoiceEffect(SingleEffect):
 
 class VectorisedEffect(SingleEffect):
     """ Action effects that modify the denotation of a vector (tuple) of terms """
+    __slots__ = ('lhs', 'rhs')
 
     def __init__(self, lhs, rhs, condition=top):
         super().__init__(condition)
@@ -185,6 +201,7 @@ class LinearEffect(SingleEffect):
 
             Ax + b
     """
+    __slots__ = ('y', 'A', 'x', 'b')
 
     def __init__(self, y, a, x, b, condition=top):
         super().__init__(condition)
@@ -238,6 +255,7 @@ class BlackBoxEffect(SingleEffect):
     """
         Black box functional effect
     """
+    __slots__ = ('lhs', 'function')
 
     def __init__(self, lhs, f, condition=top):
         super().__init__(condition)
@@ -285,10 +303,14 @@ def language(name="Unnamed FOL Language", theories: Optional[List[Union[str, ths
     theories = ['equality'] if theories is None else theories
     lang = ths.language(name, theories)
     lang.register_operator_handler("<<", Term, Term, FunctionalEffect)
-    lang.register_operator_handler(">>", Term, Term, lambda lhs, rhs: FunctionalEffect(rhs, lhs))  # Inverted
+    lang.register_operator_handler(">>", Term, Term, _inverted_functional_effect)
     return lang
 
 
+def _inverted_functional_effect(lhs, rhs):
+    return FunctionalEffect(rhs, lhs)
+
+
 def visit_effect(effect, callback: Callable[[Any], None]):
     """ Visit all nodes in the AST of the given effect, down to formulas and terms. """
     callback(effect)
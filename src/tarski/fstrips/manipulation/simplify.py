@@ -1,7 +1,5 @@
 import copy
 
-from multipledispatch import dispatch  # type: ignore
-
 from ..fstrips import AddEffect, DelEffect, UniversalEffect, FunctionalEffect
 from ..ops import collect_all_symbols, compute_number_potential_groundings
 from ...evaluators.simple import evaluate
@@ -11,7 +9,7 @@ from ...syntax.formulas import CompoundFormula, QuantifiedFormula, Atom, Tautolo
     Quantifier, unwrap_conjunction_or_atom, is_eq_atom, land, exists
 from ...syntax.transform.substitutions import substitute_expression
 from ...syntax.util import get_symbols
-from ...syntax.walker import FOLWalker
+from ...syntax.walker import FOLWalker, dispatch
 from ...syntax.ops import flatten
 from ...syntax import symref
 
@@ -256,5 +254,5 @@ def _attempt_single_ex_var_substitution(exvars, conjuncts):
 
     exvars.remove(substitution[0])
     substitution = dict([substitution])
-    conjuncts = [substitute_expression(c, substitution, inplace=True) for i, c in enumerate(conjuncts) if i != replaced]
+    conjuncts = [substitute_expression(c, substitution) for i, c in enumerate(conjuncts) if i != replaced]
     return True, conjuncts
@@ -2,12 +2,8 @@ import operator
 from functools import reduce
 from typing import Set, Union
 
-# At the moment we're using the "multipledispatch" package to implement single-argument dispatching.
-# Whenever we move to support Python 3.8+, we could directly use
-#     https://docs.python.org/3/library/functools.html#functools.singledispatchmethod
-from multipledispatch import dispatch  # type: ignore
-
 from .walker import ProblemWalker
+from ..syntax.walker import dispatch
 from ..syntax import Predicate, Function, CompoundTerm, Atom
 from .problem import Problem
 from . import fstrips as fs
@@ -8,6 +8,7 @@ import copy
 from enum import Enum
 
 from ..errors import TarskiError
+from ..syntax.walker import NodeKind, node_kind, visit_expression_iteratively
 
 
 class WalkerError(TarskiError):
@@ -41,20 +42,21 @@ class WalkerContext(Enum):
 
 
 class ProblemWalker:
-    """ This is an experimental implementation of a visitor pattern based on single-dispatch.
-    At the moment we're using the "multipledispatch" package to implement single-argument dispatching.
-    It's far from perfect; it requires that the subclass declares the following "default" method:
+    """ An implementation of the visitor pattern based on single dispatch, see `tarski.syntax.walker.FOLWalker`.
+    To handle different types of nodes differently, `visit` can be declared once per type with the
+    `tarski.syntax.walker.dispatch` decorator, in which case subclasses need to declare the following "default" method:
 
     >>> @dispatch(object)
     >>> def visit(self, node):  # pylint: disable-msg=E0102
     >>>    return self.default_handler(node)
 
-    Whenever we move to support Python 3.8+, we could directly use:
-        https://docs.python.org/3/library/functools.html#functools.singledispatchmethod
+    If `recursive` is false, formulas and terms are traversed with an explicit stack, rather than through recursive
+    calls.
     """
-    def __init__(self, raise_on_undefined=False):
+    def __init__(self, raise_on_undefined=False, recursive=True):
         self.default_handler = self._raise if raise_on_undefined else self._donothing
         self.context = None
+        self.recursive = recursive
 
     def visit(self, node):
         raise NotImplementedError()
@@ -122,28 +124,24 @@ class ProblemWalker:
         return self.visit(effect)
 
     def visit_expression(self, node, inplace=True):
-        from ..syntax import CompoundFormula, QuantifiedFormula, Atom, Tautology, Contradiction, Constant, Variable,\
-            CompoundTerm, IfThenElse  # pylint: disable=import-outside-toplevel  # Avoiding circular references
         node = node if inplace else copy.deepcopy(node)
+        if not self.recursive:
+            return visit_expression_iteratively(node, self.visit, self.accept)
 
-        if isinstance(node, (Variable, Constant, Contradiction, Tautology)):
-            pass
-
-        elif isinstance(node, (CompoundTerm, Atom)):
+        kind = node_kind(node.__class__)
+        if kind is NodeKind.Compound:
             node.subterms = self.accept(self.visit_expression(sub, inplace=True) for sub in node.subterms)
 
-        elif isinstance(node, CompoundFormula):
+        elif kind is NodeKind.CompoundFormula:
             node.subformulas = self.accept(self.visit_expression(sub, inplace=True) for sub in node.subformulas)
 
-        elif isinstance(node, IfThenElse):
+        elif kind is NodeKind.IfThenElse:
             node.condition = self.visit_expression(node.condition, inplace=True)
             node.subterms = self.accept(self.visit_expression(sub, inplace=True) for sub in node.subterms)
 
-        elif isinstance(node, QuantifiedFormula):
+        elif kind is NodeKind.Quantified:
             node.formula = self.visit_expression(node.formula)
             node.variables = self.accept(self.visit_expression(eff, inplace=True) for eff in node.variables)
-        else:
-            raise RuntimeError(f'Unexpected expression "{node}" of type "{type(node)}"')
 
         return self.visit(node)
 
@@ -13,6 +13,7 @@ class StateVariableLite:
     StateVariableLite, but currently we prefer to use a single class, hence the existence of StateVariableLite.
     Note: This is a lightweight version of the StateVariable class above, hoping that it can eventually replace it.
     """
+    __slots__ = ('symbol', 'binding')
 
     def __init__(self, symbol, binding):
         if not isinstance(symbol, (Predicate, Function)) or not all(isinstance(c, Constant) for c in binding):
@@ -1,12 +1,16 @@
 """
  Classes and methods related to the Logic-Program based grounding  strategy of planning problems.
 """
+import shutil
+
 from ..utils.command import silentremove
 from ..grounding.ops import approximate_symbol_fluency
-from ..reachability import create_reachability_lp, run_clingo, parse_model
+from ..reachability import create_reachability_lp, run_clingo, run_clingo_in_process, parse_model, \
+    clingo_module_available, run_datalog
 from ..reachability.asp import GOAL
 from .errors import ReachabilityLPUnsolvable
 from ..util import SymbolIndex
+from ..utils.iterators import prefetch as prefetch_iterable
 from .common import StateVariableLite
 
 
@@ -16,9 +20,16 @@ class LPGroundingStrategy:
     The type of LP created depends on the value of `ground_actions`. If true, it will include atoms for obtaining
     the parameter groundings of all reachable ground actions; if false, it will not, which should result in a smaller
     and cheaper logic program.
+
+    The LP can be solved with different backends: "clingo" uses the clingo Python API if available, and the gringo
+    binary otherwise; "datalog" uses the native Datalog engine of `tarski.reachability.datalog`, which has no external
+    dependencies. The default, "auto", uses clingo if it is installed, and the native engine otherwise.
     """
-    def __init__(self, problem, ground_actions=True, include_variable_inequalities=False):
+    def __init__(self, problem, ground_actions=True, include_variable_inequalities=False, backend='auto'):
+        if backend not in ('auto', 'clingo', 'datalog'):
+            raise ValueError(f'Unknown LP solving backend "{backend}"')
         self.problem = problem
+        self.backend = backend
         self.do_ground_actions = ground_actions
         self.include_variable_inequalities = include_variable_inequalities
         self.model = None  # We'll cache the solution of the LP here
@@ -59,41 +70,73 @@ class LPGroundingStrategy:
 
     def iterate_over_schema_groundings(self, schema_name: str):
         """  Iterate over all reachable parameter groundings of the given action schema. """
+        if not self.do_ground_actions:
+            raise RuntimeError('Cannot retrieve set of ground actions from LPGroundingStrategy '
+                               'configured with ground_actions=False')
         model = self._solve_lp()
-        return (x for x in model[schema_name]) if schema_name in model else []
+        key = "action_" + schema_name
+        return (x for x in model[key]) if key in model else iter(())
+
+    def iterate_schema_ground_operators(self, schema_name: str):
+        """ Lazily iterate over the PlainOperators that result from grounding the given action schema with each of
+        its reachable parameter groundings. Each operator is instantiated only when requested, from a template
+        precompiled once per schema. """
+        # pylint: disable=import-outside-toplevel
+        from ..syntax.transform.action_grounding import compile_action_template
+        template = compile_action_template(self.problem.get_action(schema_name))
+        for grounding in self.iterate_over_schema_groundings(schema_name):
+            yield template.instantiate(grounding)
+
+    def iterate_ground_operators(self, prefetch=0):
+        """ Lazily iterate over the PlainOperators that result from grounding all action schemas of the problem,
+        one schema after the other. If `prefetch` is positive, operators are instantiated in a background thread
+        that keeps up to `prefetch` operators ready for consumption. """
+        operators = (op for name in self.problem.actions for op in self.iterate_schema_ground_operators(name))
+        return prefetch_iterable(operators, prefetch) if prefetch > 0 else operators
 
     def _solve_lp(self):
         if self.model is None:
             lp, tr = create_reachability_lp(self.problem, self.do_ground_actions, self.include_variable_inequalities)
-            model_filename, theory_filename = run_clingo(lp)
-            self.model = parse_model(filename=model_filename, symbol_mapping=tr)
-
-            # Remove the input and output files for Gringo
-            silentremove(model_filename)
-            silentremove(theory_filename)
+            if self._resolve_backend() == 'datalog':
+                self.model = run_datalog(lp, tr)
+            elif clingo_module_available():
+                # Ground the LP through the clingo API, without going through the filesystem
+                self.model = run_clingo_in_process(lp, tr)
+            else:
+                model_filename, theory_filename = run_clingo(lp)
+                self.model = parse_model(filename=model_filename, symbol_mapping=tr)
+
+                # Remove the input and output files for Gringo
+                silentremove(model_filename)
+                silentremove(theory_filename)
 
             if len(self.model[GOAL]) != 1:
                 raise ReachabilityLPUnsolvable()
         return self.model
 
+    def _resolve_backend(self):
+        if self.backend == 'auto':
+            return 'clingo' if clingo_module_available() or shutil.which("gringo") else 'datalog'
+        return self.backend
+
     def __str__(self):
         return 'LPGroundingStrategy["{}"]'.format(self.problem.name)
 
     __repr__ = __str__
 
 
-def compute_action_groundings(problem, include_variable_inequalities=False):
-    grounding = LPGroundingStrategy(problem, True, include_variable_inequalities)
+def compute_action_groundings(problem, include_variable_inequalities=False, backend='auto'):
+    grounding = LPGroundingStrategy(problem, True, include_variable_inequalities, backend=backend)
     return grounding.ground_actions()
 
 
-def ground_problem_schemas_into_plain_operators(problem, include_variable_inequalities=False):
-    # pylint: disable=import-outside-toplevel
-    from ..syntax.transform.action_grounding import ground_schema_into_plain_operator_from_grounding
-    action_groundings = compute_action_groundings(problem, include_variable_inequalities)
-    operators = []
-    for action_name, groundings in action_groundings.items():
-        action = problem.get_action(action_name)
-        for grounding in groundings:
-            operators.append(ground_schema_into_plain_operator_from_grounding(action, grounding))
-    return operators
+def iterate_problem_schemas_into_plain_operators(problem, include_variable_inequalities=False, backend='auto',
+                                                 prefetch=0):
+    """ Lazily iterate over all reachable ground operators of the problem. See
+    `LPGroundingStrategy.iterate_ground_operators`. """
+    grounding = LPGroundingStrategy(problem, True, include_variable_inequalities, backend=backend)
+    return grounding.iterate_ground_operators(prefetch=prefetch)
+
+
+def ground_problem_schemas_into_plain_operators(problem, include_variable_inequalities=False, backend='auto'):
+    return list(iterate_problem_schemas_into_plain_operators(problem, include_variable_inequalities, backend))
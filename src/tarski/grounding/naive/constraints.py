@@ -37,8 +37,9 @@ class ConstraintGrounder:
                 if isinstance(s0.formula, QuantifiedFormula):
                     assert s0.formula.quantifier == Quantifier.Exists
                     # s0 is of the form \exists x1, ..., xn phi, phi is quantifier free
-                    s0.formula.formula = CNFTransformation.rewrite(self.L, s0.formula.formula).cnf
-                    self.problem.ground_constraints.add(s0.formula)
+                    cnf = CNFTransformation.rewrite(self.L, s0.formula.formula).cnf
+                    self.problem.ground_constraints.add(QuantifiedFormula(s0.formula.quantifier, s0.formula.variables,
+                                                                          cnf))
                 else:
                     s1 = CNFTransformation.rewrite(self.L, s0.formula)
                     self.problem.ground_constraints.add(s1.cnf)
@@ -0,0 +1,70 @@
+"""
+ A content-addressed on-disk cache of parsed planning problems. Each entry holds a pickled problem, and is keyed by a
+ hash of the contents of the files from which the problem was parsed, of the options of the reader, and of the Tarski
+ version, so that entries never need to be invalidated: any change in the inputs results in a different key.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+from ...version import __version__
+
+
+class ProblemCache:
+    """ A cache of parsed problems stored in the given directory, for readers with the given options, which can be any
+    object with a deterministic `repr`. """
+    def __init__(self, directory, options):
+        self.directory = directory
+        self.options = options
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, kind, filenames):
+        """ Return the key of the entry of the given kind (e.g. "domain") parsed from the given list of files. """
+        digest = hashlib.sha256()
+        for chunk in [__version__.encode(), kind.encode(), repr(self.options).encode()] + \
+                [_read_bytes(filename) for filename in filenames]:
+            # Prefix each chunk with its length, so that the key of a list of chunks is unambiguous
+            digest.update(len(chunk).to_bytes(8, 'little'))
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def load(self, key):
+        """ Return the object stored under the given key, or None if there is no such (valid) entry. """
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logging.warning(f'Ignoring unreadable problem cache entry "{filename}": {e}')
+            return None
+
+    def store(self, key, obj):
+        """ Store the given object under the given key. Objects that cannot be pickled (e.g. problems with some
+        lambda-defined evaluator) are not stored. """
+        try:
+            data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            logging.warning(f'Problem cannot be stored in cache: {e}')
+            return
+
+        # Write first into a temporary file, so that concurrent readers never see incomplete entries
+        fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmpname, self._filename(key))
+        except OSError:
+            os.remove(tmpname)
+            raise
+
+    def _filename(self, key):
+        return os.path.join(self.directory, f'{key}.pickle')
+
+
+def _read_bytes(filename):
+    with open(filename, 'rb') as file:
+        return file.read()
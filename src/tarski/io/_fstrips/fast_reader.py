@@ -0,0 +1,437 @@
+"""
+ A hand-written parser for the STRIPS / ADL subset of PDDL, as a much faster alternative to the ANTLR-generated
+ parser for domain and instance files. The input is tokenized with a regular expression into a tree of nested lists,
+ which is then processed by a recursive-descent parser that builds exactly the same objects as the `FStripsParser`
+ visitor. Files with constructs not supported here (e.g. derived predicates, durative actions, constraints or
+ "either" types) are detected before the problem is modified, so that they can be processed by the ANTLR parser.
+"""
+import logging
+import re
+
+from .common import parse_number, process_requirements, create_sort, process_cost_effects
+from .reader import ParsingError, UnsupportedLanguageFeature, ParserVariableContext
+from ...fstrips import DelEffect, AddEffect, FunctionalEffect, UniversalEffect, OptimizationMetric, OptimizationType
+from ...syntax import CompoundFormula, Connective, neg, Tautology, implies, exists, forall, Term
+from ...syntax.builtins import get_predicate_from_symbol, get_function_from_symbol
+from ...syntax.formulas import VariableBinding
+
+_COMMENT = re.compile(r';[^\n]*')
+# As in the ANTLR lexer, names cannot start with a hyphen, so that e.g. "?x -type" is tokenized as "?x - type"
+_TOKEN = re.compile(r'[()]|-(?=[a-zA-Z?])|[^\s()]+')
+_NUMBER = re.compile(r'-?[0-9]+(\.[0-9]+)?$')
+
+_BINARY_FUNCTIONS = {'*', '+', '-', '/', '^', 'max', 'min'}
+_UNARY_FUNCTIONS = {'sin', 'cos', 'sqrt', 'tan', 'acos', 'asin', 'atan', 'exp', 'abs'}
+_BINARY_PREDICATES = {'>', '<', '=', '>=', '<='}
+_ASSIGN_OPERATORS = {'scale-up': '*', 'scale-down': '/', 'increase': '+', 'decrease': '-'}
+
+_DOMAIN_SECTIONS = {':requirements', ':types', ':constants', ':predicates', ':functions', ':action'}
+_PROBLEM_SECTIONS = {':domain', ':requirements', ':objects', ':init', ':goal', ':metric'}
+_UNSUPPORTED_TOKENS = {'either', '#t'}
+
+
+def tokenize(string):
+    """ Return the tree of nested lists of tokens that corresponds to the given PDDL string, without comments. """
+    stack, current = [], []
+    for token in _TOKEN.findall(_COMMENT.sub('', string)):
+        if token == '(':
+            stack.append(current)
+            current = []
+        elif token == ')':
+            if not stack:
+                raise ParsingError('Unbalanced parentheses: unexpected ")"')
+            parent = stack.pop()
+            parent.append(current)
+            current = parent
+        else:
+            current.append(token)
+    if stack:
+        raise ParsingError('Unbalanced parentheses: missing ")"')
+    return current
+
+
+def _is_list(node):
+    return isinstance(node, list)
+
+
+def _key(node):
+    """ Return the lowercased head of the given list, or None if it is not a non-empty list starting with a token """
+    return node[0].lower() if _is_list(node) and node and not _is_list(node[0]) else None
+
+
+def _has_unsupported_tokens(node):
+    for element in node:
+        if _is_list(element):
+            if _has_unsupported_tokens(element):
+                return True
+        elif element.lower() in _UNSUPPORTED_TOKENS or element.startswith('@'):
+            return True
+    return False
+
+
+class FastFStripsParser:
+    """ A recursive-descent parser for PDDL domain and instance files, which builds the same objects as the
+    (ANTLR-based) `FStripsParser` visitor. As with the latter, the domain file needs to be parsed _before_ the
+    instance file. """
+    def __init__(self, problem, case_insensitive=False):
+        self.problem = problem
+        self.case_insensitive = case_insensitive
+        self.current_binding = None
+        self.requirements = set()
+
+    @property
+    def init(self):
+        return self.problem.init
+
+    @property
+    def language(self):
+        return self.problem.language
+
+    def parse_file(self, filename, start_rule):
+        """ Parse the given domain or problem file, depending on whether `start_rule` is "domain" or "problem".
+        Return False, without modifying the problem, if the file uses some construct not supported by this parser. """
+        with open(filename, 'r', encoding='utf-8') as file:
+            string = file.read()
+        if self.case_insensitive:
+            string = string.lower()
+        return self.parse_string(string, start_rule)
+
+    def parse_string(self, string, start_rule):
+        """ Parse the given domain or problem string, depending on whether `start_rule` is "domain" or "problem".
+        Return False, without modifying the problem, if the string uses some construct not supported by this parser.
+        """
+        if start_rule not in ('domain', 'problem'):
+            return False
+
+        tree = tokenize(string)
+        if len(tree) != 1 or _key(tree[0]) != 'define' or len(tree[0]) < 2 or _key(tree[0][1]) != start_rule:
+            raise ParsingError(f'Expected a single PDDL {start_rule} definition')
+
+        _, header, *sections = tree[0]
+        if not self._is_supported(sections, _DOMAIN_SECTIONS if start_rule == 'domain' else _PROBLEM_SECTIONS):
+            logging.debug(f'PDDL {start_rule} uses constructs unsupported by the fast parser, falling back to ANTLR')
+            return False
+
+        if start_rule == 'domain':
+            self.problem.domain_name = self._name(header)
+            for section in sections:
+                self._process_domain_section(section)
+        else:
+            self.problem.name = self._name(header)
+            for section in sections:
+                self._process_problem_section(section)
+        return True
+
+    @staticmethod
+    def _is_supported(sections, supported):
+        for section in sections:
+            key = _key(section)
+            if key not in supported:
+                return False
+            if key == ':metric' and (len(section) != 3 or _key(section[2]) in ('total-time', 'is-violated')):
+                return False
+        return not _has_unsupported_tokens(sections)
+
+    @staticmethod
+    def _name(node):
+        if len(node) != 2 or _is_list(node[1]):
+            raise ParsingError(f'Ill-formed PDDL declaration "({" ".join(map(str, node))})"')
+        return node[1]
+
+    def _process_domain_section(self, section):
+        key, args = _key(section), section[1:]
+        if key == ':requirements':
+            self._process_requirements(args)
+        elif key == ':types':
+            for typename, basename in self._typed_list(args):
+                create_sort(self.language, typename, basename)
+        elif key == ':constants':
+            self._process_objects(args)
+        elif key == ':predicates':
+            for definition in args:
+                self._predicate_definition(definition)
+        elif key == ':functions':
+            self._process_function_definitions(args)
+        else:
+            assert key == ':action'
+            self._action_definition(args)
+
+    def _process_problem_section(self, section):
+        key, args = _key(section), section[1:]
+        if key == ':domain':
+            domain_name = self._name(section)
+            if domain_name != self.problem.domain_name:
+                logging.warning('Domain names as declared in domain and instance files do not coincide: "{}" vs " {}"'.
+                                format(self.problem.domain_name, domain_name))
+        elif key == ':requirements':
+            self._process_requirements(args)
+        elif key == ':objects':
+            self._process_objects(args)
+        elif key == ':init':
+            self._process_init(args)
+        elif key == ':goal':
+            self.problem.goal = self._goal_description(self._single(section))
+        else:
+            assert key == ':metric'
+            opt_type = OptimizationType.from_string(section[1].lower())
+            self.problem.plan_metric = OptimizationMetric(self._term(section[2]), opt_type)
+
+    def _process_requirements(self, requirements):
+        self.requirements.update(r.lower() for r in requirements)
+        process_requirements(self.requirements, self.language)
+
+    def _process_objects(self, args):
+        for o, t in self._typed_list(args):
+            self.language.constant(o, t)
+
+    @staticmethod
+    def _single(node):
+        if len(node) != 2:
+            raise ParsingError(f'Expected a single element in "{node}"')
+        return node[1]
+
+    @staticmethod
+    def _typename(token):
+        if _is_list(token):
+            raise ParsingError(f'Ill-formed type name "{token}"')
+        return token.lower()
+
+    def _typed_groups(self, tokens):
+        """ Return the list of groups (names, type) of a possibly-typed list of names, where the type of the
+        trailing untyped names, if any, is None """
+        groups, names, i = [], [], 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token == '-':
+                if i + 1 == len(tokens):
+                    raise ParsingError(f'Missing type in typed list "{tokens}"')
+                groups.append((names, self._typename(tokens[i + 1])))
+                names, i = [], i + 2
+            else:
+                if _is_list(token):
+                    raise ParsingError(f'Unexpected list "{token}" in typed list "{tokens}"')
+                names.append(token.lower())
+                i += 1
+        return groups, names
+
+    def _typed_list(self, tokens):
+        """ Process a possibly-typed list of type or object names, where untyped names come first, as in the
+        ANTLR parser """
+        groups, untyped = self._typed_groups(tokens)
+        return [(name, 'object') for name in untyped] + [(name, t) for names, t in groups for name in names]
+
+    def _variable_list(self, tokens):
+        if not _is_list(tokens):
+            raise ParsingError(f'Expected a list of variables, got "{tokens}"')
+        groups, untyped = self._typed_groups(tokens)
+        variables = [self.language.variable(name, t) for names, t in groups for name in names]
+        return variables + [self.language.variable(name, 'object') for name in untyped]
+
+    def _predicate_definition(self, definition):
+        if not _is_list(definition) or not definition:
+            raise ParsingError(f'Ill-formed predicate definition "{definition}"')
+        argument_types = [a.sort for a in self._variable_list(definition[1:])]
+        return self.language.predicate(definition[0].lower(), *argument_types)
+
+    def _process_function_definitions(self, args):
+        i = 0
+        while i < len(args):
+            definition = args[i]
+            if not _is_list(definition) or not definition:
+                raise ParsingError(f'Ill-formed function definition "{definition}"')
+            if i + 1 < len(args) and args[i + 1] == '-':
+                if i + 2 == len(args):
+                    raise ParsingError(f'Missing type for function "{definition}"')
+                return_type, i = self._typename(args[i + 2]), i + 3
+            else:
+                # According to Daniel Kovacs' PDDL 3.1 BNF spec, the default type for functions is 'number'
+                return_type, i = 'number', i + 1
+            argument_types = [a.sort for a in self._variable_list(definition[1:])]
+            self.language.function(definition[0].lower(), *argument_types, return_type)
+
+    def _action_definition(self, args):
+        if not args or _is_list(args[0]) or len(args) % 2 != 1:
+            raise ParsingError(f'Ill-formed action definition "{args}"')
+        name, fields = args[0], {k.lower(): v for k, v in zip(args[1::2], args[2::2])}
+        if set(fields) != {':parameters', ':precondition', ':effect'}:
+            raise ParsingError(f'Action "{name}" needs exactly one parameter list, precondition and effect')
+
+        params = self._variable_list(fields[':parameters'])
+        binding = VariableBinding(params)
+
+        with ParserVariableContext(self, params, root=True) as _:
+            precondition = fields[':precondition']
+            precondition = Tautology() if precondition == [] else self._goal_description(precondition)
+            effects = self._effect(fields[':effect'])
+
+        effects, cost_effects = process_cost_effects(effects)
+        if len(cost_effects) > 1:
+            raise SyntaxError(f'Ill-formed action "{name}" with multiple cost effects: {cost_effects}')
+        self.problem.action(name, binding, precondition, effects, cost_effects[0] if cost_effects else None)
+
+    def _quantified(self, node, process):
+        if len(node) != 3:
+            raise ParsingError(f'Ill-formed quantified expression "{node}"')
+        variables = self._variable_list(node[1])
+        with ParserVariableContext(self, variables, root=False) as _:
+            return variables, process(node[2])
+
+    def _goal_description(self, node):
+        # pylint: disable=too-many-return-statements
+        key = _key(node)
+        if key is None:
+            raise ParsingError(f'Ill-formed formula "{node}"')
+
+        if key == 'and':
+            conjuncts = [self._goal_description(sub) for sub in node[1:]]
+            # The PDDL spec allows for and AND with zero or a single conjunct (e.g. (and p), which Tarski does
+            # (rightly) not. We thus treat those cases specially.
+            if len(conjuncts) == 0:
+                return Tautology()
+            elif len(conjuncts) == 1:
+                return conjuncts[0]
+            return CompoundFormula(Connective.And, conjuncts)
+
+        if key == 'or':
+            return CompoundFormula(Connective.Or, [self._goal_description(sub) for sub in node[1:]])
+
+        if key == 'not':
+            return neg(self._goal_description(self._single(node)))
+
+        if key == 'imply':
+            if len(node) != 3:
+                raise ParsingError(f'Ill-formed implication "{node}"')
+            return implies(self._goal_description(node[1]), self._goal_description(node[2]))
+
+        if key in ('exists', 'forall'):
+            variables, formula = self._quantified(node, self._goal_description)
+            return (exists if key == 'exists' else forall)(*variables, formula)
+
+        if key in _BINARY_PREDICATES:
+            if len(node) != 3:
+                raise ParsingError(f'Ill-formed builtin atom "{node}"')
+            lhs, rhs = self._term(node[1]), self._term(node[2])
+            return self.language.dispatch_operator(get_predicate_from_symbol(key), Term, Term, lhs, rhs)
+
+        return self._atom(node)
+
+    def _atom(self, node):
+        predicate = self.language.get_predicate(node[0].lower())
+        return predicate(*(self._term(t) for t in node[1:]))
+
+    def _term(self, node):
+        if not _is_list(node):
+            if node.startswith('?'):
+                if self.current_binding is None:
+                    raise ParsingError("Variable '{}' used declared outside variable binding".format(node))
+                return self.current_binding.get(node.lower())
+            if _NUMBER.match(node):
+                return parse_number(node, self.language)
+            return self.language.get_constant(node.lower())
+
+        key = _key(node)
+        if key is None:
+            raise ParsingError(f'Ill-formed term "{node}"')
+
+        if key in _BINARY_FUNCTIONS and len(node) == 3:
+            lhs, rhs = self._term(node[1]), self._term(node[2])
+            return self.language.dispatch_operator(get_function_from_symbol(key), Term, Term, lhs, rhs)
+
+        if key in _UNARY_FUNCTIONS or (key == '-' and len(node) == 2):
+            raise UnsupportedLanguageFeature(f'Unary arithmetic function "{key}" not supported in Tarski PDDL parser')
+
+        fun = self.language.get_function(key)
+        subterms = [self._term(t) for t in node[1:]]
+        assert len(fun.domain) == len(subterms)
+        subterms = tuple(s.to_constant(x) if not isinstance(x, Term) else x for s, x in zip(fun.domain, subterms))
+        return fun(*subterms)
+
+    def _effect(self, node):
+        """ Return the list of effects of the given effect formula """
+        if _key(node) == 'and':
+            effects = []
+            for sub in node[1:]:
+                effects.extend(self._single_effect(sub))
+            return effects
+        return self._single_effect(node)
+
+    def _single_effect(self, node):
+        key = _key(node)
+        if key == 'forall':
+            variables, effects = self._quantified(node, self._effect)
+            return [UniversalEffect(variables, effects)]
+
+        if key == 'when':
+            if len(node) != 3:
+                raise ParsingError(f'Ill-formed conditional effect "{node}"')
+            condition = self._goal_description(node[1])
+            effects = [self._atomic_effect(e) for e in node[2][1:]] if _key(node[2]) == 'and' else \
+                [self._atomic_effect(node[2])]
+            for eff in effects:
+                eff.condition = condition  # We simply copy the condition in each effect
+            return effects
+
+        return [self._atomic_effect(node)]
+
+    def _atomic_effect(self, node):
+        key = _key(node)
+        if key is None:
+            raise ParsingError(f'Ill-formed effect "{node}"')
+
+        if key == 'assign' or key in _ASSIGN_OPERATORS:
+            if len(node) != 3 or not _is_list(node[1]):
+                raise ParsingError(f'Ill-formed functional effect "{node}"')
+            lhs, rhs = self._term(node[1]), self._term(node[2])
+            if key != 'assign':
+                operator = get_function_from_symbol(_ASSIGN_OPERATORS[key])
+                rhs = self.language.dispatch_operator(operator, Term, Term, lhs, rhs)
+            return FunctionalEffect(lhs, rhs)
+
+        if key == 'not':
+            return DelEffect(self._atom(self._single(node)))
+
+        return AddEffect(self._atom(node))
+
+    def _process_init(self, elements):
+        # Atoms and function assignments are collected by symbol, and then loaded into the model in bulk
+        language, atoms, assignments, constants = self.language, {}, {}, {}
+
+        def constant(token):
+            if _is_list(token):
+                raise ParsingError(f'Unexpected nested list "{token}" in initial state')
+            c = constants.get(token)
+            if c is None:
+                c = constants[token] = token.lower() if _NUMBER.match(token) else language.get_constant(token.lower())
+            return c
+
+        for element in elements:
+            key = _key(element)
+            if key is None:
+                raise ParsingError(f'Ill-formed initial state element "{element}"')
+
+            if key == 'not':
+                continue  # No need to do anything here, as atoms are assumed by default to be false
+
+            if key == '=':
+                if len(element) != 3 or _key(element[1]) is None:
+                    raise ParsingError(f'Ill-formed initial function assignment "{element}"')
+                name = element[1][0].lower()
+                values = assignments.get(name)
+                if values is None:
+                    values = assignments[name] = (language.get_function(name), [])
+                fun = values[0]
+                subterms = [constant(t) for t in element[1][1:]]
+                assert len(fun.domain) == len(subterms)
+                subterms = tuple(s.to_constant(x) for s, x in zip(fun.domain, subterms))
+                values[1].append((subterms, constant(element[2])))
+                continue
+
+            points = atoms.get(key)
+            if points is None:
+                points = atoms[key] = (language.get_predicate(key), [])
+            points[1].append(tuple(constant(t) for t in element[1:]))
+
+        for predicate, points in atoms.values():
+            self.init.add_many(predicate, points)
+        for fun, values in assignments.values():
+            self.init.set_many(fun, values)
@@ -4,6 +4,7 @@
 """
 import copy
 import logging
+from collections import defaultdict
 
 from antlr4 import FileStream, CommonTokenStream, InputStream
 from antlr4.error.ErrorListener import ErrorListener
@@ -350,9 +351,20 @@ class FStripsParser(fstripsVisitor):
         return effects
 
     def visitInit(self, ctx):
-        # i.e. simply visit all node children
+        # Atoms and function assignments are collected by symbol, and then loaded into the model in bulk
+        atoms, assignments = defaultdict(list), defaultdict(list)
         for element_ctx in ctx.init_element():
-            self.visit(element_ctx)
+            if isinstance(element_ctx, fstripsParser.InitPositiveLiteralContext):
+                predicate, subterms = self.visit(element_ctx.flat_atom())
+                atoms[predicate].append(subterms)
+            elif isinstance(element_ctx, fstripsParser.InitFunctionAssignmentContext):
+                fun, subterms, value = self._visit_function_assignment(element_ctx)
+                assignments[fun].append((subterms, value))
+
+        for predicate, points in atoms.items():
+            self.init.add_many(predicate, points)
+        for fun, values in assignments.items():
+            self.init.set_many(fun, values)
 
     def visitInitPositiveLiteral(self, ctx):
         predicate, subterms = self.visit(ctx.flat_atom())
@@ -362,11 +374,15 @@ class FStripsParser(fstripsVisitor):
         # No need to do anything here, as atoms are assumed by default to be false
         pass
 
-    def visitInitFunctionAssignment(self, ctx):
+    def _visit_function_assignment(self, ctx):
         fun, subterms = self.visit(ctx.flat_term())
         assert len(fun.domain) == len(subterms)
         value = self.visit(ctx.constant_name())
         subterms = tuple(s.to_constant(x) for s, x in zip(fun.domain, subterms))
+        return fun, subterms, value
+
+    def visitInitFunctionAssignment(self, ctx):
+        fun, subterms, value = self._visit_function_assignment(ctx)
         self.init.set(fun(*subterms), value)
 
     def visitFlat_atom(self, ctx):
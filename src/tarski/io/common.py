@@ -1,5 +1,6 @@
 
 import os
+from string import Formatter
 
 _CURRENT_DIR_ = os.path.dirname(os.path.realpath(__file__))
 
@@ -7,3 +8,27 @@ _CURRENT_DIR_ = os.path.dirname(os.path.realpath(__file__))
 def load_tpl(name):
     with open(os.path.join(_CURRENT_DIR_, "templates", name), 'r', encoding='utf8') as file:
         return file.read()
+
+
+def write_tpl(stream, tpl, fields, buffer_size=1 << 16):
+    """ Write into the given text stream the result of `tpl.format(**fields)`, where the value of each field can also
+    be an iterable of strings, whose concatenation is the actual value of the field. Those iterables are consumed
+    incrementally, and written to the stream in chunks of (approximately) `buffer_size` characters. """
+    buffer, buffered = [], 0
+    for literal, name, _, _ in Formatter().parse(tpl):
+        pieces = [literal]
+        if name is not None:
+            value = fields[name]
+            pieces = [literal, value] if isinstance(value, str) else _chain(literal, value)
+        for piece in pieces:
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= buffer_size:
+                stream.write("".join(buffer))
+                buffer, buffered = [], 0
+    stream.write("".join(buffer))
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
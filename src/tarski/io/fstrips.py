@@ -1,10 +1,11 @@
+import io
 import logging
 from collections import defaultdict
 from typing import Optional, List
 
 from ..fstrips.action import AdditiveActionCost
 from ..theories import load_theory, Theory
-from .common import load_tpl
+from .common import load_tpl, write_tpl
 from ..model import ExtensionalFunctionDefinition
 from ..syntax import Tautology, Contradiction, Atom, CompoundTerm, CompoundFormula, QuantifiedFormula, \
     Term, Variable, Constant, Formula, symref, BuiltinPredicateSymbol
@@ -15,6 +16,8 @@ from ..fstrips import create_fstrips_problem, language, FunctionalEffect, AddEff
     UniversalEffect
 
 from ._fstrips.reader import FStripsParser
+from ._fstrips.fast_reader import FastFStripsParser
+from ._fstrips.cache import ProblemCache
 
 # Leave the next import so that it can be imported from the outside without warnings of importing a private module
 # pylint: disable=unused-import
@@ -26,7 +29,7 @@ class FstripsReader:
 
     def __init__(self, raise_on_error=False, theories=None, lang=None,
                  strict_with_requirements=True, case_insensitive=False,
-                 evaluator=None):
+                 evaluator=None, fast_parser=False, cache_dir=None):
         """ Create a FSTRIPS reader.
 
         :param raise_on_error: Whether to raise a Tarski ParsingError on every syntax error detected by the parser.
@@ -35,7 +38,19 @@ class FstripsReader:
         :param strict_with_requirements: if False, the parser will be less strict with the PDDL requirement flags,
                                          and will load by default the necessary theories to process action costs.
         :param case_insensitive: Whether to be strict with cases. If not, the whole PDDL file will be lowercased.
+        :param fast_parser: Whether to parse domain and instance files with a hand-written parser for the STRIPS / ADL
+                            subset of PDDL, which is much faster than the default ANTLR-based parser on large files.
+                            Files that use any other construct are still parsed with the ANTLR-based parser.
+        :param cache_dir: A directory where to cache the problems parsed by `read_problem` and `parse_domain`, which
+                          are then loaded from the cache whenever the same files (i.e. files with the same contents) are
+                          parsed again with the same reader options. Cannot be used together with `lang`.
         """
+        if cache_dir is not None and lang is not None:
+            raise ValueError('A problem cache cannot be used to parse problems into a given language')
+        self.cache = None if cache_dir is None else ProblemCache(cache_dir, (
+            None if theories is None else [str(t) for t in theories], strict_with_requirements, case_insensitive,
+            None if evaluator is None else f'{evaluator.__module__}.{evaluator.__qualname__}'))
+
         lang = language(theories=theories) if lang is None else lang
         if not strict_with_requirements:
             load_theory(lang, Theory.ARITHMETIC)
@@ -43,20 +58,47 @@ class FstripsReader:
 
         self.problem = create_fstrips_problem(language=lang, evaluator=evaluator)
         self.parser = FStripsParser(self.problem, raise_on_error, case_insensitive)
+        self.fast_parser = FastFStripsParser(self.problem, case_insensitive) if fast_parser else None
 
     def read_problem(self, domain, instance):
-        self.parse_domain(domain)
-        self.parse_instance(instance)
+        key = None if self.cache is None else self.cache.key('problem', [domain, instance])
+        if key is None or not self._load_from_cache(key):
+            self.parse_domain(domain)
+            self.parse_instance(instance)
+            self._store_in_cache(key)
         return self.problem
 
+    def _load_from_cache(self, key):
+        """ Replace the problem being parsed by the one stored in the cache under the given key, if any. """
+        entry = self.cache.load(key)
+        if entry is None:
+            return False
+
+        logging.debug(f'Problem "{key}" loaded from cache')
+        self.problem, requirements = entry
+        for parser in (self.parser, self.fast_parser):
+            if parser is not None:
+                parser.problem, parser.requirements = self.problem, set(requirements)
+        return True
+
+    def _store_in_cache(self, key):
+        if key is not None:
+            requirements = self.parser.requirements | getattr(self.fast_parser, 'requirements', set())
+            self.cache.store(key, (self.problem, requirements))
+
     def parse_file(self, filename, start_rule):
         logging.debug('Parsing filename "{}" from grammar rule "{}"'.format(filename, start_rule))
+        if self.fast_parser is not None and self.fast_parser.parse_file(filename, start_rule):
+            return
         domain_parse_tree, _ = self.parser.parse_file(filename, start_rule)
         self.parser.visit(domain_parse_tree)
 
     def parse_domain(self, filename):
-        self.parse_file(filename, 'domain')
-        uniformize_costs(self.problem)
+        key = None if self.cache is None else self.cache.key('domain', [filename])
+        if key is None or not self._load_from_cache(key):
+            self.parse_file(filename, 'domain')
+            uniformize_costs(self.problem)
+            self._store_in_cache(key)
 
     def parse_instance(self, filename):
         self.parse_file(filename, 'problem')
@@ -72,6 +114,8 @@ class FstripsReader:
 
     def parse_string(self, string, start_rule):
         logging.debug('Parsing custom string from grammar rule "{}"'.format(start_rule))
+        if self.fast_parser is not None and self.fast_parser.parse_string(string, start_rule):
+            return None
         parse_tree, _ = self.parser.parse_string(string, start_rule)
         logging.debug("Processing AST")
         return self.parser.visit(parse_tree)
@@ -97,45 +141,55 @@ derived_tpl = """
 def print_objects(constants):
     """ Print a PDDL object declaration with the given objects.
     Objects are sorted by name and grouped by type, and types sorted by name as well """
+    return "".join(iterate_objects(constants))
+
+
+def iterate_objects(constants):
+    """ Iterate through the pieces of the PDDL object declaration returned by `print_objects`. """
     constants_by_sort = defaultdict(list)
     for c in constants:
         constants_by_sort[c.sort.name].append(c.symbol)
 
-    elements = []
-    for sort in sorted(constants_by_sort.keys()):
-        sobjects = " ".join(sorted(constants_by_sort[sort]))
-        elements.append("{} - {}".format(sobjects, sort))
-
-    return linebreaks(elements, indentation=2, indent_first=False)
+    elements = ("{} - {}".format(" ".join(sorted(constants_by_sort[sort])), sort)
+                for sort in sorted(constants_by_sort.keys()))
+    return iterate_linebreaks(elements, indentation=2, indent_first=False)
 
 
 def linebreaks(elements, indentation, indent_first):
-    def indent_while_iterating():
-        for i, element in enumerate(elements, 0):
-            idt = 0 if i == 0 and not indent_first else indentation
-            yield indent(element, idt)
+    return "".join(iterate_linebreaks(elements, indentation, indent_first))
+
 
-    return "\n".join(indent_while_iterating())
+def iterate_linebreaks(elements, indentation, indent_first):
+    """ Iterate through the pieces of the string returned by `linebreaks`. """
+    for i, element in enumerate(elements, 0):
+        idt = 0 if i == 0 and not indent_first else indentation
+        yield indent(element, idt) if i == 0 else "\n" + indent(element, idt)
 
 
 def print_init(problem):
-    elements = []
+    return "".join(iterate_init(problem))
+
+
+def iterate_init(problem):
+    """ Iterate through the pieces of the PDDL initial state returned by `print_init`. """
+    return iterate_linebreaks(_init_elements(problem), indentation=2, indent_first=False)
+
+
+def _init_elements(problem):
     # e.g. (= (value c0) 0)
     for signature, definition in problem.init.function_extensions.items():
         if not isinstance(definition, ExtensionalFunctionDefinition):
             continue  # Ignore intensionally defined symbols
         fname = signature[0]
         for point, value in definition.data.items():
-            elements.append("(= ({} {}) {})".format(fname, print_term_ref_list(point), value))
+            yield "(= ({} {}) {})".format(fname, print_term_ref_list(point), value)
 
     # e.g. (clear b1)
     for signature, definition in problem.init.predicate_extensions.items():
         assert isinstance(definition, set)
         predname = signature[0]
         for point in definition:
-            elements.append("({} {})".format(predname, print_term_ref_list(point)))
-
-    return linebreaks(elements, indentation=2, indent_first=False)
+            yield "({} {})".format(predname, print_term_ref_list(point))
 
 
 def print_goal(problem):
@@ -191,23 +245,28 @@ class FstripsWriter:
         constants", and which as "PDDL instance objects", which is something that cannot be determined from the problem
         information alone. If `constant_objects` is None, all objects are considered instance objects.
         """
-        tpl = load_tpl("fstrips_domain.tpl")
-        content = tpl.format(
+        stream = io.StringIO()
+        self.dump_domain(stream, constant_objects)
+        return stream.getvalue()
+
+    def dump_domain(self, stream, constant_objects: Optional[List[Constant]] = None):
+        """ Write into the given text stream the PDDL domain returned by `print_domain`. Actions are generated and
+        written incrementally, so that the whole PDDL text is never held in memory. """
+        write_tpl(stream, load_tpl("fstrips_domain.tpl"), dict(
             header_info="",
             domain_name=self.problem.domain_name,
             requirements=" ".join(get_requirements_string(self.problem)),
             types=self.get_types(),
             functions=self.get_functions(),
             predicates=self.get_predicates(),
-            actions=self.get_actions(),
-            derived=self.get_derived_predicates(),
-            constants=print_objects(constant_objects if constant_objects else []),
-        )
-        return content
+            actions=self.iterate_actions(),
+            derived=self.iterate_derived_predicates(),
+            constants=iterate_objects(constant_objects if constant_objects else []),
+        ))
 
     def write_domain(self, filename, constant_objects):
         with open(filename, 'w', encoding='utf8') as file:
-            file.write(self.print_domain(constant_objects))
+            self.dump_domain(file, constant_objects)
 
     def print_instance(self, constant_objects: Optional[List[Constant]] = None):
         """ Generate the PDDL string representation that would correspond to the instance.pddl file of the current
@@ -216,29 +275,33 @@ class FstripsWriter:
         constants", and which as "PDDL instance objects", which is something that cannot be determined from the problem
         information alone. If `constant_objects` is None, all objects are considered instance objects.
         """
-        tpl = load_tpl("fstrips_instance.tpl")
+        stream = io.StringIO()
+        self.dump_instance(stream, constant_objects)
+        return stream.getvalue()
 
+    def dump_instance(self, stream, constant_objects: Optional[List[Constant]] = None):
+        """ Write into the given text stream the PDDL instance returned by `print_instance`. Objects and atoms of the
+        initial state are generated and written incrementally, so that the whole PDDL text is never held in memory. """
         # Only objects which are not declared in the domain file need to be printed in the instance file
         constants = {symref(c) for c in constant_objects} if constant_objects else set()
         instance_objects = [c for c in self.problem.language.constants() if symref(c) not in constants]
 
-        content = tpl.format(
+        write_tpl(stream, load_tpl("fstrips_instance.tpl"), dict(
             header_info="",
             domain_name=self.problem.domain_name,
             problem_name=self.problem.name,
 
-            objects=print_objects(instance_objects),
-            init=print_init(self.problem),
+            objects=iterate_objects(instance_objects),
+            init=iterate_init(self.problem),
             goal=print_goal(self.problem),
             constraints=print_problem_constraints(self.problem),
             domain_bounds=print_domain_bounds(self.problem),
             metric=print_problem_metric(self.problem),
-        )
-        return content
+        ))
 
     def write_instance(self, filename, constant_objects):
         with open(filename, 'w', encoding='utf8') as file:
-            file.write(self.print_instance(constant_objects))
+            self.dump_instance(file, constant_objects)
 
     def get_types(self):
         res = []
@@ -274,7 +337,12 @@ class FstripsWriter:
         return ("\n" + _TAB * 2).join(res)
 
     def get_actions(self):
-        return "\n".join(self.get_action(a) for a in self.problem.actions.values())
+        return "".join(self.iterate_actions())
+
+    def iterate_actions(self):
+        """ Iterate through the pieces of the string returned by `get_actions`. """
+        for i, a in enumerate(self.problem.actions.values()):
+            yield self.get_action(a) if i == 0 else "\n" + self.get_action(a)
 
     @staticmethod
     def get_action(a):
@@ -287,7 +355,12 @@ class FstripsWriter:
         )
 
     def get_derived_predicates(self):
-        return "\n".join(self.get_derived(d) for d in self.problem.derived_predicates.values())
+        return "".join(self.iterate_derived_predicates())
+
+    def iterate_derived_predicates(self):
+        """ Iterate through the pieces of the string returned by `get_derived_predicates`. """
+        for i, d in enumerate(self.problem.derived_predicates.values()):
+            yield self.get_derived(d) if i == 0 else "\n" + self.get_derived(d)
 
     @staticmethod
     def get_derived(d):
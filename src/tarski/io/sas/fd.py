@@ -4,18 +4,34 @@
 # ----------------------------------------------------------------------------------------------------------------------
 # src/tarski/io/sas/fd.py
 #
-# SAS instance writer for Fast Downward pre-processor
+# SAS instance writer and reader for the Fast Downward pre-processor
 # ----------------------------------------------------------------------------------------------------------------------
-from tarski.io.sas.templates import variable_section_elem_tmpl, axiom_defaults_section_tmpl, precondition_elem_tmpl, \
-    effect_elem_tmpl, operator_tmpl, initial_value_list_elem_tmpl, initial_state_section_tmpl, \
-    goal_value_list_elem_tmpl, goal_state_section_tmpl, sas_instance_tmpl
+import shutil
+import tempfile
+from collections.abc import Collection
+from typing import List
+
+import tarski as tsk
+from tarski.errors import SyntacticError
+from tarski.io.sas.templates import variable_section_elem_tmpl, mutex_group_list_element_tmpl, \
+    mutex_group_section_elem_tmpl, precondition_elem_tmpl, effect_elem_tmpl, operator_tmpl, \
+    initial_value_list_elem_tmpl, initial_state_section_tmpl, goal_value_list_elem_tmpl, goal_state_section_tmpl, \
+    sas_header_tmpl
+from tarski.sas import Action
 from tarski.syntax import symref, CompoundTerm
+from tarski.theories import Theory
+from tarski.util import SymbolIndex
 
 
-FAST_DOWNWARD_SAS_VERSION = 4
+FAST_DOWNWARD_SAS_VERSION = 3
 
 
 class Writer(object):
+    """
+    Writer of SAS instances in the format of the output of the Fast Downward translator. The instance is written
+    incrementally, section by section, and operators are written one at a time, as they are produced by the given
+    iterable of actions.
+    """
 
     def __init__(self, **kwargs):
         self.dom_theory = kwargs['theory']
@@ -25,16 +41,21 @@ class Writer(object):
         self.initial = kwargs['initial']
         self.goal = kwargs['goal']
         self.unit_costs = kwargs.get('unit_costs', True)
+        self.mutexes = kwargs.get('mutexes', [])
 
     def get_sas_version(self) -> str:
         return '{}'.format(FAST_DOWNWARD_SAS_VERSION)
 
     def get_metric_type(self) -> str:
-        return '{}'.format(self.unit_costs and 0 or 1)
+        return '{}'.format(0 if self.unit_costs else 1)
 
     def get_number_variables(self) -> str:
         return '{}'.format(len(self.state_variables))
 
+    @staticmethod
+    def get_variable_name(var: CompoundTerm) -> str:
+        return var.symbol.name if not var.subterms else str(var)
+
     def make_value_section(self, var: CompoundTerm) -> str:
         """
         Makes values section in variable definition section
@@ -46,179 +67,300 @@ class Writer(object):
             value_list += ['{}'.format(str(obj.expr))]
         return '\n'.join(value_list)
 
-    def make_variable_section(self) -> str:
-        elements = []
-        for var in self.state_variables:
-            elements += [variable_section_elem_tmpl.substitute(
-                name=str(var.expr),
-                # @TODO: come up with proper value when we get axioms in fully
-                axiom_layer=-1,
-                domain_size=len(self.domains[var]),
-                value_section=self.make_value_section(var.expr)
-            )]
+    def make_variable(self, var) -> str:
+        return variable_section_elem_tmpl.substitute(
+            name=self.get_variable_name(var.expr),
+            # @TODO: come up with proper value when we get axioms in fully
+            axiom_layer=-1,
+            domain_size=len(self.domains[var]),
+            value_section=self.make_value_section(var.expr)
+        )
 
-        return '\n'.join(elements)
+    def make_variable_section(self) -> str:
+        return '\n'.join(self.make_variable(var) for var in self.state_variables)
 
     def get_number_mutex_groups(self) -> str:
         """
         Returns the number of mutex groups in the instance
         :return:
         """
-        # @TODO: review this when we come up with an idea of what are these constraints exactly
-        return '{}'.format(0)
+        return '{}'.format(len(self.mutexes))
+
+    def make_mutex_group(self, group) -> str:
+        return mutex_group_section_elem_tmpl.substitute(
+            group_size=len(group),
+            mutex_group_list=''.join('\n' + mutex_group_list_element_tmpl.substitute(
+                index_v=self.get_variable_index(x),
+                index_value=self.get_value_index(x, v)) for x, v in group)
+        )
 
     def make_mutex_group_section(self) -> str:
         """
         Constructs the mutex group section of the SAS instance file
         :return:
         """
-        mutex_groups = []
-
-        # @TODO: implement when we have an idea of what are these constraints exactly
-        if len(mutex_groups) == 0:
-            return ''
-
-        return "\n".join(mutex_groups)
-
-    def make_axioms_defaults_list(self) -> str:
-        defaults = []
-
-        # @TODO: finish implementation when we have axioms in
-        if len(defaults) == 0:
-            return ''
-        return '\n' + '\n'.join(defaults)
-
-    def make_axiom_defaults_section(self) -> str:
-        # @TODO: finish implementation when we have axioms in
-        return axiom_defaults_section_tmpl.substitute(
-            num_axiom_vars=0,
-            axiom_defaults_list=self.make_axioms_defaults_list()
-        )
+        return ''.join('\n' + self.make_mutex_group(group) for group in self.mutexes)
 
     def get_number_axiom_rules(self) -> str:
         # @TODO: finish implementation when we have axioms fully in
         return '{}'.format(0)
 
     def make_axiom_rules_section(self) -> str:
-        rules = []
+        rules: List[str] = []
 
         # @TODO: finish implementation when we have it
         if len(rules) == 0:
             return ''
         return '\n' + '\n'.join(rules)
 
+    def get_variable_index(self, x):
+        return self.state_variables.get_index(symref(x))
+
+    def get_value_index(self, x, v):
+        return -1 if v is None else self.domains[symref(x)].get_index(symref(v))
+
     def get_num_operators(self):
         return '{}'.format(len(self.actions))
 
     def get_action_name(self, a):
-        return "{}({})".format(a.name, ",".join([str(arg) for arg in a.arguments]))
+        return " ".join([a.name] + [str(arg) for arg in a.arguments])
+
+    @staticmethod
+    def get_prevail_transitions(a):
+        """ Transitions that require some value and leave it unchanged, i.e. prevail conditions """
+        return [(x, v) for x, v, w in a.transitions if v is not None and symref(v) == symref(w)]
+
+    @staticmethod
+    def get_effect_transitions(a):
+        """ Transitions that change the value of their variable, if any value was required (None otherwise) """
+        return [(x, v, w) for x, v, w in a.transitions if v is None or symref(v) != symref(w)]
 
     def get_num_preconditions(self, a):
-        return len(a.transitions)
+        return len(self.get_prevail_transitions(a))
 
     def make_precondition_list(self, a):
-        elems = []
-        for x, v, _ in a.transitions:
-            elems += [precondition_elem_tmpl.substitute(
-                variable_index=self.state_variables.get_index(symref(x)),
-                value_index=self.domains[symref(x)].get_index(symref(v))
-            )]
-        return '\n'.join(elems)
+        return ''.join('\n' + precondition_elem_tmpl.substitute(
+            variable_index=self.get_variable_index(x),
+            value_index=self.get_value_index(x, v)) for x, v in self.get_prevail_transitions(a))
 
     def get_num_effects(self, a):
-        return len(a.transitions)
+        return len(self.get_effect_transitions(a))
 
     def make_effect_list(self, a):
-        elems = []
-
-        for x, _, w in a.transitions:
-            elems += [effect_elem_tmpl.substitute(
-                num_effect_conditions=0,
-                effect_condition_list='',
-                affected_variable_index=self.state_variables.get_index(symref(x)),
-                new_value_index=self.domains[symref(x)].get_index(symref(w))
-            )]
-
-        return '\n'.join(elems)
+        return ''.join('\n' + effect_elem_tmpl.substitute(
+            num_effect_conditions=0,
+            effect_condition_list='',
+            affected_variable_index=self.get_variable_index(x),
+            previous_value_index=self.get_value_index(x, v),
+            new_value_index=self.get_value_index(x, w)) for x, v, w in self.get_effect_transitions(a))
 
     def get_cost(self, a):
-        # @TODO: finish implementation when we have action costs
-        return '{}'.format(1)
+        return '{}'.format(a.cost)
+
+    def make_operator(self, action):
+        return operator_tmpl.substitute(
+            name=self.get_action_name(action),
+            num_preconditions=self.get_num_preconditions(action),
+            precondition_list=self.make_precondition_list(action),
+            num_effects=self.get_num_effects(action),
+            effect_list=self.make_effect_list(action),
+            cost=self.get_cost(action)
+        )
 
     def make_operators_section(self):
         """
         Constructs the operators section
         :return:
         """
-        operators = []
-        assert len(self.actions) > 0
-        for action in self.actions:
-            operators += [operator_tmpl.substitute(
-                name=self.get_action_name(action),
-                num_preconditions=self.get_num_preconditions(action),
-                precondition_list=self.make_precondition_list(action),
-                num_effects=self.get_num_effects(action),
-                effect_list=self.make_effect_list(action),
-                cost=self.get_cost(action)
-            )]
-        print(operators)
-        return '\n'.join(operators)
+        return '\n'.join(self.make_operator(action) for action in self.actions)
 
-    def make_initial_value_list(self) -> str:
+    def dump_operators(self, fp) -> None:
+        """
+        Writes the number of operators followed by the operators section in file-like object `fp`, one operator at a
+        time. The number of operators needs to be written first, hence if the actions are given through an iterable
+        without length (e.g. a generator), operators are first spooled into a temporary file while counting them.
+        :param fp:
+        :return:
         """
+        if isinstance(self.actions, Collection):
+            fp.write(self.get_num_operators() + '\n')
+            for action in self.actions:
+                fp.write(self.make_operator(action) + '\n')
+            return
+
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as spool:
+            num_operators = 0
+            for action in self.actions:
+                spool.write(self.make_operator(action) + '\n')
+                num_operators += 1
+            fp.write('{}\n'.format(num_operators))
+            spool.seek(0)
+            shutil.copyfileobj(spool, fp)
 
+    def make_initial_value_list(self) -> str:
+        """
+        Lists the value of each state variable in the initial state, in the order of the variables
         :return:
         """
-        values = []
+        values = [None] * len(self.state_variables)
         for x, v in self.initial:
-            values += [initial_value_list_elem_tmpl.substitute(
-                variable_index=self.state_variables.get_index(symref(x)),
-                value_index=self.domains[symref(x)].get_index(symref(v))
-            )]
+            values[self.get_variable_index(x)] = self.get_value_index(x, v)
 
-        return '\n'.join(values)
+        if any(value is None for value in values):
+            missing = [str(self.state_variables.get_object(i).expr) for i, v in enumerate(values) if v is None]
+            raise ValueError('Initial state does not define the value of state variables: {}'.format(missing))
+        return '\n'.join(initial_value_list_elem_tmpl.substitute(value_index=v) for v in values)
 
     def make_initial_state_section(self) -> str:
         return initial_state_section_tmpl.substitute(
-            num_variables=len(self.state_variables),
             initial_value_list=self.make_initial_value_list()
         )
 
     def make_goal_value_list(self) -> str:
-        values = []
-        for x, v in self.goal:
-            values += [goal_value_list_elem_tmpl.substitute(
-                variable_index=self.state_variables.get_index(symref(x)),
-                value_index=self.domains[symref(x)].get_index(symref(v))
-            )]
-        return '\n'.join(values)
+        return ''.join('\n' + goal_value_list_elem_tmpl.substitute(
+            variable_index=self.get_variable_index(x),
+            value_index=self.get_value_index(x, v)) for x, v in self.goal)
 
     def make_goal_state_section(self) -> str:
         return goal_state_section_tmpl.substitute(
+            num_goals=len(self.goal),
             goal_value_list=self.make_goal_value_list()
         )
 
     def dump(self, fp) -> None:
         """
-        Dumps instance data in file-like object `fp`
+        Dumps instance data in file-like object `fp`, section by section
         :param fp:
         :return:
         """
-
-        data = sas_instance_tmpl.substitute(
-            format_version=self.get_sas_version(),
-            metric_type=self.get_metric_type(),
-            num_variables=self.get_number_variables(),
-            variable_section=self.make_variable_section(),
-            num_mutex_groups=self.get_number_mutex_groups(),
-            mutex_group_section=self.make_mutex_group_section(),
-            axiom_defaults_section=self.make_axiom_defaults_section(),
-            num_axiom_rules=self.get_number_axiom_rules(),
-            axiom_rules_section=self.make_axiom_rules_section(),
-            num_operators=self.get_num_operators(),
-            operators_section=self.make_operators_section(),
-            initial_state_section=self.make_initial_state_section(),
-            goal_state_section=self.make_goal_state_section()
-        )
-
-        fp.write(data)
+        fp.write(sas_header_tmpl.substitute(format_version=self.get_sas_version(),
+                                            metric_type=self.get_metric_type()) + '\n')
+        fp.write(self.get_number_variables() + '\n')
+        for var in self.state_variables:
+            fp.write(self.make_variable(var) + '\n')
+        fp.write(self.get_number_mutex_groups() + self.make_mutex_group_section() + '\n')
+        fp.write(self.make_initial_state_section() + '\n')
+        fp.write(self.make_goal_state_section() + '\n')
+        self.dump_operators(fp)
+        fp.write(self.get_number_axiom_rules() + self.make_axiom_rules_section() + '\n')
+
+
+class ParsingError(SyntacticError):
+    pass
+
+
+class _LineReader:
+    """ Reads the lines of a SAS file one at a time, keeping track of the line number for error reporting """
+    def __init__(self, fp):
+        self.lines = iter(fp)
+        self.lineno = 0
+
+    def next(self) -> str:
+        line = next(self.lines, None)
+        if line is None:
+            raise ParsingError('Unexpected end of SAS file after line {}'.format(self.lineno))
+        self.lineno += 1
+        return line.rstrip('\r\n')
+
+    def expect(self, token) -> None:
+        line = self.next()
+        if line != token:
+            raise ParsingError('Line {}: expected "{}", found "{}"'.format(self.lineno, token, line))
+
+    def ints(self, count=None):
+        line = self.next()
+        try:
+            values = [int(x) for x in line.split()]
+        except ValueError:
+            raise ParsingError('Line {}: expected integers, found "{}"'.format(self.lineno, line)) from None
+        if count is not None and len(values) != count:
+            raise ParsingError('Line {}: expected {} integers, found "{}"'.format(self.lineno, count, line))
+        return values
+
+    def int(self):
+        return self.ints(1)[0]
+
+
+def load(fp, lang=None):
+    """
+    Loads the SAS instance in file-like object `fp`, e.g. the `output.sas` file produced by the Fast Downward
+    translator, reading it one line at a time. State variables are represented as nullary functions, and their values
+    as constants, of the given language, or of a new language if none is given. Axioms and conditional effects are
+    not supported.
+    :param fp:
+    :param lang:
+    :return: A dictionary with the instance data, with the same keys as the arguments of `Writer`, so that
+             `Writer(**load(fp))` writes the same instance back.
+    """
+    # pylint: disable=too-many-locals
+    lang = lang or tsk.language('sas', theories=[Theory.EQUALITY])
+    reader = _LineReader(fp)
+
+    def get_constant(name):
+        return lang.get_constant(name) if lang.has_constant(name) else lang.constant(name, lang.Object)
+
+    reader.expect('begin_version')
+    version = reader.int()
+    if version != FAST_DOWNWARD_SAS_VERSION:
+        raise ParsingError('Unsupported SAS format version {}'.format(version))
+    reader.expect('end_version')
+    reader.expect('begin_metric')
+    unit_costs = reader.int() == 0
+    reader.expect('end_metric')
+
+    variables, domains = [], {}
+    state_variables = SymbolIndex()
+    for _ in range(reader.int()):
+        reader.expect('begin_variable')
+        x = lang.function(reader.next(), lang.Object)()
+        if reader.int() != -1:
+            raise ParsingError('Line {}: derived variables (axioms) are not supported'.format(reader.lineno))
+        domain = SymbolIndex()
+        for _ in range(reader.int()):
+            domain.add(symref(get_constant(reader.next())))
+        reader.expect('end_variable')
+        state_variables.add(symref(x))
+        domains[symref(x)] = domain
+        variables.append(x)
+
+    def value(var, val):
+        if not 0 <= var < len(variables) or not -1 <= val < len(domains[symref(variables[var])]):
+            raise ParsingError('Line {}: undefined variable value {} {}'.format(reader.lineno, var, val))
+        x = variables[var]
+        return x, None if val == -1 else domains[symref(x)].get_object(val).expr
+
+    mutexes = []
+    for _ in range(reader.int()):
+        reader.expect('begin_mutex_group')
+        mutexes.append([value(*reader.ints(2)) for _ in range(reader.int())])
+        reader.expect('end_mutex_group')
+
+    reader.expect('begin_state')
+    initial = [value(var, reader.int()) for var in range(len(variables))]
+    reader.expect('end_state')
+
+    reader.expect('begin_goal')
+    goal = [value(*reader.ints(2)) for _ in range(reader.int())]
+    reader.expect('end_goal')
+
+    actions = []
+    for _ in range(reader.int()):
+        reader.expect('begin_operator')
+        name, *arguments = reader.next().split()
+        transitions = [(x, v, v) for x, v in (value(*reader.ints(2)) for _ in range(reader.int()))]
+        for _ in range(reader.int()):
+            effect = reader.ints()
+            if not effect or effect[0] != 0 or len(effect) != 4:
+                raise ParsingError('Line {}: conditional effects are not supported'.format(reader.lineno))
+            x, v = value(effect[1], effect[2])
+            transitions.append((x, v, value(effect[1], effect[3])[1]))
+        cost = reader.int()
+        reader.expect('end_operator')
+        actions.append(Action(name=name, arguments=[get_constant(arg) for arg in arguments],
+                              transitions=transitions, cost=cost))
+
+    if reader.int() != 0:
+        raise ParsingError('Line {}: axioms are not supported'.format(reader.lineno))
+
+    return dict(theory=lang, state_variables=state_variables, domains=domains, actions=actions, initial=initial,
+                goal=goal, unit_costs=unit_costs, mutexes=mutexes)
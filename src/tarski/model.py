@@ -1,5 +1,5 @@
 import warnings
-from typing import Union
+from typing import Any, Dict, List, Set, Tuple, Union
 
 from . import errors as err
 from .syntax import Function, Constant, CompoundTerm, symref, Variable
@@ -40,6 +40,46 @@ def _check_assignment(fun, point, value=None):
     return tuple(processed[:-1]), processed[-1]
 
 
+class _BulkAssignmentChecker:
+    """ Perform the same checks as `_check_assignment` on many points of the extension of a single symbol, returning
+    each point already wrapped into a tuple of term references. The result for each distinct constant at each position
+    is cached, so that it is checked (and wrapped) only once. """
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.sorts = symbol.sort
+        self.language = symbol.language
+        # For each position, a map from the id of each constant already checked to the constant (which keeps the id
+        # from being reused) and its term reference.
+        self.checked = [{} for _ in self.sorts]
+
+    def check(self, elements):
+        if len(elements) != len(self.sorts):
+            raise err.ArityMismatch(self.symbol, elements)
+        return tuple(self._check(position, element) for position, element in enumerate(elements))
+
+    def _check(self, position, element):
+        cached = self.checked[position].get(id(element))
+        if cached is not None:
+            return cached[1]
+
+        expected_type = self.sorts[position]
+        constant = element
+        if not isinstance(constant, Constant):
+            # Assume a literal value has been passed instead of its corresponding constant
+            constant = Constant(expected_type.cast(element), expected_type)
+
+        if constant.language != self.language:
+            raise err.LanguageMismatch(constant, constant.language, self.language)
+
+        if not self.language.is_subtype(constant.sort, expected_type):
+            raise err.SortMismatch(constant, constant.sort, expected_type)
+
+        ref = symref(constant)
+        if constant is element:
+            self.checked[position][id(element)] = (element, ref)
+        return ref
+
+
 class Model:
     """ A First Order Language Model """
 
@@ -49,33 +89,49 @@ class Model:
         # self.vocabulary = language.vocabulary()
         self.function_extensions = {}
         self.predicate_extensions = {}
+        # A Zobrist-style hash of the model, i.e. the XOR of the hashes of all true atoms and function assignments,
+        # which is updated incrementally as the model is modified
+        self._hash = 0
+        # Secondary indexes over predicate extensions, built lazily by `match` and `query`, and maintained
+        # incrementally afterwards. Maps each pair (signature, positions) to a dictionary from the values
+        # at those positions to the set of matching points.
+        self._indexes: Dict[Tuple[Any, Tuple[int, ...]], Dict[Tuple[Any, ...], Set[Any]]] = {}
 
     def __eq__(self, other):
-        # TODO Improve the performance of this
-        return str(self) == str(other)
+        if self is other:
+            return True
+        if not isinstance(other, Model) or self._hash != other._hash:
+            return False
+        return _nonempty(self.predicate_extensions) == _nonempty(other.predicate_extensions) and \
+            _function_data(self.function_extensions) == _function_data(other.function_extensions)
 
     def __hash__(self):
-        # TODO Improve the performance of this
-        return hash(str(self))
-
-    # def __eq__(self, other):
-    #     return self.__class__ is other.__class__ and self._data() == other._data()
-    #
-    # def __hash__(self):
-    #     return hash(self._data())
-
-    # def _data(self):
-    #     preds, funcs, _ = self.vocabulary
-    #     components = (preds, funcs)
-    #     for p in preds:
-    #         extension = self.predicate_extensions.get(p, set())
-    #         components += tuple(frozenset(unwrap_to_name(x) for x in extension))
-    #
-    #     for f in funcs:
-    #         extension = self.function_extensions.get(f, ExtensionalFunctionDefinition())
-    #         components += tuple(frozenset(unwrap_to_name(point) + (str(value.expr), )
-    #                                       for point, value in extension.data.items()))
-    #     return components
+        return self._hash
+
+    def __getstate__(self):
+        # The hash depends on the (per-process salted) hashes of strings, and the indexes are hashed by it as well,
+        # hence neither of them is valid in other processes
+        state = self.__dict__.copy()
+        state['_hash'] = 0
+        state['_indexes'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.recompute_hash()
+
+    def recompute_hash(self):
+        """ Recompute from scratch the hash of the model. The hash is maintained incrementally by all methods that
+        modify the model (`add`, `remove`, `discard`, `set`...), so this is only necessary if the extension
+        dictionaries have been directly manipulated. """
+        self._hash = 0
+        for signature, extension in self.predicate_extensions.items():
+            for point in extension:
+                self._hash ^= hash((signature, point))
+        for signature, definition in self.function_extensions.items():
+            if isinstance(definition, ExtensionalFunctionDefinition):
+                for point, value in definition.data.items():
+                    self._hash ^= hash((signature, point, value.hash()))
 
     def set(self, term: CompoundTerm, value: Union[Constant, int, float], *args):
         """ Set the value of the interpretation on the given term to be equal to `value`. """
@@ -92,12 +148,18 @@ class Model:
         for st in term.subterms:
             if not isinstance(st, Constant):
                 raise err.SemanticError(f"Model.set(): subterms of '{term}' need to be constants")
-        point, value = _check_assignment(term.symbol, tuple(term.subterms), value)
-        definition = self.function_extensions.setdefault(term.symbol.signature, ExtensionalFunctionDefinition())
+        point, constant = _check_assignment(term.symbol, tuple(term.subterms), value)
+        signature = term.symbol.signature
+        definition = self.function_extensions.setdefault(signature, ExtensionalFunctionDefinition())
         if not isinstance(definition, ExtensionalFunctionDefinition):
             raise err.SemanticError("Cannot define extension of intensional definition")
 
-        definition.set(point, value)
+        point = wrap_tuple(point)
+        previous = definition.data.get(point)
+        if previous is not None:
+            self._hash ^= hash((signature, point, previous.hash()))
+        definition.data[point] = constant
+        self._hash ^= hash((signature, point, constant.hash()))
 
     def add(self, predicate, *args):
         """ """
@@ -111,20 +173,129 @@ class Model:
         if predicate.builtin:
             raise err.SemanticError(f"Model.add() attempted to redefine builtin symbol '{predicate}'")
         point, _ = _check_assignment(predicate, args)
-        definition = self.predicate_extensions.setdefault(predicate.signature, set())
-        definition.add(wrap_tuple(point))
+        signature = predicate.signature
+        definition = self.predicate_extensions.setdefault(signature, set())
+        point = wrap_tuple(point)
+        if point not in definition:
+            definition.add(point)
+            self._hash ^= hash((signature, point))
+            self._update_indexes(signature, point, True)
+
+    def add_many(self, predicate: Predicate, points):
+        """ Add each of the given points, i.e. tuples of constants, to the extension of the given predicate.
+        Equivalent to calling `add(predicate, *point)` for each point, but much faster on large numbers of points (e.g.
+        when loading the initial state of a large problem), as each distinct constant is checked against the sort of
+        each argument position only once, and the extension is updated in one single pass. """
+        if not isinstance(predicate, Predicate):
+            raise err.SemanticError("Model.add_many() can only set the value of predicate symbols")
+        if predicate.builtin:
+            raise err.SemanticError(f"Model.add_many() attempted to redefine builtin symbol '{predicate}'")
+        checker = _BulkAssignmentChecker(predicate)
+        signature = predicate.signature
+        definition = self.predicate_extensions.setdefault(signature, set())
+        added = []
+        for point in points:
+            point = checker.check(point)
+            if point not in definition:
+                definition.add(point)
+                added.append(point)
+                self._hash ^= hash((signature, point))
+        if self._indexes:
+            for point in added:
+                self._update_indexes(signature, point, True)
+
+    def set_many(self, function: Function, assignments):
+        """ Set the value of the given function on each of the given pairs (point, value), where point is a tuple of
+        constants. Equivalent to calling `set(function(*point), value)` for each pair, but much faster on large numbers
+        of pairs, as each distinct constant is checked against the sort of each argument position only once. """
+        if not isinstance(function, Function):
+            raise err.SemanticError("Model.set_many() can only set the value of function symbols")
+        if function.builtin:
+            raise err.SemanticError(f"Model.set_many() attempted to redefine builtin symbol '{function}'")
+        checker = _BulkAssignmentChecker(function)
+        signature = function.signature
+        definition = self.function_extensions.setdefault(signature, ExtensionalFunctionDefinition())
+        if not isinstance(definition, ExtensionalFunctionDefinition):
+            raise err.SemanticError("Cannot define extension of intensional definition")
+
+        data = definition.data
+        for point, value in assignments:
+            point = checker.check(tuple(point) + (value, ))
+            point, value = point[:-1], point[-1].expr
+            previous = data.get(point)
+            if previous is not None:
+                self._hash ^= hash((signature, point, previous.hash()))
+            data[point] = value
+            self._hash ^= hash((signature, point, value.hash()))
 
     def remove(self, predicate: Predicate, *args):
         """ Remove a given point from the extension of a predicate.
         Raises exception if the extension does not contain the point. """
-        self.predicate_extensions[predicate.signature].remove(wrap_tuple(args))
+        signature, point = predicate.signature, wrap_tuple(args)
+        self.predicate_extensions[signature].remove(point)
+        self._hash ^= hash((signature, point))
+        self._update_indexes(signature, point, False)
 
     def discard(self, predicate: Predicate, *args):
         """ Remove a given point from the extension of a predicate.
         Does not raise any exception if the extension does not contain the point. """
-        ext = self.predicate_extensions.get(predicate.signature)
-        if ext is not None:
-            ext.discard(wrap_tuple(args))
+        signature = predicate.signature
+        ext = self.predicate_extensions.get(signature)
+        point = wrap_tuple(args)
+        if ext is not None and point in ext:
+            ext.remove(point)
+            self._hash ^= hash((signature, point))
+            self._update_indexes(signature, point, False)
+
+    def _update_indexes(self, signature, point, added):
+        for (sig, positions), index in self._indexes.items():
+            if sig == signature:
+                key = tuple(point[i] for i in positions)
+                if added:
+                    index.setdefault(key, set()).add(point)
+                else:
+                    index.get(key, set()).discard(point)
+
+    def invalidate_indexes(self):
+        """ Drop all secondary indexes over predicate extensions. Indexes are maintained incrementally by all methods
+        that modify the model, so this is only necessary if the extension sets have been directly manipulated. """
+        self._indexes = {}
+
+    def match(self, predicate: Predicate, positions, key):
+        """ Return the (TermReference-wrapped) points in the extension of the given predicate whose values at the given
+        argument positions are the (TermReference-wrapped) values in `key`. A hash index on those positions is built
+        the first time they are queried, and maintained incrementally afterwards. """
+        signature = predicate.signature
+        extension = self.predicate_extensions.get(signature, set())
+        if not positions:
+            return extension
+        if len(positions) == predicate.arity:
+            return (key, ) if key in extension else ()
+
+        index = self._indexes.get((signature, positions))
+        if index is None:
+            index = self._indexes[(signature, positions)] = {}
+            for point in extension:
+                index.setdefault(tuple(point[i] for i in positions), set()).add(point)
+        return index.get(key, ())
+
+    def query(self, predicate: Predicate, pattern):
+        """ Return a list with the tuples of constants in the extension of the given predicate that match the given
+        pattern, i.e. a tuple with one element per predicate argument, each being either a constant, which the
+        corresponding argument of the matching tuples must equal, or a wildcard (None or a variable). A variable
+        appearing more than once requires the corresponding arguments to be equal.
+        E.g. `model.query(on, (b1, None))` returns all tuples (b1, y) such that on(b1, y) holds in the model. """
+        if len(pattern) != predicate.arity:
+            raise err.ArityMismatch(predicate, pattern)
+        positions = tuple(i for i, x in enumerate(pattern) if isinstance(x, Constant))
+        key = tuple(symref(pattern[i]) for i in positions)
+        variables: Dict[Any, List[int]] = {}
+        for i, x in enumerate(pattern):
+            if isinstance(x, Variable):
+                variables.setdefault(symref(x), []).append(i)
+        repeated = [idxs for idxs in variables.values() if len(idxs) > 1]
+        return [unwrap_tuple(point) for point in self.match(predicate, positions, key)
+                if all(all(point[i] == point[idxs[0]] for i in idxs[1:]) for idxs in repeated)]
 
     def value(self, fun: Function, point):
         """ Return the value of the given function on the given point in the current model """
@@ -204,8 +375,11 @@ class Model:
         signature = symbol.signature
         if signature in self.function_extensions:
             del self.function_extensions[signature]
+            self.recompute_hash()
         elif signature in self.predicate_extensions:
             del self.predicate_extensions[signature]
+            self.recompute_hash()
+            self.invalidate_indexes()
 
 
 def create(lang, evaluator=None):
@@ -232,6 +406,19 @@ class ExtensionalFunctionDefinition:
         yield from self.data.items()
 
 
+def _nonempty(extensions):
+    """ Return the given extension dictionary without the entries of symbols with empty extension. """
+    return {k: ext for k, ext in extensions.items() if ext}
+
+
+def _function_data(extensions):
+    """ Return a representation of the given function extensions amenable to comparison, where values are unwrapped
+    into their symbols, as the Term equality operator is reserved to construct atoms. """
+    return {k: {point: value.symbol for point, value in definition.data.items()}
+            for k, definition in extensions.items()
+            if isinstance(definition, ExtensionalFunctionDefinition) and len(definition) > 0}
+
+
 def wrap_tuple(tup):
     """ Create a tuple of Term references from a tuple of terms """
     return tuple(symref(a) for a in tup)
@@ -1,5 +1,7 @@
 
 from .asp import create_reachability_lp
-from .clingo_wrapper import run_clingo, parse_model
+from .clingo_wrapper import run_clingo, run_clingo_in_process, parse_model, clingo_module_available
+from .datalog import DatalogEngine, run_datalog
 
-__all__ = ['create_reachability_lp', 'run_clingo', 'parse_model']
+__all__ = ['create_reachability_lp', 'run_clingo', 'run_clingo_in_process', 'parse_model',
+           'clingo_module_available', 'DatalogEngine', 'run_datalog']
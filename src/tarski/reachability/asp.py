@@ -7,11 +7,12 @@ from ..fstrips.action import AdditiveActionCost
 from ..syntax.transform import remove_quantifiers, QuantifierEliminationMode
 from ..syntax.builtins import symbol_complements
 from ..syntax.ops import free_variables
-from ..syntax import Formula, Atom, CompoundFormula, Connective, Term, Variable, Constant, Tautology, \
+from ..syntax import Formula, Atom, CompoundFormula, Connective, Term, Variable, Constant, Tautology, Contradiction, \
     BuiltinPredicateSymbol, QuantifiedFormula, Quantifier, CompoundTerm
 from ..syntax.sorts import parent, Interval
 from ..fstrips import Problem, SingleEffect, AddEffect, DelEffect, FunctionalEffect
 from ..fstrips.representation import identify_cost_related_functions, expand_universal_effect
+from ..evaluators import StaticLayout
 
 GOAL = "goal"
 
@@ -41,6 +42,11 @@ class ReachabilityLPCompiler:
         self.include_variable_inequalities = include_variable_inequalities
         self.include_action_costs = include_action_costs
         self.tr = Translator()
+        # The static extensions allow pruning the expansion of universally-quantified formulas
+        # pylint: disable=import-outside-toplevel  # Avoiding circular references
+        from ..grounding.ops import approximate_symbol_fluency
+        _, static_symbols = approximate_symbol_fluency(problem)
+        self.layout = None if problem.init is None else StaticLayout(problem.init, static_symbols)
 
     def gen_aux_atom(self, args=None):
         """ Return a new auxiliary atom with the given arguments """
@@ -98,7 +104,7 @@ class ReachabilityLPCompiler:
 
     def process_goal(self, goal, lang, lp):
         # Process goal, e.g. "goal :- on(a,b), on(b,c)." (note that the goal is always ground)
-        phi = remove_quantifiers(lang, goal, QuantifierEliminationMode.Forall)
+        phi = remove_quantifiers(lang, goal, QuantifierEliminationMode.Forall, layout=self.layout)
         body = self.process_formula(phi)
         lp.rule(self.lp_atom(GOAL), body)
 
@@ -113,7 +119,7 @@ class ReachabilityLPCompiler:
             self.process_action_cost(action, action_atom, body, lp)
 
         # Remove universal quantifiers and add precondition atoms to the body
-        phi = remove_quantifiers(lang, action.precondition, QuantifierEliminationMode.Forall)
+        phi = remove_quantifiers(lang, action.precondition, QuantifierEliminationMode.Forall, layout=self.layout)
         body += self.process_formula(phi)  # e.g. "clear(X), on(X, Y)"
         lp.rule(action_head, body)
         # Now process the effects
@@ -159,6 +165,9 @@ class ReachabilityLPCompiler:
         if isinstance(f, Tautology):
             return []
 
+        elif isinstance(f, Contradiction):
+            return [self.gen_aux_atom()]  # An auxiliary atom with no rules, which hence can never be derived
+
         elif isinstance(f, Atom):
             return [self.tarski_atom_to_lp_atom(f)]
 
@@ -231,7 +240,7 @@ class ReachabilityLPCompiler:
         assert isinstance(eff, SingleEffect)
         if isinstance(eff, AddEffect):
             head = self.tarski_atom_to_lp_atom(eff.atom)
-            condition = remove_quantifiers(lang, eff.condition, QuantifierEliminationMode.Forall)
+            condition = remove_quantifiers(lang, eff.condition, QuantifierEliminationMode.Forall, layout=self.layout)
             return head, self.process_formula(condition)
 
         if isinstance(eff, DelEffect):
@@ -282,7 +291,7 @@ class VariableOnlyReachabilityLPCompiler(ReachabilityLPCompiler):
         # Construct the part of the body corresponding to the parameter types, e.g. "object(X), block(Y)"
         prec_body = [self.lp_type_atom_from_term(v) for v in action.parameters]
         # Remove universal quantifiers and add precondition atoms to the body
-        phi = remove_quantifiers(lang, action.precondition, QuantifierEliminationMode.Forall)
+        phi = remove_quantifiers(lang, action.precondition, QuantifierEliminationMode.Forall, layout=self.layout)
         prec_body += self.process_formula(phi)
         # Now process the effects
         for eff in action.effects:
@@ -31,6 +31,46 @@ def get_gringo_command() -> List[str]:
     return [gringo]
 
 
+def clingo_module_available() -> bool:
+    """ Return whether the clingo Python bindings are installed, in which case logic programs can be grounded
+    in-process through the clingo API. """
+    return find_spec("clingo") is not None
+
+
+def run_clingo_in_process(lp, symbol_mapping):
+    """ Ground the given logic program in-process through the clingo Python API, and return its (unique) model in
+    the same format as `parse_model`, i.e. a dictionary mapping each (back-translated) predicate name to the set of
+    tuples of (back-translated) arguments of the atoms of that predicate in the model.
+    No temporary files or subprocesses are involved: the program is passed to clingo as a string, and the atoms of
+    the model are read directly off the clingo symbols. """
+    # pylint: disable=import-outside-toplevel
+    import clingo  # type: ignore
+
+    errlog = []
+
+    def logger(code, message):
+        if code != clingo.MessageCode.AtomUndefined:
+            errlog.append(message)
+
+    ctl = clingo.Control(["--models=1"], logger=logger)
+    program = "\n".join(str(r) for r in lp.rules + lp.directives)
+    try:
+        ctl.add("base", [], program)
+        ctl.ground([("base", [])])
+        symbols = []
+        ctl.solve(on_model=lambda m: symbols.extend(m.symbols(shown=True)))
+    except MemoryError:
+        raise OutOfMemoryError("Clingo ran out of memory while grounding the logic program") from None
+    except RuntimeError as e:
+        raise ExternalCommandError(f"Unknown Clingo error: {e}. Full error log: {''.join(errlog)}") from None
+
+    tr = symbol_mapping
+    model = defaultdict(set)
+    for symbol in symbols:
+        model[tr.back(symbol.name)].add(tuple(tr.back(str(arg)) for arg in symbol.arguments))
+    return model
+
+
 def run_clingo(lp):
     gringo_command = get_gringo_command()
 
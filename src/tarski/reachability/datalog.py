@@ -0,0 +1,317 @@
+"""
+    A native semi-naive, bottom-up evaluator for the (Datalog) logic programs generated by `create_reachability_lp`,
+    to be used as an alternative to gringo when clingo is not available.
+
+    The evaluation follows the "one fact at a time" semi-naive strategy used e.g. by the Fast Downward translator
+    (see Helmert, M. (2009). Concise finite-domain representations for PDDL planning tasks. AIJ 173, 503-535):
+    facts are processed in the order in which they are derived, and each new fact is joined only with the facts
+    processed before it, through hash indexes on the argument positions bound at each step of a precomputed join plan.
+"""
+import operator
+import re
+from collections import defaultdict, deque
+
+from .asp import LPAtom
+
+_BUILTINS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": lambda x, y: _order_key(x) < _order_key(y),
+    "<=": lambda x, y: _order_key(x) <= _order_key(y),
+    ">": lambda x, y: _order_key(x) > _order_key(y),
+    ">=": lambda x, y: _order_key(x) >= _order_key(y),
+}
+
+# The infix builtins, sorted so that longer operators are matched first
+_INFIX = sorted(_BUILTINS.keys(), key=len, reverse=True)
+
+# The predicate symbols and (non-nested) terms supported by the engine
+_SYMBOL = re.compile(r"_*[a-z][A-Za-z0-9_']*")
+_TERM = re.compile(r"-?[0-9]+|\"[^\"]*\"|[A-Za-z_][A-Za-z0-9_']*")
+
+
+def _order_key(value):
+    """ Sort numbers before symbolic constants, and these before strings, as clingo does. """
+    if value.lstrip('-').isdigit():
+        return 0, int(value), ''
+    return (2 if value.startswith('"') else 1), 0, value
+
+
+def is_lp_variable(token: str):
+    """ Return whether the given token denotes an LP variable, i.e. starts with an uppercase letter or underscore """
+    return token[0].isupper() or token[0] == '_'
+
+
+def _split_top_level(text: str):
+    """ Split the given text on the commas that are not nested within parentheses or quotes """
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_lp_atom(text: str):
+    """ Parse an LP atom in the textual form produced by LPAtom, e.g. "atom_on(X, b1)" or "X != Y". Any other kind of
+    literal, e.g. negated literals or aggregates, is rejected, as the engine only supports (positive) Datalog. """
+    text = text.strip()
+    if '(' not in text:
+        for op in _INFIX:
+            lhs, found, rhs = text.partition(op)
+            if found and lhs and rhs and rhs[0] not in '=<>':
+                return _check_lp_atom(text, LPAtom(op, [lhs.strip(), rhs.strip()], infix=True))
+        return _check_lp_atom(text, LPAtom(text))
+
+    if not text.endswith(')'):
+        raise RuntimeError(f'Unexpected LP atom "{text}"')
+    symbol, _, arguments = text[:-1].partition('(')
+    args = _split_top_level(arguments)
+    if any('(' in arg for arg in args):
+        raise RuntimeError(f'Nested terms such as those in "{text}" are not supported by the Datalog engine')
+    return _check_lp_atom(text, LPAtom(symbol.strip(), args))
+
+
+def _check_lp_atom(text, atom):
+    if (not atom.infix and not _SYMBOL.fullmatch(atom.symbol)) or not all(_TERM.fullmatch(t) for t in atom.args):
+        raise RuntimeError(f'LP literal "{text}" is not supported by the Datalog engine')
+    return atom
+
+
+def parse_lp_rule(rule: str):
+    """ Parse an LP rule in the textual form produced by LogicProgram, e.g. "p(X) :- q(X, Y), r(Y).", and return
+    a pair with the head and the list of body atoms. """
+    text = rule.strip()
+    if not text.endswith('.'):
+        raise RuntimeError(f'Unexpected LP rule "{rule}"')
+    head, _, body = text[:-1].partition(':-')
+    return parse_lp_atom(head), [parse_lp_atom(b) for b in _split_top_level(body)]
+
+
+class _Relation:
+    """ The facts of a given predicate, along with hash indexes over the facts processed so far, each index mapping
+    the values at some fixed argument positions to the list of matching facts. """
+    def __init__(self):
+        self.known = set()
+        self.processed = []
+        self.indexes = {}
+
+    def index(self, positions):
+        if positions not in self.indexes:
+            self.indexes[positions] = defaultdict(list)
+        return self.indexes[positions]
+
+    def process(self, fact):
+        self.processed.append(fact)
+        for positions, index in self.indexes.items():
+            index[tuple(fact[p] for p in positions)].append(fact)
+
+
+class _Step:
+    """ A step of a join plan. If `relation` is None, the step is a filter evaluating some builtin comparison
+    `op(lhs, rhs)`; otherwise it retrieves the processed facts of the relation whose values at the given `positions`
+    are given by `key`, binding the variables in `binds` and checking the equalities in `checks`.
+    Terms are represented as pairs (slot, value), where value is only used for constants, i.e. if slot is None. """
+    __slots__ = ('relation', 'positions', 'key', 'binds', 'checks', 'op', 'lhs', 'rhs')
+
+    def __init__(self, relation=None, positions=(), key=(), binds=(), checks=(), op=None, lhs=None, rhs=None):
+        self.relation = relation
+        self.positions = positions
+        self.key = key
+        self.binds = binds
+        self.checks = checks
+        self.op = op
+        self.lhs = lhs
+        self.rhs = rhs
+
+
+def _value(term, env):
+    slot, value = term
+    return value if slot is None else env[slot]
+
+
+class DatalogEngine:
+    """ A bottom-up Datalog evaluator for a LogicProgram whose rules are positive Datalog rules, possibly with
+    builtin comparisons (=, !=, <, etc.) in their bodies. Facts can be consumed in a streaming fashion, as they are
+    derived, through `facts()`, or all at once through `solve()`.
+
+    For each rule and each positive body atom, a join plan is precomputed that starts from that atom, i.e. from
+    a newly processed fact matching it, and greedily joins next the body atom with most bound arguments, evaluating
+    builtin comparisons as soon as their variables are bound.
+    """
+    def __init__(self, lp):
+        if lp.directives:
+            raise RuntimeError('The Datalog engine does not support logic program directives')
+        self.relations = defaultdict(_Relation)
+        # Map each relation key (symbol, arity) to a list of tuples (pattern, plan, nvars, head_key, head_terms)
+        self.triggers = defaultdict(list)
+        self.initial = []
+        for rule in lp.rules:
+            self._compile_rule(*parse_lp_rule(rule))
+
+    def _compile_rule(self, head, body):
+        positive = [atom for atom in body if not atom.infix]
+        builtins = [atom for atom in body if atom.infix]
+
+        variables = {}
+        for atom in positive:
+            for arg in atom.args:
+                if is_lp_variable(arg):
+                    variables.setdefault(arg, len(variables))
+
+        def term(arg):
+            if not is_lp_variable(arg):
+                return None, arg
+            if arg not in variables:
+                raise RuntimeError(f'Unsafe variable "{arg}" in LP rule "{head} :- {body}"')
+            return variables[arg], None
+
+        head_key = (head.symbol, len(head.args))
+        head_terms = tuple(term(arg) for arg in head.args)
+        filters = [(_BUILTINS[b.symbol], term(b.args[0]), term(b.args[1]), b) for b in builtins]
+
+        if not positive:
+            # All terms are constants (otherwise the variables would be unsafe), so we can evaluate the rule right away
+            if all(op(lhs[1], rhs[1]) for op, lhs, rhs, _ in filters):
+                self.initial.append((head_key, tuple(value for _, value in head_terms)))
+            return
+
+        for i, trigger in enumerate(positive):
+            pattern = self._create_step(trigger, variables, set(), indexed=False)
+            bound = {variables[arg] for arg in trigger.args if is_lp_variable(arg)}
+            plan = self._create_plan([a for j, a in enumerate(positive) if j != i], filters, variables, bound)
+            self.triggers[(trigger.symbol, len(trigger.args))].append(
+                (pattern, plan, len(variables), head_key, head_terms))
+
+    def _create_plan(self, atoms, filters, variables, bound):
+        """ Greedily order the given body atoms and builtin filters, assuming the variables in `bound` are bound. """
+        plan, pending = [], list(filters)
+        atoms = list(atoms)
+        while True:
+            ready = [f for f in pending if all(t[0] is None or t[0] in bound for t in f[1:3])]
+            for op, lhs, rhs, b in ready:
+                pending.remove((op, lhs, rhs, b))
+                plan.append(_Step(op=op, lhs=lhs, rhs=rhs))
+            if not atoms:
+                break
+
+            def nbound(atom):
+                return sum(1 for arg in atom.args if not is_lp_variable(arg) or variables[arg] in bound)
+            best = max(atoms, key=lambda a: (nbound(a), -len(a.args)))
+            atoms.remove(best)
+            plan.append(self._create_step(best, variables, bound))
+            bound.update(variables[arg] for arg in best.args if is_lp_variable(arg))
+
+        assert not pending  # All variables are bound at the end, as the rule is safe
+        return plan
+
+    def _create_step(self, atom, variables, bound, indexed=True):
+        """ Create the join step for the given atom, assuming the given variables are bound. """
+        positions, key, binds, checks = [], [], [], []
+        newly_bound = set()
+        for pos, arg in enumerate(atom.args):
+            if not is_lp_variable(arg):
+                positions.append(pos)
+                key.append((None, arg))
+                continue
+            slot = variables[arg]
+            if slot in bound:
+                positions.append(pos)
+                key.append((slot, None))
+            elif slot in newly_bound:
+                checks.append((pos, slot))
+            else:
+                newly_bound.add(slot)
+                binds.append((pos, slot))
+        relation = self.relations[(atom.symbol, len(atom.args))]
+        positions = tuple(positions)
+        if positions and indexed:
+            relation.index(positions)
+        return _Step(relation, positions, tuple(key), tuple(binds), tuple(checks))
+
+    def facts(self):
+        """ Iterate over all facts of the minimal model of the program, as pairs (symbol, args), in the order in which
+        they are derived. Derivation happens lazily, as the facts are consumed. """
+        relations, triggers = self.relations, self.triggers
+        queue = deque()
+        for key, fact in self.initial:
+            if fact not in relations[key].known:
+                relations[key].known.add(fact)
+                queue.append((key, fact))
+
+        derived = []
+        while queue:
+            key, fact = queue.popleft()
+            relations[key].process(fact)
+            yield key[0], fact
+
+            for pattern, plan, nvars, head_key, head_terms in triggers.get(key, ()):
+                env = [None] * nvars
+                if self._match(pattern, fact, env):
+                    self._join(plan, 0, env, head_terms, derived)
+                if derived:
+                    known = relations[head_key].known
+                    for new in derived:
+                        if new not in known:
+                            known.add(new)
+                            queue.append((head_key, new))
+                    derived.clear()
+
+    def solve(self):
+        """ Compute the minimal model of the program, as a dictionary mapping each predicate symbol to the set of
+        tuples of arguments of the facts of that predicate. """
+        model = defaultdict(set)
+        for symbol, args in self.facts():
+            model[symbol].add(args)
+        return model
+
+    @staticmethod
+    def _match(step, fact, env):
+        for pos, term in zip(step.positions, step.key):
+            if fact[pos] != _value(term, env):
+                return False
+        for pos, slot in step.binds:
+            env[slot] = fact[pos]
+        return all(fact[pos] == env[slot] for pos, slot in step.checks)
+
+    def _join(self, plan, k, env, head_terms, derived):
+        if k == len(plan):
+            derived.append(tuple(_value(t, env) for t in head_terms))
+            return
+
+        step = plan[k]
+        if step.relation is None:
+            if step.op(_value(step.lhs, env), _value(step.rhs, env)):
+                self._join(plan, k + 1, env, head_terms, derived)
+            return
+
+        if step.positions:
+            candidates = step.relation.indexes[step.positions].get(tuple(_value(t, env) for t in step.key), ())
+        else:
+            candidates = step.relation.processed
+
+        for fact in candidates:
+            for pos, slot in step.binds:
+                env[slot] = fact[pos]
+            if all(fact[pos] == env[slot] for pos, slot in step.checks):
+                self._join(plan, k + 1, env, head_terms, derived)
+
+
+def run_datalog(lp, symbol_mapping):
+    """ Compute the minimal model of the given logic program with the native Datalog engine, and return it in the same
+    format as `parse_model`, i.e. a dictionary mapping each (back-translated) predicate name to the set of tuples of
+    (back-translated) arguments of the atoms of that predicate in the model. """
+    tr = symbol_mapping
+    model = defaultdict(set)
+    for symbol, args in DatalogEngine(lp).facts():
+        model[tr.back(symbol)].add(tuple(tr.back(arg) for arg in args))
+    return model
@@ -11,4 +11,5 @@ from collections import namedtuple
 
 
 Schema = namedtuple('Schema', ['name', 'variables', 'constraints', 'transitions'])
-Action = namedtuple('Action', ['name', 'arguments', 'transitions'])
+Action = namedtuple('Action', ['name', 'arguments', 'transitions', 'cost'])
+Action.__new__.__defaults__ = (1, )  # Unit cost by default
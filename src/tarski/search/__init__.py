@@ -1,3 +1,8 @@
 
 from .model import SearchModel, GroundForwardSearchModel
-from .blind import BreadthFirstSearch
+from .blind import BreadthFirstSearch, SearchStats, extract_plan
+from .bestfirst import BestFirstSearch, GreedyBestFirstSearch, AStarSearch, WeightedAStarSearch
+from .state import StateLayout, PackedState, create_state_layout
+from .compilation import CompiledOperator, CompiledCondition, compile_operator, compile_operators, compile_condition
+from .successor_generator import SuccessorGenerator, create_successor_generator
+from .heuristics import HMaxHeuristic, HAddHeuristic, HFFHeuristic
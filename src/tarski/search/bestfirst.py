@@ -0,0 +1,198 @@
+"""
+ Heuristic best-first search engines: Greedy Best-First Search, A* and Weighted A*.
+"""
+import heapq
+import logging
+import math
+from collections import deque
+from itertools import count
+
+from .blind import SearchSpace, SearchStats, SearchNode, make_root_node, extract_plan
+from .model import GroundForwardSearchModel
+
+
+class HeapOpenList:
+    """ An open list backed by a binary heap. Entries with equal priority are popped in FIFO order. """
+    def __init__(self):
+        self.heap = []
+        self.counter = count()
+
+    def push(self, priority, node):
+        heapq.heappush(self.heap, (priority, next(self.counter), node))
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class BucketOpenList:
+    """ An open list with one FIFO bucket per priority value, to be used when priorities are (small) non-negative
+    integers, e.g. on unit-cost problems with integer heuristics. Priorities can be tuples, in which case only the first
+    component is used to select the bucket, and ties are broken in FIFO order. """
+    def __init__(self):
+        self.buckets = []
+        self.lowest = 0
+        self.size = 0
+
+    def push(self, priority, node):
+        key = priority[0] if isinstance(priority, tuple) else priority
+        if key != int(key) or key < 0:
+            raise ValueError(f'BucketOpenList requires non-negative integer priorities, got "{priority}"')
+        key = int(key)
+        while len(self.buckets) <= key:
+            self.buckets.append(deque())
+        self.buckets[key].append(node)
+        self.lowest = min(self.lowest, key)
+        self.size += 1
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError('pop from empty BucketOpenList')
+        while not self.buckets[self.lowest]:
+            self.lowest += 1
+        self.size -= 1
+        return self.buckets[self.lowest].popleft()
+
+    def __len__(self):
+        return self.size
+
+
+def create_open_list(kind):
+    if kind == 'heap':
+        return HeapOpenList()
+    if kind == 'bucket':
+        return BucketOpenList()
+    raise ValueError(f'Unknown open list type "{kind}"')
+
+
+def blind_heuristic(state):  # pylint: disable=unused-argument
+    """ The blind heuristic, which returns 0 for every state. """
+    return 0
+
+
+class BestFirstSearch:
+    """ A generic (eager) best-first search, which always expands the open node with lowest priority, as given by
+    the `priority(g, h)` function. Subclasses implement the particular search strategies.
+
+    :param model: The search model.
+    :param heuristic: A callable that returns the heuristic value of a given state, or None or math.inf if the
+                      state is recognized as a dead end.
+    :param open_list: Either "heap" (the default) or "bucket", the latter requiring integer priorities.
+    :param reopen: Whether to reopen closed nodes when reached through a cheaper path.
+    :param max_expansions: The maximum number of expansions, or -1 if unlimited.
+    """
+    def __init__(self, model: GroundForwardSearchModel, heuristic=None, open_list='heap', reopen=True,
+                 max_expansions=-1):
+        self.model = model
+        self.heuristic = heuristic if heuristic is not None else blind_heuristic
+        self.open_list = open_list
+        self.reopen = reopen
+        self.max_expansions = max_expansions
+
+    def priority(self, g, h):
+        raise NotImplementedError()
+
+    def run(self):
+        return self.search(self.model.init())
+
+    def search(self, root):
+        space = SearchSpace()
+        stats = SearchStats()
+        openlist = create_open_list(self.open_list)
+        heuristic, model = self.heuristic, self.model
+
+        hvalues = {}  # A cache of heuristic values, so that each state is evaluated only once
+        best_g = {}  # The best known cost of reaching each state generated so far
+        closed = set()
+
+        def evaluate(state):
+            h = hvalues.get(state)
+            if h is None:
+                stats.nevaluations += 1
+                h = heuristic(state)
+                hvalues[state] = h = math.inf if h is None else h
+            return h
+
+        h0 = evaluate(root)
+        if h0 != math.inf:
+            openlist.push(self.priority(0, h0), make_root_node(root))
+            best_g[root] = 0
+
+        while openlist:
+            stats.iterations += 1
+            node = openlist.pop()
+            state = node.state
+            if node.g > best_g[state] or (state in closed and not self.reopen):
+                continue  # A stale entry of a node that has been reached since through a cheaper path
+
+            if model.is_goal(state):
+                stats.num_goals += 1
+                space.plan = extract_plan(node)
+                logging.info(f"Goal found after {stats.nexpansions} expansions, plan cost: {node.g}.")
+                stats.stop()
+                return space, stats
+
+            if 0 <= self.max_expansions <= stats.nexpansions:
+                logging.info(f"Max. expansions reached. # expanded: {stats.nexpansions}.")
+                stats.stop()
+                return space, stats
+
+            closed.add(state)
+            stats.nexpansions += 1
+            for operator, successor in model.successors(state):
+                stats.ngenerated += 1
+                g = node.g + model.cost(operator)
+                previous = best_g.get(successor)
+                if previous is not None and previous <= g:
+                    continue  # Duplicate that does not improve the cost
+
+                if successor in closed:
+                    if not self.reopen:
+                        continue
+                    closed.discard(successor)
+                    stats.nreopened += 1
+
+                h = evaluate(successor)
+                if h == math.inf:
+                    continue  # Dead end
+                best_g[successor] = g
+                openlist.push(self.priority(g, h), SearchNode(successor, node, operator, g))
+
+            stats.peak_open = max(stats.peak_open, len(openlist))
+            stats.peak_closed = max(stats.peak_closed, len(closed))
+
+        logging.info(f"Search space exhausted without finding a plan. # expanded: {stats.nexpansions}.")
+        space.complete = True
+        stats.stop()
+        return space, stats
+
+
+class GreedyBestFirstSearch(BestFirstSearch):
+    """ Greedy Best-First Search, which orders open nodes by their heuristic value, breaking ties by g-value.
+    By default, closed nodes are not reopened. """
+    def __init__(self, model: GroundForwardSearchModel, heuristic=None, open_list='heap', reopen=False,
+                 max_expansions=-1):
+        super().__init__(model, heuristic, open_list, reopen, max_expansions)
+
+    def priority(self, g, h):
+        return h, g
+
+
+class AStarSearch(BestFirstSearch):
+    """ A* search, which orders open nodes by f = g + h, breaking ties in favor of lower h-values. The plan found is
+    optimal if the heuristic is admissible (and closed nodes are reopened, or the heuristic is consistent). """
+    def priority(self, g, h):
+        return g + h, h
+
+
+class WeightedAStarSearch(BestFirstSearch):
+    """ Weighted A* search, which orders open nodes by f = g + w * h, breaking ties in favor of lower h-values. """
+    def __init__(self, model: GroundForwardSearchModel, heuristic=None, weight=2, open_list='heap', reopen=True,
+                 max_expansions=-1):
+        super().__init__(model, heuristic, open_list, reopen, max_expansions)
+        self.weight = weight
+
+    def priority(self, g, h):
+        return g + self.weight * h, h
@@ -1,4 +1,5 @@
 import logging
+import time
 from collections import deque
 
 from .model import GroundForwardSearchModel
@@ -6,7 +7,8 @@ from .model import GroundForwardSearchModel
 
 class BreadthFirstSearch:
     """ Full expansion of a problem through Breadth-First search.
-    Note that ATM we return no plan.
+    The search does not stop at the first goal found, but the plan leading to that goal, which is optimal in terms
+    of plan length, is stored in the returned search space.
     """
     def __init__(self, model: GroundForwardSearchModel, max_expansions=-1):
         self.model = model
@@ -31,28 +33,38 @@ class BreadthFirstSearch:
             node = openlist.popleft()
             if self.model.is_goal(node.state):
                 stats.num_goals += 1
+                if space.plan is None:
+                    space.plan = extract_plan(node)
                 logging.info(f"Goal found after {stats.nexpansions} expansions. {stats.num_goals} goal states found.")
 
             if 0 <= self.max_expansions <= stats.nexpansions:
                 logging.info(f"Max. expansions reached. # expanded: {stats.nexpansions}, # goals: {stats.num_goals}.")
+                stats.stop()
                 return space, stats
 
             for operator, successor_state in self.model.successors(node.state):
+                stats.ngenerated += 1
                 if successor_state not in closed:
                     openlist.append(make_child_node(node, operator, successor_state))
                     closed.add(successor_state)
             stats.nexpansions += 1
+            stats.peak_open = max(stats.peak_open, len(openlist))
+            stats.peak_closed = len(closed)
 
         logging.info(f"Search space exhausted. # expanded: {stats.nexpansions}, # goals: {stats.num_goals}.")
         space.complete = True
+        stats.stop()
         return space, stats
 
 
 class SearchNode:
-    def __init__(self, state, parent, action):
+    __slots__ = ('state', 'parent', 'action', 'g')
+
+    def __init__(self, state, parent, action, g=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.g = g  # The accumulated cost of reaching the node from the root
 
 
 class SearchSpace:
@@ -61,6 +73,7 @@ class SearchSpace:
         self.nodes = set()
         self.last_node_id = 0
         self.complete = False  # Whether the state space contains all states reachable from the initial state
+        self.plan = None  # The list of operators leading to the (first) goal found, if any
     #
     # def expand(self, node: SearchNode):
     #     self.nodes.add(node)
@@ -71,6 +84,32 @@ class SearchStats:
         self.iterations = 0
         self.num_goals = 0
         self.nexpansions = 0
+        self.ngenerated = 0
+        self.nevaluations = 0
+        self.nreopened = 0
+        self.peak_open = 0  # The maximum size reached by the open list
+        self.peak_closed = 0  # The maximum number of states in the closed list
+        self.start_time = time.time()
+        self.end_time = None
+
+    def stop(self):
+        self.end_time = time.time()
+
+    def elapsed(self):
+        """ Return the elapsed search time, in seconds """
+        return (self.end_time or time.time()) - self.start_time
+
+    def expansions_per_second(self):
+        elapsed = self.elapsed()
+        return self.nexpansions / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f'SearchStats[expanded={self.nexpansions}, generated={self.ngenerated}, '
+                f'evaluated={self.nevaluations}, reopened={self.nreopened}, peak_open={self.peak_open}, '
+                f'peak_closed={self.peak_closed}, time={self.elapsed():.2f}s, '
+                f'expansions/s={self.expansions_per_second():.1f}]')
+
+    __repr__ = __str__
 
 
 def make_root_node(state):
@@ -78,6 +117,17 @@ def make_root_node(state):
     return SearchNode(state, None, None)
 
 
-def make_child_node(parent_node, action, state):
+def make_child_node(parent_node, action, state, cost=1):
     """ Construct an child search node """
-    return SearchNode(state, parent_node, action)
+    return SearchNode(state, parent_node, action, parent_node.g + cost)
+
+
+def extract_plan(node):
+    """ Return the list of actions that leads from the root of the search to the given node, following parent
+    pointers. """
+    plan = []
+    while node.parent is not None:
+        plan.append(node.action)
+        node = node.parent
+    plan.reverse()
+    return plan
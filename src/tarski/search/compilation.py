@@ -0,0 +1,200 @@
+"""
+ Compilation of ground STRIPS-like operators and conditions into flat lists of atom indexes over a StateLayout,
+ so that checking applicability and progressing packed states reduce to bitwise operations.
+"""
+from typing import List, Optional, Set, Tuple
+
+from ..evaluators.simple import evaluate
+from ..evaluators.compiled import compile_expression
+from ..fstrips import AddEffect, DelEffect
+from ..fstrips.representation import collect_literals_from_conjunction
+from ..syntax import Tautology, Contradiction, Constant
+from .operations import progress_packed_state
+from .state import StateLayout
+
+
+def _bitmask(indexes):
+    mask = 0
+    for idx in indexes:
+        mask |= 1 << idx
+    return mask
+
+
+class CompiledCondition:
+    """ A ground conjunction of literals compiled into the (sorted) indexes of the atoms that need to be true
+    (`pos`) and false (`neg`) for the condition to hold. Literals over static symbols are evaluated at compilation
+    time; if some of them is false, the condition is marked as unsatisfiable. """
+    def __init__(self, pos, neg, satisfiable=True):
+        self.pos = tuple(sorted(pos))
+        self.neg = tuple(sorted(neg))
+        self.pos_mask = _bitmask(self.pos)
+        self.neg_mask = _bitmask(self.neg)
+        self.satisfiable = satisfiable
+
+    def holds(self, state):
+        """ Return whether the condition holds in the given packed state. """
+        atoms = state.atoms
+        return self.satisfiable and atoms & self.pos_mask == self.pos_mask and not atoms & self.neg_mask
+
+    def is_trivial(self):
+        return self.satisfiable and not self.pos and not self.neg
+
+    def __str__(self):
+        return f'CompiledCondition[pos={self.pos}, neg={self.neg}, satisfiable={self.satisfiable}]'
+
+    __repr__ = __str__
+
+
+def compile_condition(phi, layout: StateLayout):
+    """ Compile the given ground formula into a CompiledCondition over the given layout. Return None if the formula
+    is not a conjunction of ground literals, and hence cannot be compiled. """
+    if isinstance(phi, Tautology):
+        return CompiledCondition((), ())
+    if isinstance(phi, Contradiction):
+        return CompiledCondition((), (), satisfiable=False)
+
+    literals = collect_literals_from_conjunction(phi)
+    if literals is None:
+        return None
+
+    pos: Set[int] = set()
+    neg: Set[int] = set()
+    satisfiable = True
+    for atom, polarity in literals:
+        if not all(isinstance(t, Constant) for t in atom.subterms):
+            return None  # e.g. the atom contains some (possibly fluent) function term, or is not ground
+
+        if atom.predicate.builtin or not layout.is_fluent(atom.predicate):
+            if layout.static is None:
+                return None  # There is no denotation of the static symbols to check the atom against
+            satisfiable = satisfiable and evaluate(atom, layout.static) == polarity
+            continue
+
+        idx = layout.atom_index(atom.predicate, atom.subterms)
+        if idx is None:
+            # A fluent atom not indexed by the layout is false in every state
+            satisfiable = satisfiable and not polarity
+        else:
+            (pos if polarity else neg).add(idx)
+
+    if pos & neg:
+        satisfiable = False
+    return CompiledCondition(pos, neg, satisfiable)
+
+
+class CompiledOperator:
+    """ A ground STRIPS operator, possibly with negative preconditions and conditional effects, compiled into flat
+    tuples of atom indexes.
+
+    `pre` and `neg` are the indexes of the atoms required to be true and false, respectively; `adds` and `dels` the
+    indexes of the atoms added and deleted unconditionally, and `conditional` a tuple with one entry
+    (condition, adds, dels) per conditional effect, where the condition is a CompiledCondition.
+    Delete effects are applied before add effects, i.e. add-after-delete semantics are enforced.
+    """
+    def __init__(self, operator, precondition: CompiledCondition, adds, dels, conditional=()):
+        self.operator = operator
+        self.precondition = precondition
+        self.pre = precondition.pos
+        self.neg = precondition.neg
+        self.adds = tuple(sorted(adds))
+        self.dels = tuple(sorted(dels))
+        self.conditional = tuple((cond, tuple(sorted(a)), tuple(sorted(d))) for cond, a, d in conditional)
+
+        self.pre_mask = precondition.pos_mask
+        self.neg_mask = precondition.neg_mask
+        self.add_mask = _bitmask(self.adds)
+        self.del_mask = _bitmask(self.dels)
+        self._conditional_masks = tuple((cond, _bitmask(a), _bitmask(d)) for cond, a, d in self.conditional)
+
+    def is_applicable(self, state):
+        atoms = state.atoms
+        return atoms & self.pre_mask == self.pre_mask and not atoms & self.neg_mask
+
+    def progress(self, state):
+        """ Return the progression of the given packed state through the operator. Note that this method does not check
+        that the operator is applicable. """
+        if not self._conditional_masks:
+            return state.successor(self.add_mask, self.del_mask)
+
+        add_mask, del_mask = self.add_mask, self.del_mask
+        for cond, adds, dels in self._conditional_masks:
+            if cond.holds(state):
+                add_mask |= adds
+                del_mask |= dels
+        return state.successor(add_mask, del_mask)
+
+    def __str__(self):
+        return f'CompiledOperator[{self.operator}]'
+
+    __repr__ = __str__
+
+
+class InterpretedOperator:
+    """ A wrapper offering the same interface as CompiledOperator for operators that cannot be compiled, which
+    simply relies on the standard formula evaluation machinery, on a precondition compiled into a closure. """
+    def __init__(self, operator, layout: Optional[StateLayout] = None):
+        self.operator = operator
+        self.precondition = compile_expression(operator.precondition, layout)
+
+    def is_applicable(self, state):
+        return self.precondition(state)
+
+    def progress(self, state):
+        return progress_packed_state(state, self.operator)
+
+    def __str__(self):
+        return f'InterpretedOperator[{self.operator}]'
+
+    __repr__ = __str__
+
+
+def compile_operator(operator, layout: StateLayout):
+    """ Compile the given ground operator into a CompiledOperator. Return None if the operator is not STRIPS-shaped,
+    i.e. if its precondition or some effect condition is not a conjunction of literals, or if it has effects other
+    than add and delete effects. The returned operator might have an unsatisfiable precondition if some static
+    precondition does not hold. """
+    precondition = compile_condition(operator.precondition, layout)
+    if precondition is None:
+        return None
+
+    adds: Set[int] = set()
+    dels: Set[int] = set()
+    conditional: List[Tuple[CompiledCondition, Tuple[int, ...], Tuple[int, ...]]] = []
+    for eff in operator.effects:
+        if not isinstance(eff, (AddEffect, DelEffect)) or \
+                not all(isinstance(t, Constant) for t in eff.atom.subterms):
+            return None
+
+        condition = compile_condition(eff.condition, layout)
+        if condition is None:
+            return None
+        if not condition.satisfiable:
+            continue
+
+        idx = layout.atom_index(eff.atom.predicate, eff.atom.subterms)
+        if idx is None:
+            if isinstance(eff, DelEffect):
+                continue  # Atoms not in the layout are false in any case
+            return None
+
+        if condition.is_trivial():
+            (adds if isinstance(eff, AddEffect) else dels).add(idx)
+        elif isinstance(eff, AddEffect):
+            conditional.append((condition, (idx, ), ()))
+        else:
+            conditional.append((condition, (), (idx, )))
+
+    return CompiledOperator(operator, precondition, adds, dels, conditional)
+
+
+def compile_operators(operators, layout: StateLayout):
+    """ Compile the given ground operators over the given layout. Operators that cannot be compiled are wrapped into
+    an InterpretedOperator; operators whose precondition is statically unsatisfiable are dropped. """
+    compiled = []
+    for op in operators:
+        c = compile_operator(op, layout)
+        if c is None:
+            compiled.append(InterpretedOperator(op, layout))
+        elif c.precondition.satisfiable:
+            compiled.append(c)
+    return compiled
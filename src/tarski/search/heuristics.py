@@ -0,0 +1,209 @@
+"""
+ Delete-relaxation heuristics (h_max, h_add, h_FF) over compiled ground operators.
+
+ See e.g. Bonet, B. & Geffner, H. (2001). Planning as heuristic search. AIJ 129, 5-33, and
+ Hoffmann, J. & Nebel, B. (2001). The FF planning system: Fast plan generation through heuristic search. JAIR 14.
+"""
+import heapq
+import math
+from typing import List, Tuple
+
+from .compilation import CompiledOperator
+from .model import GroundForwardSearchModel
+from .state import PackedState
+
+
+class _HeapQueue:
+    """ A priority queue for arbitrary non-negative costs. """
+    def __init__(self):
+        self.heap = []
+
+    def push(self, cost, atom):
+        heapq.heappush(self.heap, (cost, atom))
+
+    def pop(self):
+        return heapq.heappop(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+
+class _BucketQueue:
+    """ A monotone priority queue for integer costs, with one bucket per cost value. """
+    def __init__(self):
+        self.buckets = []
+        self.current = 0
+        self.size = 0
+
+    def push(self, cost, atom):
+        while len(self.buckets) <= cost:
+            self.buckets.append([])
+        self.buckets[cost].append(atom)
+        self.size += 1
+
+    def pop(self):
+        while not self.buckets[self.current]:
+            self.current += 1
+        self.size -= 1
+        return self.current, self.buckets[self.current].pop()
+
+    def __bool__(self):
+        return self.size > 0
+
+
+class DeleteRelaxationHeuristic:
+    """ Base class for heuristics based on the delete relaxation of a ground problem. The heuristic works on the
+    compiled operators of the given search model, which therefore needs to have been created with a StateLayout.
+    Each conditional effect of an operator is handled as a separate relaxed operator whose precondition is the union
+    of the operator precondition and the effect condition. Negative conditions are ignored.
+
+    Heuristic values are computed with a generalized Dijkstra exploration that keeps, for each relaxed operator,
+    a counter of unsatisfied preconditions; if all operator costs are integers, a bucket-based queue is used.
+    Instances are callable on packed states (or standard Models, which are packed on the fly), and return None
+    for states recognized as dead ends.
+    """
+    def __init__(self, model: GroundForwardSearchModel):
+        if model.layout is None or model.compiled is None:
+            raise RuntimeError('Delete-relaxation heuristics require a search model created with a StateLayout')
+        if model.goal is None:
+            raise RuntimeError(f'Cannot compute delete relaxation of non-STRIPS goal "{model.problem.goal}"')
+
+        self.layout = model.layout
+        self.num_atoms = len(self.layout.atoms)
+        self.goal = model.goal.pos
+        self.goal_reachable = model.goal.satisfiable
+
+        # The relaxed operators, in "structure of arrays" form
+        self.preconditions: List[Tuple[int, ...]] = []
+        self.effects: List[Tuple[int, ...]] = []
+        self.costs: List[float] = []
+        self.operators: List = []
+        for c in model.compiled:
+            if not isinstance(c, CompiledOperator):
+                raise RuntimeError(f'Cannot compute delete relaxation of non-STRIPS operator "{c.operator}"')
+            cost = model.cost(c.operator)
+            self._add_relaxed_operator(c.pre, c.adds, cost, c.operator)
+            for condition, adds, _ in c.conditional:
+                self._add_relaxed_operator(set(c.pre) | set(condition.pos), adds, cost, c.operator)
+
+        self.precondition_of: List[List[int]] = [[] for _ in range(self.num_atoms)]
+        for op, pre in enumerate(self.preconditions):
+            for atom in pre:
+                self.precondition_of[atom].append(op)
+        self.precondition_free = [op for op, pre in enumerate(self.preconditions) if not pre]
+        self.integer_costs = all(isinstance(c, int) and c >= 0 for c in self.costs)
+
+    def _add_relaxed_operator(self, pre, adds, cost, operator):
+        if adds:
+            self.preconditions.append(tuple(pre))
+            self.effects.append(tuple(adds))
+            self.costs.append(cost)
+            self.operators.append(operator)
+
+    def explore(self, state, use_max):
+        """ Run the generalized Dijkstra exploration from the given state, aggregating the cost of operator
+        preconditions through max (h_max) or sum (h_add). Return a tuple (costs, supporters) with the cost of each atom
+        (math.inf if unreachable) and the index of the relaxed operator that achieves it at that cost (its best
+        supporter), if any. The exploration stops as soon as the cost of all goal atoms is known. """
+        # pylint: disable=too-many-locals
+        inf = math.inf
+        costs = [inf] * self.num_atoms
+        supporters = [None] * self.num_atoms
+        closed = [False] * self.num_atoms
+        unsatisfied = [len(pre) for pre in self.preconditions]
+        accumulated = [0] * len(self.preconditions)
+        effects, opcosts, precondition_of = self.effects, self.costs, self.precondition_of
+        queue = _BucketQueue() if self.integer_costs else _HeapQueue()
+
+        for atom in state.true_atoms():
+            costs[atom] = 0
+            queue.push(0, atom)
+
+        def fire(op, value):
+            for atom in effects[op]:
+                if value < costs[atom]:
+                    costs[atom] = value
+                    supporters[atom] = op
+                    queue.push(value, atom)
+
+        for op in self.precondition_free:
+            fire(op, opcosts[op])
+
+        pending = set(self.goal)
+        while queue and pending:
+            cost, atom = queue.pop()
+            if closed[atom] or cost > costs[atom]:
+                continue
+            closed[atom] = True
+            pending.discard(atom)
+
+            for op in precondition_of[atom]:
+                unsatisfied[op] -= 1
+                if use_max:
+                    if cost > accumulated[op]:
+                        accumulated[op] = cost
+                else:
+                    accumulated[op] += cost
+                if unsatisfied[op] == 0:
+                    fire(op, accumulated[op] + opcosts[op])
+
+        return costs, supporters
+
+    def _pack(self, state):
+        return state if isinstance(state, PackedState) else PackedState.from_model(state, self.layout)
+
+    def __call__(self, state):
+        raise NotImplementedError()
+
+
+class HMaxHeuristic(DeleteRelaxationHeuristic):
+    """ The (admissible) h_max heuristic, the maximum cost of achieving any goal atom in the delete relaxation. """
+    def __call__(self, state):
+        if not self.goal_reachable:
+            return None
+        costs, _ = self.explore(self._pack(state), use_max=True)
+        value = max((costs[g] for g in self.goal), default=0)
+        return None if value == math.inf else value
+
+
+class HAddHeuristic(DeleteRelaxationHeuristic):
+    """ The (inadmissible) h_add heuristic, the sum of the costs of achieving each goal atom in the delete
+    relaxation. """
+    def __call__(self, state):
+        if not self.goal_reachable:
+            return None
+        costs, _ = self.explore(self._pack(state), use_max=False)
+        value = sum(costs[g] for g in self.goal)
+        return None if value == math.inf else value
+
+
+class HFFHeuristic(DeleteRelaxationHeuristic):
+    """ The FF heuristic, the cost of a relaxed plan extracted from the best supporters computed by h_add. """
+    def __call__(self, state):
+        plan = self.relaxed_plan(state)
+        return None if plan is None else sum(cost for _, cost in plan)
+
+    def relaxed_plan(self, state):
+        """ Return a relaxed plan for the given state as a list of (operator, cost) pairs, without any particular
+        order, or None if the goal is not reachable in the delete relaxation. """
+        if not self.goal_reachable:
+            return None
+        costs, supporters = self.explore(self._pack(state), use_max=False)
+        if any(costs[g] == math.inf for g in self.goal):
+            return None
+
+        plan = {}  # Maps the id of each operator in the plan to the pair (operator, cost)
+        marked = [False] * self.num_atoms
+        stack = list(self.goal)
+        while stack:
+            atom = stack.pop()
+            if marked[atom]:
+                continue
+            marked[atom] = True
+            op = supporters[atom]
+            if op is None:
+                continue  # The atom is true in the state
+            operator = self.operators[op]
+            plan.setdefault(id(operator), (operator, self.costs[op]))
+            stack.extend(self.preconditions[op])
+        return list(plan.values())
@@ -1,6 +1,11 @@
+from typing import Any, Dict, Optional
 
 from .operations import is_applicable, progress
+from .state import PackedState, StateLayout
+from .compilation import compile_operators, compile_condition
+from .successor_generator import SuccessorGenerator
 from ..evaluators.simple import evaluate
+from ..evaluators.compiled import compile_expression
 
 
 class SearchModel:
@@ -23,23 +28,58 @@ class GroundForwardSearchModel:
     reachability analysis or otherwise.
     Note that this is not a particularly performant search model, but rather intended for illustrative purposes
     and for use in low-performance environments.
+
+    If a StateLayout is given (see `create_state_layout`), the states of the model are represented as PackedState
+    objects, which are much cheaper to progress, hash and compare than standard Model objects, and all STRIPS-shaped
+    operators and goals are compiled into bitmasks over the layout (see `compile_operators`). Applicable operators
+    are then retrieved through a SuccessorGenerator instead of by checking each operator in turn.
     """
 
-    def __init__(self, problem, operators):
+    def __init__(self, problem, operators, layout: Optional[StateLayout] = None):
         self.problem = problem
         self.operators = operators
+        self.layout = layout
+        self.compiled = compile_operators(operators, layout) if layout is not None else None
+        self.generator = SuccessorGenerator(self.compiled) if layout is not None else None
+        self.goal = compile_condition(problem.goal, layout) if layout is not None else None
+        self.goal_evaluator = compile_expression(problem.goal, layout)
+        self._costs: Dict[Any, float] = {}  # Operator costs, indexed by the (identity-hashed) operator itself
 
     def init(self):
-        return self.problem.init
+        if self.layout is None:
+            return self.problem.init
+        return PackedState.from_model(self.problem.init, self.layout)
 
     def applicable(self, state):
         """ Return a generator with all ground operators that are applicable in the given state. """
+        if self.generator is not None and isinstance(state, PackedState):
+            return (c.operator for c in self.generator.applicable(state))
         return (op for op in self.operators if is_applicable(state, op))
 
     def successors(self, state):
         """ Return a generator with all tuples (op, successor) for successors of the given state. """
+        if self.generator is not None and isinstance(state, PackedState):
+            return ((c.operator, c.progress(state)) for c in self.generator.applicable(state))
         return ((op, progress(state, op)) for op in self.applicable(state))
 
     def is_goal(self, state):
         """ Return whether the given state is a goal"""
-        return evaluate(self.problem.goal, state)  # Just interpret the goal formula on the state
+        if self.goal is not None and isinstance(state, PackedState):
+            return self.goal.holds(state)
+        return self.goal_evaluator(state)  # Just interpret the (compiled) goal formula on the state
+
+    def cost(self, operator):
+        """ Return the cost of the given ground operator. Operators without cost information have unit cost, while
+        costs given by (static) function terms are evaluated on the initial state of the problem. """
+        cost = self._costs.get(operator)
+        if cost is None:
+            self._costs[operator] = cost = compute_operator_cost(operator, self.problem.init)
+        return cost
+
+
+def compute_operator_cost(operator, init):
+    """ Return the numeric cost of the given ground operator, evaluating its cost expression on the given model. """
+    cost = getattr(operator, 'cost', None)
+    if not cost:
+        return 1
+    return evaluate(cost.addend, init).symbol
@@ -4,6 +4,7 @@ from ..fstrips import AddEffect, DelEffect, FunctionalEffect, UniversalEffect
 from ..evaluators.simple import evaluate
 from ..fstrips.representation import substitute_expression
 from ..syntax.transform.substitutions import enumerate_substitutions
+from .state import PackedState
 
 
 def is_applicable(model, operator):
@@ -42,6 +43,9 @@ def progress(state, operator):
     """ Returns the progression of the given state along the effects of the given operator.
     Note that this method does not check that the operator is applicable.
     """
+    if isinstance(state, PackedState):
+        return progress_packed_state(state, operator)
+
     # TODO This is unnecessarily expensive, but a simple copy wouldn't work either.
     #      If/when we transition towards a C++-backed model implementation, this should be improved.
     sprime = copy.deepcopy(state)
@@ -51,3 +55,46 @@ def progress(state, operator):
     for eff in effects:
         apply_effect(sprime, eff)
     return sprime
+
+
+def progress_packed_state(state, operator):
+    """ Returns the progression of the given packed state along the effects of the given operator.
+    All effect conditions and right-hand sides are evaluated on the given state, and delete effects are applied
+    before add effects. Since packed states are immutable, no copy of the original state is ever needed.
+    """
+    layout = state.layout
+    adds, dels, updates = 0, 0, {}
+    for eff in _collect_applicable_effects(state, operator.effects):
+        if isinstance(eff, (AddEffect, DelEffect)):
+            idx = layout.atom_index(eff.atom.predicate, eff.atom.subterms)
+            if idx is None:
+                if isinstance(eff, DelEffect):
+                    continue  # Atoms not in the layout are false in any case
+                raise RuntimeError(f'Effect "{eff}" affects atom not indexed by layout {layout}')
+            if isinstance(eff, AddEffect):
+                adds |= 1 << idx
+            else:
+                dels |= 1 << idx
+
+        elif isinstance(eff, FunctionalEffect):
+            idx = layout.function_index(eff.lhs.symbol, eff.lhs.subterms)
+            if idx is None:
+                raise RuntimeError(f'Effect "{eff}" affects term not indexed by layout {layout}')
+            updates[idx] = evaluate(eff.rhs, state)
+
+        else:
+            raise RuntimeError(f'Don\'t know how to apply effect "{eff}"')
+
+    return state.successor(adds, dels, updates)
+
+
+def _collect_applicable_effects(state, effects):
+    """ Iterate over all single effects whose condition holds in the given state, expanding universal effects. """
+    for eff in effects:
+        if not is_effect_applicable(state, eff):
+            continue
+        if isinstance(eff, UniversalEffect):
+            for subst in enumerate_substitutions(eff.variables):
+                yield from _collect_applicable_effects(state, [substitute_expression(e, subst) for e in eff.effects])
+        else:
+            yield eff
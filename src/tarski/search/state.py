@@ -0,0 +1,245 @@
+"""
+ A compact, bitset-backed representation of the states of a ground planning problem.
+"""
+from typing import Optional
+
+from ..fstrips import AddEffect, DelEffect, FunctionalEffect, UniversalEffect
+from ..grounding.common import StateVariableLite
+from ..model import Model, ExtensionalFunctionDefinition
+from ..util import SymbolIndex
+
+
+class StateLayout:
+    """ The layout shared by all packed states of a given ground problem. The layout indexes all (fluent) ground atoms
+    and all (fluent) ground function terms of the problem, so that the truth value of the atom with index i is stored
+    in the i-th bit of the bitset of a PackedState, and the value of the function term with index j is stored in the
+    j-th position of the value tuple of the state. The denotation of all symbols that are not fluent is taken from
+    the given `static` model, which is shared by all states.
+
+    :param atoms: A SymbolIndex of StateVariableLite objects, e.g. as returned by a grounding strategy.
+    :param functions: A SymbolIndex of StateVariableLite objects for the fluent function terms, if any.
+    :param static: A Model with the denotation of all static symbols, typically the initial state of the problem.
+    :param fluent_symbols: The set of symbols that are considered fluent. By default, these are all symbols with some
+                           indexed state variable.
+    """
+    def __init__(self, atoms: SymbolIndex, functions: Optional[SymbolIndex] = None, static: Optional[Model] = None,
+                 fluent_symbols=None):
+        self.atoms = atoms
+        self.functions = functions if functions is not None else SymbolIndex()
+        self.static = static
+        self.language = static.language if static is not None else None
+
+        self.fluent_symbols = set(fluent_symbols) if fluent_symbols is not None else set()
+        self.fluent_symbols.update(sv.symbol for sv in self.atoms)
+        self.fluent_symbols.update(sv.symbol for sv in self.functions)
+        self.fluent_names = {s.name for s in self.fluent_symbols}
+
+        # For fast lookups, we index state variables by plain names rather than through syntactic equality.
+        self.atom_ids = {_key(sv.symbol, sv.binding): idx for idx, sv in self.atoms.enumerate()}
+        self.function_ids = {_key(sv.symbol, sv.binding): idx for idx, sv in self.functions.enumerate()}
+
+    def is_fluent(self, symbol):
+        """ Return whether the given predicate or function symbol is fluent in this layout. """
+        return symbol.name in self.fluent_names
+
+    def atom_index(self, predicate, point):
+        """ Return the index of the state variable corresponding to the given predicate and tuple of constants,
+        or None if there is no such state variable. """
+        return self.atom_ids.get(_key(predicate, point))
+
+    def function_index(self, function, point):
+        """ Return the index of the state variable corresponding to the given function and tuple of constants,
+        or None if there is no such state variable. """
+        return self.function_ids.get(_key(function, point))
+
+    def __len__(self):
+        return len(self.atoms) + len(self.functions)
+
+    def __str__(self):
+        return f'StateLayout[{len(self.atoms)} atoms, {len(self.functions)} functions]'
+
+    __repr__ = __str__
+
+
+def _key(symbol, point):
+    return symbol.name, tuple(c.name for c in point)
+
+
+def create_state_layout(problem, operators, state_variables: Optional[SymbolIndex] = None):
+    """ Create a StateLayout for the given problem and list of ground operators.
+
+    If a SymbolIndex of `state_variables` is given (e.g. the result of `LPGroundingStrategy.ground_state_variables()`),
+    it is used to index the ground atoms; otherwise, the index is made up of all atoms affected by some
+    operator plus all atoms of the same predicates that are true in the initial state.
+    Fluent function terms are always collected from the functional effects of the operators.
+    """
+    atoms, functions = SymbolIndex(), SymbolIndex()
+    fluent_symbols = set()
+
+    def index(idx, sv):
+        if sv not in idx:
+            idx.add(sv)
+
+    for op in operators:
+        for eff in _expand_effects(op.effects):
+            if isinstance(eff, (AddEffect, DelEffect)):
+                fluent_symbols.add(eff.atom.predicate)
+                if state_variables is None:
+                    index(atoms, StateVariableLite.from_atom(eff.atom))
+            elif isinstance(eff, FunctionalEffect):
+                fluent_symbols.add(eff.lhs.symbol)
+                index(functions, StateVariableLite(eff.lhs.symbol, eff.lhs.subterms))
+
+    init = problem.init
+    fluent_names = {s.name for s in fluent_symbols}
+    if state_variables is not None:
+        _ = [index(atoms, sv) for sv in state_variables]
+    else:
+        for signature, extension in init.predicate_extensions.items():
+            if signature[0] in fluent_names:
+                predicate = init.language.get_predicate(signature[0])
+                for point in extension:
+                    index(atoms, StateVariableLite(predicate, tuple(ref.expr for ref in point)))
+
+    for signature, definition in init.function_extensions.items():
+        if signature[0] in fluent_names:
+            function = init.language.get_function(signature[0])
+            for point, _ in definition.data.items():
+                index(functions, StateVariableLite(function, tuple(ref.expr for ref in point)))
+
+    return StateLayout(atoms, functions, static=init, fluent_symbols=fluent_symbols)
+
+
+def _expand_effects(effects):
+    for eff in effects:
+        if isinstance(eff, UniversalEffect):
+            # pylint: disable=import-outside-toplevel  # Avoiding circular references
+            from ..fstrips.representation import expand_universal_effect
+            yield from _expand_effects(expand_universal_effect(eff))
+        else:
+            yield eff
+
+
+class PackedState:
+    """ A compact, immutable representation of a state of a ground problem, made up of an integer bitset over the
+    ground atoms indexed by a StateLayout, plus a tuple with the values of the indexed function terms.
+
+    Packed states offer the same `holds`/`value` interface as a `Model`, so that they can be directly used in
+    the evaluation of formulas, and are cheap to copy, hash and compare, which makes them suitable for use in
+    the open and closed lists of search algorithms.
+    """
+    __slots__ = ('layout', 'atoms', 'values', '_hash')
+
+    def __init__(self, layout: StateLayout, atoms=0, values=None):
+        self.layout = layout
+        self.atoms = atoms
+        self.values = values if values is not None else (None, ) * len(layout.functions)
+        self._hash = None
+
+    @property
+    def language(self):
+        return self.layout.language
+
+    def holds(self, predicate, point):
+        """ Return true iff the given predicate is true on the given point in the current state """
+        layout = self.layout
+        if not layout.is_fluent(predicate):
+            return layout.static.holds(predicate, point)
+        idx = layout.atom_index(predicate, point)
+        return idx is not None and (self.atoms >> idx) & 1 == 1
+
+    def value(self, fun, point):
+        """ Return the value of the given function on the given point in the current state """
+        layout = self.layout
+        if not layout.is_fluent(fun):
+            return layout.static.value(fun, point)
+        idx = layout.function_index(fun, point)
+        value = None if idx is None else self.values[idx]
+        if value is None:
+            raise KeyError(fun, point)
+        return value
+
+    def successor(self, add_mask=0, del_mask=0, updates=None):
+        """ Return a new state where the atoms in the given delete bitmask have been made false, then the atoms in the
+        given add bitmask have been made true, and the function terms in the `updates` dictionary (which maps
+        indexes to values) have been assigned their new values.
+        The tuple of function values is only copied if some update is actually performed. """
+        values = self.values
+        if updates:
+            values = list(values)
+            for idx, val in updates.items():
+                values[idx] = val
+            values = tuple(values)
+        return PackedState(self.layout, (self.atoms & ~del_mask) | add_mask, values)
+
+    def true_atoms(self):
+        """ Return a generator with the indexes of all atoms that are true in the state. """
+        bits = bin(self.atoms)
+        idx = bits.rfind('1')
+        while idx > 1:  # Skip the '0b' prefix
+            yield len(bits) - 1 - idx
+            idx = bits.rfind('1', 0, idx)
+
+    def to_model(self) -> Model:
+        """ Return a standard `Model` with the same denotation as this state. """
+        layout = self.layout
+        model = Model(layout.language, layout.static.evaluator if layout.static is not None else None)
+        if layout.static is not None:
+            for signature, ext in layout.static.predicate_extensions.items():
+                if signature[0] not in layout.fluent_names:
+                    model.predicate_extensions[signature] = set(ext)
+            for signature, definition in layout.static.function_extensions.items():
+                if signature[0] not in layout.fluent_names:
+                    model.function_extensions[signature] = copied = ExtensionalFunctionDefinition()
+                    copied.data = dict(definition.data)
+            model.recompute_hash()
+
+        for idx in self.true_atoms():
+            sv = layout.atoms.get_object(idx)
+            model.add(sv.symbol, *sv.binding)
+
+        for idx, value in enumerate(self.values):
+            if value is not None:
+                sv = layout.functions.get_object(idx)
+                model.set(sv.to_atom(), value)
+        return model
+
+    @staticmethod
+    def from_model(model: Model, layout: StateLayout):
+        """ Return the packed representation of the given model under the given layout. Atoms of fluent symbols
+        not indexed by the layout are ignored. """
+        atoms = 0
+        for signature, extension in model.predicate_extensions.items():
+            for point in extension:
+                idx = layout.atom_ids.get((signature[0], tuple(ref.expr.name for ref in point)))
+                if idx is not None:
+                    atoms |= 1 << idx
+
+        values = [None] * len(layout.functions)
+        for signature, definition in model.function_extensions.items():
+            for point, value in definition.data.items():
+                idx = layout.function_ids.get((signature[0], tuple(ref.expr.name for ref in point)))
+                if idx is not None:
+                    values[idx] = value
+        return PackedState(layout, atoms, tuple(values))
+
+    def _value_key(self):
+        return tuple(None if v is None else v.symbol for v in self.values)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.atoms, self._value_key()))
+        return self._hash
+
+    def __eq__(self, other):
+        return (self.__class__ is other.__class__
+                and self.atoms == other.atoms
+                and self.layout is other.layout
+                and self._value_key() == other._value_key())
+
+    def __str__(self):
+        atoms = [str(self.layout.atoms.get_object(idx)) for idx in self.true_atoms()]
+        values = [f'{self.layout.functions.get_object(idx)}={v}' for idx, v in enumerate(self.values) if v is not None]
+        return f'PackedState[{", ".join(atoms + values)}]'
+
+    __repr__ = __str__
@@ -0,0 +1,111 @@
+"""
+ A decision-tree-based successor generator for ground operators, in the spirit of the successor generators of
+ Fast Downward (see Helmert, M. (2006). The Fast Downward Planning System. JAIR 26, 191-246).
+"""
+from .compilation import CompiledOperator, compile_operators
+from .state import StateLayout, PackedState
+
+
+class _Node:
+    """ A node of the decision tree. Inner nodes test the truth value of the atom with index `var`, and have up to
+    three children: one for the operators that require the atom to be true, one for those that require it to be false,
+    and one for those that don't care about it. All nodes can have a list of `immediate` operators, whose precondition
+    is entailed by the tests performed along the path from the root to the node. """
+    __slots__ = ('var', 'mask', 'true', 'false', 'dontcare', 'immediate')
+
+    def __init__(self):
+        self.var = None
+        self.mask = 0
+        self.true = self.false = self.dontcare = None
+        self.immediate = []
+
+
+class SuccessorGenerator:
+    """ A successor generator that retrieves all operators applicable in a given packed state by walking a decision
+    tree over the atoms of the state, rather than by checking the precondition of each operator in turn.
+
+    The generator is built once from a list of compiled operators (see `compile_operators`). Operators that could not
+    be compiled (i.e. InterpretedOperator objects) are kept apart and checked one by one on every query.
+    """
+    def __init__(self, operators):
+        self.operators = operators
+        self.interpreted = [op for op in operators if not isinstance(op, CompiledOperator)]
+        compiled = [op for op in operators if isinstance(op, CompiledOperator)]
+        self.root = self._build(compiled)
+
+    @staticmethod
+    def _build(operators):
+        """ Build the decision tree iteratively, to avoid hitting recursion limits on large tasks. """
+        root = _Node()
+        items = [(op, sorted([(v, True) for v in op.pre] + [(v, False) for v in op.neg]), 0) for op in operators]
+        stack = [(root, items)]
+        while stack:
+            node, items = stack.pop()
+            pending = []
+            for op, conditions, i in items:
+                if i == len(conditions):
+                    node.immediate.append(op)
+                else:
+                    pending.append((op, conditions, i))
+
+            if not pending:
+                continue
+
+            # Branch on the lowest-index atom not yet tested by the pending operators
+            var = min(conditions[i][0] for _, conditions, i in pending)
+            true, false, dontcare = [], [], []
+            for op, conditions, i in pending:
+                v, value = conditions[i]
+                if v != var:
+                    dontcare.append((op, conditions, i))
+                elif value:
+                    true.append((op, conditions, i + 1))
+                else:
+                    false.append((op, conditions, i + 1))
+
+            node.var, node.mask = var, 1 << var
+            for branch, attr in ((true, 'true'), (false, 'false'), (dontcare, 'dontcare')):
+                if branch:
+                    child = _Node()
+                    setattr(node, attr, child)
+                    stack.append((child, branch))
+        return root
+
+    def applicable(self, state: PackedState):
+        """ Return a list with all (compiled or interpreted) operators applicable in the given state. """
+        atoms = state.atoms
+        result = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            result.extend(node.immediate)
+            if node.var is None:
+                continue
+            child = node.true if atoms & node.mask else node.false
+            if child is not None:
+                stack.append(child)
+            if node.dontcare is not None:
+                stack.append(node.dontcare)
+
+        result.extend(op for op in self.interpreted if op.is_applicable(state))
+        return result
+
+    def count_nodes(self):
+        """ Return the number of nodes of the decision tree. """
+        count, stack = 0, [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(child for child in (node.true, node.false, node.dontcare) if child is not None)
+        return count
+
+    def __str__(self):
+        return f'SuccessorGenerator[{len(self.operators)} operators, {self.count_nodes()} nodes]'
+
+    __repr__ = __str__
+
+
+def create_successor_generator(operators, layout: StateLayout):
+    """ Compile the given ground operators (e.g. as returned by `ground_problem_schemas_into_plain_operators`) over the
+    given layout and build a SuccessorGenerator for them. """
+    return SuccessorGenerator(compile_operators(operators, layout))
@@ -9,4 +9,5 @@ from .formulas import land, lor, neg, implies, forall, exists, equiv, Connective
     is_neg, is_and, is_or
 from .builtins import BuiltinFunctionSymbol, BuiltinPredicateSymbol
 from .symrefs import symref
+from .interning import InterningFactory, is_canonical
 from .transform.substitutions import create_substitution, substitute_expression
@@ -32,6 +32,7 @@ def negate_quantifier(q: Quantifier):
 
 class Formula:
     """ A first-order logical formula. """
+    __slots__ = ()
 
     def __str__(self):
         raise NotImplementedError()  # To be subclassed
@@ -66,6 +67,8 @@ class Formula:
 
 
 class Tautology(Formula):
+    __slots__ = ()
+
     def __str__(self):
         return "T"
 
@@ -79,6 +82,8 @@ class Tautology(Formula):
 
 
 class Contradiction(Formula):
+    __slots__ = ()
+
     def __str__(self):
         return "F"
 
@@ -93,6 +98,7 @@ class Contradiction(Formula):
 
 class CompoundFormula(Formula):
     """ A set of formulas combined through some logical connective """
+    __slots__ = ('connective', 'subformulas')
 
     def __init__(self, connective, subformulas):
         super().__init__()
@@ -123,7 +129,8 @@ class CompoundFormula(Formula):
     def __eq__(self, other):
         return (self.__class__ is other.__class__
                 and self.connective == other.connective
-                and self.subformulas == other.subformulas)
+                and len(self.subformulas) == len(other.subformulas)
+                and all(f == g for f, g in zip(self.subformulas, other.subformulas)))
 
     def __hash__(self):
         element_hashes = [self.__class__, self.connective]
@@ -136,6 +143,8 @@ class CompoundFormula(Formula):
 
 
 class QuantifiedFormula(Formula):
+    __slots__ = ('quantifier', 'variables', 'formula')
+
     def __init__(self, quantifier: Quantifier, variables: List[Variable], formula: Formula):
         self.quantifier = quantifier
         self.variables = variables
@@ -293,6 +302,7 @@ def unwrap_conjunction_or_atom(phi):
 
 class Atom(Formula):
     """ A first-order atom. """
+    __slots__ = ('predicate', 'subterms')
 
     def __init__(self, predicate, arguments):
         super().__init__()
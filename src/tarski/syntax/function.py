@@ -1,6 +1,6 @@
 
 from ..errors import LanguageError, LanguageMismatch
-from .sorts import Sort
+from .sorts import Sort, reconstruct
 
 
 class Function:
@@ -44,6 +44,10 @@ class Function:
                     domain=[a.name for a in self.domain],
                     codomain=self.codomain.name)
 
+    def __reduce__(self):
+        return reconstruct, (type(self), dict(name=self.name, domain=self.domain, codomain=self.codomain)), \
+            self.__dict__
+
     def __hash__(self):
         return hash(self.signature)
 
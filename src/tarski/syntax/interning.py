@@ -0,0 +1,106 @@
+"""
+ Hash-consing of terms and formulas.
+"""
+import weakref
+from typing import Any, Dict, Tuple
+
+from .. import errors as err
+from .terms import Constant, Variable, CompoundTerm
+from .formulas import Atom, CompoundFormula, QuantifiedFormula, Tautology, Contradiction
+
+# Map the id of each canonical expression of any live factory to a pair (hash, table), with the cached hash of the
+# expression and the table of the factory. Keeping this information out of the expressions themselves ensures that
+# copies of canonical expressions are not canonical. Ids are not reused while the factory is alive, since the factory
+# keeps its canonical expressions alive. The registry is empty whenever no factory is alive, which lets `symref`
+# skip the lookup altogether in that case.
+canonical_registry: Dict[int, Tuple[int, Dict[Any, Any]]] = {}
+
+
+class InterningFactory:
+    """ A factory of hash-consed terms and formulas, which guarantees that there is only one canonical object for each
+    distinct (i.e. syntactically different) expression created or interned through the factory. This allows
+    comparing canonical expressions by identity, and the hash of each canonical expression is computed only once.
+    In particular, `symref` objects wrapping canonical expressions are hashed in constant time, and compared by
+    identity if they are equal.
+
+    Canonical compound expressions are always created by the factory itself, never taken over from the caller, who
+    might still modify them in place. Canonical expressions are shared, and hence should not be modified in place
+    either. The factory keeps all canonical expressions alive for as long as the factory itself is alive.
+
+        >>> factory = InterningFactory()
+        >>> factory.atom(on, b1, b2) is factory.intern(on(b1, b2))
+        True
+    """
+
+    def __init__(self):
+        self.table = {}
+        weakref.finalize(self, _forget, self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+    def intern(self, expression):
+        """ Return the canonical object for the given term or formula. Only constants, variables, tautologies and
+        contradictions, which have no subexpressions, can become canonical themselves. """
+        entry = canonical_registry.get(id(expression))
+        if entry is not None and entry[1] is self.table:
+            return expression
+
+        if isinstance(expression, (Constant, Variable)):
+            return self._canonical((type(expression), expression.symbol, expression.sort.name), lambda: expression)
+
+        if isinstance(expression, CompoundTerm):
+            return self.term(expression.symbol, *expression.subterms)
+
+        if isinstance(expression, Atom):
+            return self.atom(expression.predicate, *expression.subterms)
+
+        if isinstance(expression, (Tautology, Contradiction)):
+            return self._canonical((type(expression), ), lambda: expression)
+
+        if isinstance(expression, CompoundFormula):
+            subformulas = tuple(self.intern(f) for f in expression.subformulas)
+            key = (CompoundFormula, expression.connective, tuple(id(f) for f in subformulas))
+            return self._canonical(key, lambda: CompoundFormula(expression.connective, subformulas))
+
+        if isinstance(expression, QuantifiedFormula):
+            variables = tuple(self.intern(v) for v in expression.variables)
+            formula = self.intern(expression.formula)
+            key = (QuantifiedFormula, expression.quantifier, tuple(id(v) for v in variables), id(formula))
+            return self._canonical(key, lambda: QuantifiedFormula(expression.quantifier, variables, formula))
+
+        raise err.TarskiError(f'Cannot intern expression "{expression}" of type "{type(expression)}"')
+
+    def term(self, function, *arguments):
+        """ Return the canonical compound term `function(*arguments)`. A new CompoundTerm is created only if no
+        syntactically equal term has been created or interned before. """
+        subterms = tuple(self.intern(t) for t in arguments)
+        key = (CompoundTerm, function, tuple(id(t) for t in subterms))
+        return self._canonical(key, lambda: CompoundTerm(function, subterms))
+
+    def atom(self, predicate, *arguments):
+        """ Return the canonical atom `predicate(*arguments)`. A new Atom is created only if no syntactically equal
+        atom has been created or interned before. """
+        subterms = tuple(self.intern(t) for t in arguments)
+        key = (Atom, predicate, tuple(id(t) for t in subterms))
+        return self._canonical(key, lambda: Atom(predicate, subterms))
+
+    def _canonical(self, key, build):
+        canonical = self.table.get(key)
+        if canonical is None:
+            canonical = build()
+            canonical_registry[id(canonical)] = (canonical.hash(), self.table)
+            self.table[key] = canonical
+        return canonical
+
+
+def _forget(table):
+    for expression in table.values():
+        entry = canonical_registry.get(id(expression))
+        if entry is not None and entry[1] is table:
+            del canonical_registry[id(expression)]
+
+
+def is_canonical(expression):
+    """ Return whether the given term or formula is the canonical object of some (live) InterningFactory. """
+    return id(expression) in canonical_registry
@@ -1,6 +1,6 @@
 
 from ..errors import LanguageError, LanguageMismatch
-from .sorts import Sort
+from .sorts import Sort, reconstruct
 
 
 class Predicate:
@@ -41,6 +41,9 @@ class Predicate:
     def dump(self):
         return dict(symbol=self.name, domain=[a.name for a in self.sort])
 
+    def __reduce__(self):
+        return reconstruct, (type(self), dict(name=self.name, sort=self.sort)), self.__dict__
+
     def __hash__(self):
         return hash(self.signature)
 
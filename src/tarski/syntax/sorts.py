@@ -4,6 +4,16 @@ from typing import Generator, Set
 from .. import errors as err
 
 
+def reconstruct(cls, attributes):
+    """ Create an instance of the given class with the given attributes, without calling its constructor.
+    To be used in the `__reduce__` method of classes whose hash depends on some of their attributes, so that these are
+    set as soon as the object is created when unpickling, which matters if the object is part of a reference cycle
+    and used as a dictionary key. The remaining attributes are restored afterwards, as usual. """
+    obj = cls.__new__(cls)
+    obj.__dict__.update(attributes)
+    return obj
+
+
 class Sort:
     """ A logical sort (aka type)
         Sorts are uniquely identified by their name (i.e. we don't allow two sorts with different characteristics
@@ -25,6 +35,9 @@ class Sort:
         memo[id(self)] = self
         return self
 
+    def __reduce__(self):
+        return reconstruct, (type(self), dict(name=self.name)), self.__dict__
+
     def __hash__(self):
         return hash(self.name)
 
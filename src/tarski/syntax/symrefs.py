@@ -1,6 +1,7 @@
 
 from .formulas import Formula
 from .terms import Term
+from .interning import canonical_registry
 
 
 def symref(sym):
@@ -17,16 +18,26 @@ class TermReference:
     """ A simple wrapper to provide a purely syntactic __eq__ operator for terms.
      To be used whenever equality and hashing is required, e.g. in dictionaries, etc.,
      since the __eq__ operator in the Term hierarchy is used for other purposes,
-     namely, to construct equality atoms in a user-readable manner. """
+     namely, to construct equality atoms in a user-readable manner.
+
+     References to the canonical expressions of an `InterningFactory` use the hash cached by the factory, and
+     references to the same expression are equal without further comparison. """
+
+    __slots__ = ('expr', )
 
     def __init__(self, expression):
         self.expr = expression
 
     def __hash__(self):
+        if canonical_registry:  # Only look up the cached hash if some InterningFactory is alive
+            entry = canonical_registry.get(id(self.expr))
+            if entry is not None:
+                return entry[0]
         return self.expr.hash()
 
     def __eq__(self, other):
-        return self.__class__ is other.__class__ and self.expr.is_syntactically_equal(other.expr)
+        return self.__class__ is other.__class__ and (
+            self.expr is other.expr or self.expr.is_syntactically_equal(other.expr))
 
     def __str__(self):
         return "symref[{}]".format(self.expr)
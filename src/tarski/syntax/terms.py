@@ -24,6 +24,7 @@ class Term:
         To prevent usage in such containers, Term objects are not hashable. If you need to hash them for other purposes,
         use the `t.hash()` method.
     """
+    __slots__ = ()
 
     @property
     def language(self):
@@ -135,6 +136,7 @@ class Term:
 
 
 class Variable(Term):
+    __slots__ = ('symbol', '_sort')
 
     def __init__(self, symbol: str, sort: Sort):
         self.symbol = symbol
@@ -166,6 +168,7 @@ class CompoundTerm(Term):
     constant symbols. More generally, a compound term is a function symbol of a certain arity n paired with an n-tuple
     of terms, sorts matching.
     """
+    __slots__ = ('symbol', 'subterms')
 
     def __init__(self, symbol, subterms: Tuple[Term]):
 
@@ -303,6 +306,8 @@ def ite(c, t1: Term, t2: Term):
 
 
 class Constant(Term):
+    __slots__ = ('name', '_sort')
+
     def __init__(self, name, sort: Sort):
         self.name = name
         self._sort = sort
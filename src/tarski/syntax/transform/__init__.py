@@ -1,6 +1,7 @@
 
 from .nnf import NNFTransformation, to_negation_normal_form
-from .cnf import CNFTransformation, to_conjunctive_normal_form
+from .cnf import CNFTransformation, DimacsCNF, to_conjunctive_normal_form
 from .prenex import PrenexTransformation, to_prenex_negation_normal_form
-from .quantifier_elimination import QuantifierElimination, QuantifierEliminationMode, remove_quantifiers
+from .quantifier_elimination import QuantifierElimination, QuantifierEliminationMode, remove_quantifiers, \
+    iterate_instantiations
 from .neg_builtin import NegatedBuiltinAbsorption
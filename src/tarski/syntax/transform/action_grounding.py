@@ -1,6 +1,8 @@
+from ...fstrips import AddEffect, DelEffect, LiteralEffect, FunctionalEffect, IncreaseEffect, UniversalEffect
 from ...fstrips.representation import substitute_expression
-from ...syntax import symref, Constant, create_substitution, VariableBinding
-from ...fstrips.action import Action, PlainOperator
+from ...syntax import symref, Constant, Variable, CompoundTerm, Atom, CompoundFormula, QuantifiedFormula, Tautology, \
+    Contradiction, create_substitution, VariableBinding
+from ...fstrips.action import Action, PlainOperator, AdditiveActionCost
 
 
 def ground_schema_into_plain_operator(action: Action, substitution):
@@ -21,7 +23,7 @@ def ground_schema_into_plain_operator(action: Action, substitution):
 
     precondition = substitute_expression(action.precondition, substitution, inplace=False)
     effects = [substitute_expression(eff, substitution, inplace=False) for eff in action.effects]
-    return PlainOperator(action.language, name, precondition, effects)
+    return PlainOperator(action.language, name, precondition, effects, ground_action_cost(action.cost, substitution))
 
 
 def ground_schema(action: Action, grounding):
@@ -46,7 +48,14 @@ def ground_schema(action: Action, grounding):
     precondition = substitute_expression(action.precondition, subst, inplace=False)
     effects = [substitute_expression(eff, subst, inplace=False) for eff in action.effects]
 
-    return Action(lang, name, VariableBinding(), precondition, effects)
+    return Action(lang, name, VariableBinding(), precondition, effects, ground_action_cost(action.cost, subst))
+
+
+def ground_action_cost(cost, substitution):
+    """ Apply the given substitution to the given action cost, if any. """
+    if not isinstance(cost, AdditiveActionCost):
+        return cost
+    return AdditiveActionCost(substitute_expression(cost.addend, substitution, inplace=False))
 
 
 def ground_schema_into_plain_operator_from_grounding(action: Action, grounding):
@@ -56,3 +65,115 @@ def ground_schema_into_plain_operator_from_grounding(action: Action, grounding):
     binding = [lang.get_constant(name) if isinstance(name, str) else name for name in grounding]
     subst = create_substitution(action.parameters, binding)
     return ground_schema_into_plain_operator(action, subst)
+
+
+class ActionTemplate:
+    """ An action schema precompiled into an instantiation template. Each subexpression of the precondition, effects
+    and cost of the schema is compiled once into a builder that, given a tuple with one constant per action parameter,
+    produces the corresponding ground expression by filling the argument positions that depend on the parameters.
+    Only leaves (constants, non-parameter variables, tautologies and contradictions) are shared among the schema and
+    the ground operators; atoms, terms and formulas are rebuilt for each operator, so that ground operators can be
+    modified in place (e.g. simplified) without affecting the schema or each other.
+    Expressions for which no builder exists fall back to the (deepcopy-based) standard substitution mechanism.
+    """
+    def __init__(self, action: Action):
+        self.action = action
+        self.language = action.language
+        self.slots = {symref(p): i for i, p in enumerate(action.parameters)}
+        self.precondition = self._compile(action.precondition)
+        self.effects = [self._compile_effect(eff) for eff in action.effects]
+        self.cost = action.cost
+        if isinstance(action.cost, AdditiveActionCost):
+            addend = self._compile(action.cost.addend)
+            self.cost = lambda args: AdditiveActionCost(_build(addend, args))
+
+    def instantiate(self, grounding):
+        """ Return the PlainOperator that results from grounding the schema with the given tuple of objects, which can
+        be given either as Constants or as constant names. """
+        lang = self.language
+        args = tuple(lang.get_constant(c) if isinstance(c, str) else c for c in grounding)
+        if len(args) != len(self.slots) or not all(isinstance(c, Constant) for c in args):
+            raise RuntimeError('Can only ground action schemas with one constant per action parameter')
+
+        name = f'{self.action.name}({", ".join(c.name for c in args)})'
+        cost = self.cost(args) if callable(self.cost) else self.cost
+        return PlainOperator(lang, name, _build(self.precondition, args), [_build(e, args) for e in self.effects],
+                             cost)
+
+    def _substitution(self, args):
+        return {ref: args[i] for ref, i in self.slots.items()}
+
+    def _compile(self, node):
+        """ Compile the given term or formula into a builder function that maps a tuple of parameter values into the
+        corresponding ground term or formula. Leaves that do not depend on the action parameters are returned
+        themselves, as there is no need to copy them. """
+        if isinstance(node, (Variable, Constant)):
+            slot = self.slots.get(symref(node)) if isinstance(node, Variable) else None
+            return node if slot is None else (lambda args: args[slot])
+
+        if isinstance(node, (Tautology, Contradiction)):
+            return node
+
+        if isinstance(node, (Atom, CompoundTerm)):
+            specs = [self._compile(t) for t in node.subterms]
+            make = _make_atom if isinstance(node, Atom) else _make_compound_term
+            symbol, container = node.symbol, type(node.subterms)
+            return lambda args: make(symbol, container(_build(s, args) for s in specs))
+
+        if isinstance(node, CompoundFormula):
+            specs = [self._compile(f) for f in node.subformulas]
+            connective, container = node.connective, type(node.subformulas)
+            return lambda args: CompoundFormula(connective, container(_build(s, args) for s in specs))
+
+        if isinstance(node, QuantifiedFormula):
+            spec = self._compile(node.formula)
+            quantifier, variables, container = node.quantifier, node.variables, type(node.variables)
+            return lambda args: QuantifiedFormula(quantifier, container(variables), _build(spec, args))
+
+        # Any other type of expression is instantiated through the standard (deepcopy-based) substitution
+        return lambda args: substitute_expression(node, self._substitution(args), inplace=False)
+
+    def _compile_effect(self, effect):
+        condition = self._compile(effect.condition)
+        if isinstance(effect, (AddEffect, DelEffect, LiteralEffect)):
+            atom = self._compile(effect.atom if isinstance(effect, (AddEffect, DelEffect)) else effect.lit)
+            cls = type(effect)
+            return lambda args: cls(_build(atom, args), _build(condition, args))
+
+        if isinstance(effect, FunctionalEffect) and type(effect) in (FunctionalEffect, IncreaseEffect):
+            lhs, rhs = self._compile(effect.lhs), self._compile(effect.rhs)
+            cls = type(effect)
+            return lambda args: cls(_build(lhs, args), _build(rhs, args), _build(condition, args))
+
+        if isinstance(effect, UniversalEffect):
+            effects = [self._compile_effect(eff) for eff in effect.effects]
+            variables = [v for v in effect.variables if symref(v) not in self.slots]
+            return lambda args: UniversalEffect(list(variables), [e(args) for e in effects], _build(condition, args))
+
+        return lambda args: substitute_expression(effect, self._substitution(args), inplace=False)
+
+
+def _build(spec, args):
+    return spec(args) if callable(spec) else spec
+
+
+def _make_atom(predicate, subterms):
+    """ Create an atom without re-checking the arity and sorts of its arguments, which is safe when the atom results
+    from replacing the parameters of a well-formed schema atom with constants of appropriate sorts. """
+    atom = Atom.__new__(Atom)
+    atom.predicate = predicate
+    atom.subterms = subterms
+    return atom
+
+
+def _make_compound_term(symbol, subterms):
+    """ Create a compound term without re-checking its well-formedness. See `_make_atom`. """
+    term = CompoundTerm.__new__(CompoundTerm)
+    term.symbol = symbol
+    term.subterms = subterms
+    return term
+
+
+def compile_action_template(action: Action):
+    """ Precompile the given action schema into an ActionTemplate that can be instantiated efficiently. """
+    return ActionTemplate(action)
@@ -1,21 +1,35 @@
 """
     CNF Transformation
 """
-from ..formulas import CompoundFormula, Connective, QuantifiedFormula
+from ..formulas import CompoundFormula, Connective, QuantifiedFormula, Atom, Tautology, Contradiction, land, lor, neg
+from ..symrefs import symref
 from ..transform import to_negation_normal_form
 
 from .errors import TransformationError
 
 
 class CNFTransformation:
-    """ Rewrite an input quantifier-free formula into an equivalent CNF formula. """
-
-    def __init__(self, lang, phi, do_copy=True):
+    """ Rewrite an input quantifier-free formula into an equivalent CNF formula. The input formula is never modified,
+    and the subformulas that are already in CNF are shared with the result. `do_copy` has no effect.
+
+    If `tseitin` is true, the formula is instead rewritten into an equisatisfiable CNF formula of linear size, by
+    introducing one auxiliary atom for each conjunction or disjunction nested inside some other connective
+    (Plaisted-Greenbaum variant of the Tseitin encoding, which, the formula being in NNF, needs only one direction
+    of the definition of each auxiliary atom). Formulas that share subformulas (e.g. those resulting from quantifier
+    elimination) are encoded with one single auxiliary atom for each shared subformula. Auxiliary atoms are built
+    from fresh nullary predicates that are registered in the language, but only if the result is requested in
+    terms of formulas, i.e. not in DIMACS form (see `convert_to_dimacs`).
+    """
+
+    def __init__(self, lang, phi, do_copy=True, tseitin=False):
         self.L = lang
         self.blueprint = to_negation_normal_form(phi, do_copy)
+        self.tseitin = tseitin
         self.cnf = None
         self.clauses = []
         self.current_clause = []
+        self.dimacs = None
+        self._definitions = {}
 
     def distribute(self, n1, n2):
         """ Distribute w.r.t. disjunction, see Huth & Ryan, pp. 60-62 """
@@ -40,6 +54,8 @@ class CNFTransformation:
                 return phi  # already CNF
             elif phi.connective == Connective.And:
                 psi0, psi1 = self._convert(phi.subformulas[0]), self._convert(phi.subformulas[1])
+                if len(phi.subformulas) == 2 and psi0 is phi.subformulas[0] and psi1 is phi.subformulas[1]:
+                    return phi
                 result = CompoundFormula(Connective.And, (psi0, psi1))
                 for k in range(2, len(phi.subformulas)):
                     psi_k = self._convert(phi.subformulas[k])
@@ -79,27 +95,158 @@ class CNFTransformation:
         self.current_clause.append(phi)
         return phi
 
+    def _encode(self):
+        """ Compute the Tseitin encoding of the formula into integer clauses, if not done yet. """
+        if self.dimacs is None:
+            self.dimacs = DimacsCNF()
+            self._assert(self.blueprint)
+        return self.dimacs
+
+    def _assert(self, phi):
+        """ Add the clauses that enforce that the given NNF formula holds. """
+        if isinstance(phi, CompoundFormula) and phi.connective == Connective.And:
+            for sub in phi.subformulas:
+                self._assert(sub)
+        elif isinstance(phi, CompoundFormula) and phi.connective == Connective.Or:
+            self.dimacs.clauses.append([self._define(sub) for sub in phi.subformulas])
+        else:
+            self.dimacs.clauses.append([self._define(phi)])
+
+    def _define(self, phi):
+        """ Return an integer literal that implies the given NNF formula, adding the necessary clauses to define it. """
+        if isinstance(phi, QuantifiedFormula):
+            raise TransformationError("cnf transformation", phi, "Formula is not quantifier free!")
+
+        if isinstance(phi, Atom):
+            return self.dimacs.variable(phi)
+
+        if isinstance(phi, Tautology):
+            return self.dimacs.true()
+
+        if isinstance(phi, Contradiction):
+            return -self.dimacs.true()
+
+        if phi.connective == Connective.Not:
+            sub = phi.subformulas[0]
+            if not isinstance(sub, Atom):
+                raise TransformationError("cnf transformation", phi, "Formula is not in NNF!")
+            return -self.dimacs.variable(sub)
+
+        literal = self._definitions.get(id(phi))
+        if literal is not None:
+            return literal
+
+        literal = self.dimacs.auxiliary()
+        subliterals = [self._define(sub) for sub in phi.subformulas]
+        if phi.connective == Connective.And:
+            self.dimacs.clauses.extend([-literal, sub] for sub in subliterals)
+        else:
+            self.dimacs.clauses.append([-literal] + subliterals)
+        self._definitions[id(phi)] = literal
+        return literal
+
+    def _literal_formulas(self, clause):
+        return [self.dimacs.formula(self.L, literal) for literal in clause]
+
     def convert(self):
-        self.cnf = self._convert(self.blueprint)
+        if self.tseitin:
+            clauses = [lor(*self._literal_formulas(clause), flat=True) for clause in self._encode().clauses]
+            self.cnf = land(*clauses, flat=True) if len(clauses) > 1 else clauses[0]
+        else:
+            self.cnf = self._convert(self.blueprint)
         return self.cnf
 
     def convert_to_clause_list(self):
+        if self.tseitin:
+            self.clauses = [self._literal_formulas(clause) for clause in self._encode().clauses]
+            return self.clauses
         self.cnf = self._convert(self.blueprint)
         self.collect_clauses(self.cnf)
         return self.clauses
 
+    def convert_to_dimacs(self):
+        """ Return the CNF as a DimacsCNF object, i.e. as a list of clauses, each of them a list of non-zero integers,
+        where a positive (negative) integer k denotes the k-th variable (its negation). """
+        if self.tseitin:
+            return self._encode()
+        clauses = self.convert_to_clause_list()
+        self.dimacs = DimacsCNF()
+        self.dimacs.clauses = [[self._define(literal) for literal in clause] for clause in clauses]
+        return self.dimacs
+
     @staticmethod
-    def rewrite(lang, phi, do_copy=True):
-        trans = CNFTransformation(lang, phi, do_copy)
+    def rewrite(lang, phi, do_copy=True, tseitin=False):
+        trans = CNFTransformation(lang, phi, do_copy, tseitin)
         trans.convert()
         return trans
 
 
-def to_conjunctive_normal_form(lang, phi, do_copy=True):
-    trans = CNFTransformation(lang, phi, do_copy)
+class DimacsCNF:
+    """ A CNF formula in integer (DIMACS-like) form. Variables are numbered consecutively from 1, and `atoms[k-1]` is
+    the atom corresponding to variable k, or None if k is an auxiliary variable. """
+    def __init__(self):
+        self.clauses = []
+        self.atoms = []
+        self.variables = {}
+        self.auxiliaries = {}
+        self.true_variable = 0  # DIMACS variables start at 1, hence 0 means that there is no such variable yet
+
+    @property
+    def num_variables(self):
+        return len(self.atoms)
+
+    def variable(self, atom):
+        """ Return the variable of the given atom, assigning it a new one if necessary. """
+        ref = symref(atom)
+        var = self.variables.get(ref)
+        if var is None:
+            self.atoms.append(atom)
+            self.variables[ref] = var = len(self.atoms)
+        return var
+
+    def auxiliary(self):
+        """ Return a new auxiliary variable. """
+        self.atoms.append(None)
+        return len(self.atoms)
+
+    def true(self):
+        """ Return an auxiliary variable that is forced to be true, creating it if necessary. """
+        if not self.true_variable:
+            self.true_variable = self.auxiliary()
+            self.clauses.append([self.true_variable])
+        return self.true_variable
+
+    def formula(self, lang, literal):
+        """ Return the literal formula corresponding to the given integer literal. Auxiliary variables are mapped to
+        atoms of fresh nullary predicates, which are registered in the given language. """
+        var = abs(literal)
+        atom = self.atoms[var - 1]
+        if atom is None:
+            atom = self.auxiliaries.get(var)
+            if atom is None:
+                self.auxiliaries[var] = atom = _fresh_nullary_predicate(lang, '_tseitin')()
+        return atom if literal > 0 else neg(atom)
+
+    def dump(self, stream):
+        """ Write the formula to the given text stream in the DIMACS CNF format. """
+        stream.write(f'p cnf {self.num_variables} {len(self.clauses)}\n')
+        for clause in self.clauses:
+            stream.write(' '.join(str(literal) for literal in clause))
+            stream.write(' 0\n')
+
+
+def _fresh_nullary_predicate(lang, prefix):
+    k = 0
+    while lang.has_predicate(f'{prefix}{k}'):
+        k += 1
+    return lang.predicate(f'{prefix}{k}')
+
+
+def to_conjunctive_normal_form(lang, phi, do_copy=True, tseitin=False):
+    trans = CNFTransformation(lang, phi, do_copy, tseitin)
     return trans.convert()
 
 
-def to_conjunctive_normal_form_clauses(lang, phi, do_copy=True):
-    trans = CNFTransformation(lang, phi, do_copy)
+def to_conjunctive_normal_form_clauses(lang, phi, do_copy=True, tseitin=False):
+    trans = CNFTransformation(lang, phi, do_copy, tseitin)
     return trans.convert_to_clause_list()
@@ -1,8 +1,6 @@
 """
     Negation Builtin Rewriter
 """
-import copy
-
 from ..formulas import Connective, Atom, QuantifiedFormula, CompoundFormula
 from ..builtins import negate_builtin_atom
 
@@ -10,12 +8,14 @@ from ..builtins import negate_builtin_atom
 class NegatedBuiltinAbsorption:
     """
         This class rewrites the input formula phi into an equivalent formula
-        absorbing the negation if the negated formula is a built-in
+        absorbing the negation if the negated formula is a built-in.
+        As with the other transformations, the input formula is never modified, and the subformulas that
+        need no rewriting are shared with the result. `do_copy` has no effect.
     """
 
-    def __init__(self, lang, phi, do_copy=True):
+    def __init__(self, lang, phi, do_copy=True):  # pylint: disable=unused-argument
         self.lang = lang
-        self.blueprint = copy.deepcopy(phi) if do_copy else phi
+        self.blueprint = phi
         self.formula = None
 
     def _convert(self, phi):
@@ -31,13 +31,15 @@ class NegatedBuiltinAbsorption:
 
             else:
                 assert phi.connective in (Connective.And, Connective.Or)
-                new_sub = [self._convert(phi.subformulas[0]),
-                           self._convert(phi.subformulas[1])]
-                phi.subformulas = tuple(new_sub)
-                return phi
+                subformulas = tuple(self._convert(sub) for sub in phi.subformulas)
+                if all(x is y for x, y in zip(subformulas, phi.subformulas)):
+                    return phi
+                return CompoundFormula(phi.connective, subformulas)
         elif isinstance(phi, QuantifiedFormula):
-            phi.formula = self._convert(phi.formula)
-            return phi
+            formula = self._convert(phi.formula)
+            if formula is phi.formula:
+                return phi
+            return QuantifiedFormula(phi.quantifier, phi.variables, formula)
         else:
             return phi
 
@@ -1,40 +1,47 @@
 """
     Tranformation of formulas into Negation Normal Form (NNF)
 """
-import copy
-
 from ... import errors as err
 from ..formulas import neg, Formula, QuantifiedFormula, CompoundFormula, Connective, negate_quantifier, Tautology, \
     Contradiction, Atom
 
 
 class NNFTransformation:
-    """ Rewrite the input formula into an equivalent formula in NNF """
+    """ Rewrite the input formula into an equivalent formula in NNF.
+
+    The input formula is never modified: new nodes are created only along the paths that need to be rewritten,
+    and all other subformulas are shared between the input formula and the result. The `do_copy` parameter is
+    kept only for backwards compatibility, and has no effect.
+    """
 
-    def __init__(self, phi, do_copy=True):
-        self.blueprint = copy.deepcopy(phi) if do_copy else phi
+    def __init__(self, phi, do_copy=True):  # pylint: disable=unused-argument
+        self.blueprint = phi
         self.nnf = None
 
     def _convert(self, phi: Formula, negated=False):
         if isinstance(phi, Tautology):
-            return Contradiction if negated else phi
+            return Contradiction() if negated else phi
 
         if isinstance(phi, Contradiction):
-            return Tautology if negated else phi
+            return Tautology() if negated else phi
 
         if isinstance(phi, Atom):
             return neg(phi) if negated else phi
 
         if isinstance(phi, QuantifiedFormula):  # Convert quantified formulas recursively
-            phi.formula = self._convert(phi.formula, negated)
-            phi.quantifier = negate_quantifier(phi.quantifier) if negated else phi.quantifier
-            return phi
+            formula = self._convert(phi.formula, negated)
+            if not negated and formula is phi.formula:
+                return phi
+            quantifier = negate_quantifier(phi.quantifier) if negated else phi.quantifier
+            return QuantifiedFormula(quantifier, phi.variables, formula)
 
         if isinstance(phi, CompoundFormula) and phi.connective in (Connective.And, Connective.Or):
             # Convert conjunct / disjunct formulas recursively, applying De Morgan if negated=True
-            phi.subformulas = tuple(self._convert(sub, negated) for sub in phi.subformulas)
-            phi.connective = negate_connective(phi.connective) if negated else phi.connective
-            return phi
+            subformulas = tuple(self._convert(sub, negated) for sub in phi.subformulas)
+            if not negated and all(x is y for x, y in zip(subformulas, phi.subformulas)):
+                return phi
+            connective = negate_connective(phi.connective) if negated else phi.connective
+            return CompoundFormula(connective, subformulas)
 
         if isinstance(phi, CompoundFormula) and phi.connective == Connective.Not:
             assert len(phi.subformulas) == 1
@@ -10,7 +10,8 @@ from .errors import TransformationError
 
 
 class PrenexTransformation:
-    """ Rewrite the input formula into an equivalent formula in Prenex Negation Normal Form. """
+    """ Rewrite the input formula into an equivalent formula in Prenex Negation Normal Form. The input formula is never
+    modified, and the subformulas that need no rewriting are shared with the result. `do_copy` has no effect. """
 
     def __init__(self, lang, phi, do_copy=True):
         self.L = lang
@@ -31,9 +32,8 @@ class PrenexTransformation:
                     y2 = self.L.variable("{}'".format(y.symbol), y.sort)
                     subst[y] = y2
                     new_variables[(y2.symbol, y2.sort.name)] = y2
-        if len(subst) > 0:
-            rhs.formula = substitute_expression(rhs.formula, subst, inplace=True)
-        new_phi = QuantifiedFormula(lhs.quantifier, list(new_variables.values()), lor(lhs.formula, rhs.formula))
+        rhs_formula = substitute_expression(rhs.formula, subst) if len(subst) > 0 else rhs.formula
+        new_phi = QuantifiedFormula(lhs.quantifier, list(new_variables.values()), lor(lhs.formula, rhs_formula))
         return new_phi
 
     def _nest_quantifiers(self, out_q, out_vars, out_phi, inner_q, inner_vars, conn, lhs, rhs):
@@ -53,7 +53,8 @@ class PrenexTransformation:
                 subst[symref(y)] = y2
                 new_out_vars.append(y2)
         if len(subst) > 0:
-            substitute_expression(out_phi, subst, inplace=True)
+            renamed = substitute_expression(out_phi, subst)
+            lhs, rhs = (renamed if lhs is out_phi else lhs), (renamed if rhs is out_phi else rhs)
         phi = CompoundFormula(conn, tuple([lhs, rhs]))
         inner = QuantifiedFormula(inner_q, inner_vars, phi)
         return QuantifiedFormula(out_q, new_out_vars, inner)
@@ -122,22 +123,18 @@ class PrenexTransformation:
 
     def convert_quantified(self, phi):
         assert isinstance(phi, QuantifiedFormula)
-        phi.formula = self._convert(phi.formula)
-        if isinstance(phi.formula, QuantifiedFormula):
-            if phi.formula.quantifier == phi.quantifier:  # absorb
-                new_variables = list(phi.variables)
-                for x in phi.formula.variables:
-                    new_variables.append(x)
-                phi.formula.variables = tuple(new_variables)
-                return phi.formula
-            if phi.formula.quantifier == Quantifier.Exists:  # push up existential
-                phi.quantifier, phi.formula.quantifier = phi.formula.quantifier, phi.quantifier
-                phi.variables, phi.formula.variables = phi.formula.variables, phi.variables
-                phi.formula = self._convert(
-                    phi.formula)  # reordering the quantifiers may trigger further quantifier reordering
-            return phi
-        else:
+        formula = self._convert(phi.formula)
+        if isinstance(formula, QuantifiedFormula):
+            if formula.quantifier == phi.quantifier:  # absorb
+                new_variables = tuple(phi.variables) + tuple(formula.variables)
+                return QuantifiedFormula(formula.quantifier, new_variables, formula.formula)
+            if formula.quantifier == Quantifier.Exists:  # push up existential
+                inner = QuantifiedFormula(phi.quantifier, phi.variables, formula.formula)
+                # reordering the quantifiers may trigger further quantifier reordering
+                return QuantifiedFormula(formula.quantifier, formula.variables, self._convert(inner))
+        if formula is phi.formula:
             return phi
+        return QuantifiedFormula(phi.quantifier, phi.variables, formula)
 
     def convert(self):
         self.prenex = self._convert(self.blueprint)
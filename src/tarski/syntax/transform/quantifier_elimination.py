@@ -1,13 +1,18 @@
 """
     Elimination of first-order universal and existential quantifiers.
 """
-import copy
 import itertools
+from typing import List
 from enum import Enum
 
 from ... import errors as err
+from .nnf import to_negation_normal_form
 from .substitutions import create_substitution, substitute_expression
-from ..formulas import land, lor, Quantifier, QuantifiedFormula, Atom, Tautology, Contradiction, CompoundFormula
+from ..formulas import land, lor, Quantifier, QuantifiedFormula, Atom, Tautology, Contradiction, CompoundFormula, \
+    Connective, top, bot
+from ..ops import flatten
+from ..symrefs import symref
+from ..terms import Constant, Variable
 from .errors import TransformationError
 
 
@@ -21,13 +26,20 @@ class QuantifierElimination:
     """ Rewrite the input formula into an equivalent formula where universal and/or existential quantifiers have been
     compiled away by expanding them the finite universe of discourse. Hence, a formula "Forall x p(x)" will be
     transformed into "AND_i p(c_i)", where c_1, ..., c_n are all the (type-consistent) objects in the universe.
+
+    The input formula is never modified, and the subformulas that need no rewriting are shared with the result
+    (and among the different instantiations of a quantified formula). `do_copy` has no effect.
+
+    If a `layout` is given (see `iterate_instantiations`), the static extensions of the layout are used to prune the
+    instantiations that are trivially true (for universal quantifiers) or false (for existential quantifiers).
     """
 
-    def __init__(self, lang, phi, mode, do_copy=True):
+    def __init__(self, lang, phi, mode, do_copy=True, layout=None):  # pylint: disable=unused-argument
         self.lang = lang
         self.mode = mode
+        self.layout = layout
         # self.blueprint = to_prenex_normal_form(lang, phi, do_copy)  # Compile to prenex normal form at preprocessing
-        self.blueprint = copy.deepcopy(phi) if do_copy else phi
+        self.blueprint = phi
         self.result = None
 
     def _eliminate_forall(self):
@@ -41,8 +53,10 @@ class QuantifierElimination:
             return phi  # Already quantifier-free
 
         if isinstance(phi, CompoundFormula):
-            phi.subformulas = tuple(self._convert(sub) for sub in phi.subformulas)
-            return phi
+            subformulas = tuple(self._convert(sub) for sub in phi.subformulas)
+            if all(x is y for x, y in zip(subformulas, phi.subformulas)):
+                return phi
+            return CompoundFormula(phi.connective, subformulas)
 
         if isinstance(phi, QuantifiedFormula):
             if phi.quantifier == Quantifier.Forall:
@@ -54,32 +68,117 @@ class QuantifierElimination:
         raise err.UnexpectedElementType(phi)
 
     def _recurse(self, phi):
-        phi.formula = self._convert(phi.formula)
-        return phi
+        formula = self._convert(phi.formula)
+        if formula is phi.formula:
+            return phi
+        return QuantifiedFormula(phi.quantifier, phi.variables, formula)
 
     def _expand(self, phi: QuantifiedFormula, creator):
-        # Avoiding circular references in the import:
-        from ...grounding.naive import instantiation  # pylint: disable=import-outside-toplevel
-        card, syms, substs = instantiation.enumerate_groundings(phi.variables)
-        if card == 0:
-            raise TransformationError("quantifier elimination", phi, "No constants were defined!")
-        conjuncts = []
-        for values in itertools.product(*substs):
-            subst = create_substitution(syms, values)
-            conjuncts.append(substitute_expression(phi.formula, subst))
-        return creator(*conjuncts)
+        return creator(*iterate_instantiations(phi, self.layout))
 
     def convert(self):
         self.result = self._convert(self.blueprint)
         return self.result
 
     @staticmethod
-    def rewrite(lang, phi, mode, do_copy=True):
-        trans = QuantifierElimination(lang, phi, mode, do_copy)
+    def rewrite(lang, phi, mode, do_copy=True, layout=None):
+        trans = QuantifierElimination(lang, phi, mode, do_copy, layout)
         trans.convert()
         return trans
 
 
-def remove_quantifiers(lang, phi, mode, do_copy=True):
-    trans = QuantifierElimination(lang, phi, mode, do_copy)
+def remove_quantifiers(lang, phi, mode, do_copy=True, layout=None):
+    trans = QuantifierElimination(lang, phi, mode, do_copy, layout)
     return trans.convert()
+
+
+def iterate_instantiations(phi: QuantifiedFormula, layout=None):
+    """ Lazily generate the instantiations phi[x/c] of the body of the given quantified formula, for all tuples c of
+    (type-consistent) objects of the universe of discourse.
+
+    If a layout is given, i.e. an object with a `static` model and an `is_fluent(symbol)` method such as
+    `tarski.evaluators.StaticLayout`, the static literals of the body whose value depends only on the quantified
+    variables are evaluated over the static model during the enumeration, as soon as all of their variables are bound,
+    so that whole subsets of instantiations are discarded at once. These literals are the conjuncts of an existential
+    formula and the disjuncts of a universal formula (once the body is in negation normal form). Only instantiations
+    where all static conjuncts (disjuncts) are true (false) are generated, and these literals are then removed from
+    the instantiated body, since its value is already known.
+    """
+    # Avoiding circular references in the import:
+    from ...grounding.naive import instantiation  # pylint: disable=import-outside-toplevel
+    card, syms, substs = instantiation.enumerate_groundings(phi.variables)
+    if card == 0:
+        raise TransformationError("quantifier elimination", phi, "No constants were defined!")
+
+    guards, body = ([], phi.formula) if layout is None else _split_static_guards(phi, layout)
+    if not guards:
+        for values in itertools.product(*substs):
+            yield substitute_expression(body, create_substitution(syms, values))
+        return
+
+    # Check each guard right after the last of its variables is bound
+    checks: List[List[_StaticGuard]] = [[] for _ in syms]
+    for guard in guards:
+        checks[guard.depth].append(guard)
+
+    for values in _enumerate_bindings(substs, checks, layout.static, 0, []):
+        yield substitute_expression(body, create_substitution(syms, values))
+
+
+def _enumerate_bindings(domains, checks, static, depth, values):
+    for value in domains[depth]:
+        values.append(value)
+        if all(guard.holds(values, static) for guard in checks[depth]):
+            if depth + 1 == len(domains):
+                yield tuple(values)
+            else:
+                yield from _enumerate_bindings(domains, checks, static, depth + 1, values)
+        values.pop()
+
+
+class _StaticGuard:
+    """ A static literal of the body of a quantified formula, whose truth value (as given by the static model) must be
+    equal to `expected` for an instantiation of the formula not to be trivially decided. """
+    __slots__ = ('atom', 'expected', 'arguments', 'depth')
+
+    def __init__(self, atom, expected, positions):
+        self.atom = atom
+        self.expected = expected
+        # Each argument is either the position of a quantified variable, or a constant
+        self.arguments = [positions[symref(t)] if isinstance(t, Variable) else t for t in atom.subterms]
+        self.depth = max((a for a in self.arguments if isinstance(a, int)), default=0)
+
+    def holds(self, values, static):
+        point = tuple(values[a] if isinstance(a, int) else a for a in self.arguments)
+        if self.atom.predicate.builtin:
+            # Avoiding circular references in the import:
+            from ...evaluators.simple import evaluate  # pylint: disable=import-outside-toplevel
+            return evaluate(self.atom.predicate(*point), static) == self.expected
+        return static.holds(self.atom.predicate, point) == self.expected
+
+
+def _split_static_guards(phi: QuantifiedFormula, layout):
+    """ Return the static literals that can be evaluated on each instantiation of the given formula, and the rest of
+    the formula body. """
+    exists = phi.quantifier == Quantifier.Exists
+    connective = Connective.And if exists else Connective.Or
+    body = flatten(to_negation_normal_form(phi.formula))
+    parts = body.subformulas if isinstance(body, CompoundFormula) and body.connective == connective else (body, )
+
+    positions = {symref(v): i for i, v in enumerate(phi.variables)}
+    guards, rest = [], []
+    for part in parts:
+        negated = isinstance(part, CompoundFormula) and part.connective == Connective.Not
+        atom = part.subformulas[0] if negated else part
+        if isinstance(atom, Atom) and (atom.predicate.builtin or not layout.is_fluent(atom.predicate)) and all(
+                isinstance(t, Constant) or (isinstance(t, Variable) and symref(t) in positions) for t in atom.subterms):
+            # In existential formulas, the literal needs to be true, in universal formulas, false
+            guards.append(_StaticGuard(atom, exists != negated, positions))
+        else:
+            rest.append(part)
+
+    if not guards:
+        return guards, phi.formula
+    if exists:
+        return guards, land(*rest, flat=True) if rest else top
+    return guards, lor(*rest, flat=True) if rest else bot
@@ -2,11 +2,9 @@
 import itertools
 from typing import List
 
-from multipledispatch import dispatch  # type: ignore
-
 from ..symrefs import symref
 from ..terms import Variable
-from ..walker import FOLWalker
+from ..walker import FOLWalker, dispatch
 
 
 class ExpressionSubstitutionWalker(FOLWalker):
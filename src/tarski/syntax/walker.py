@@ -1,7 +1,10 @@
 """ A Walker (Visitor) for syntax expressions. """
 
 import copy
+import sys
 from enum import Enum
+from types import MethodType
+from typing import Dict
 
 from ..errors import TarskiError
 
@@ -26,21 +29,89 @@ class WalkerAction(Enum):
         return self.value
 
 
+class TypeDispatcher:
+    """ A method that dispatches on the type of its (single) argument, see `dispatch`. Handlers are registered for
+    types, and the handler for a given argument type is the one registered for the closest class in its MRO.
+    This resolution is done only once per argument type, and cached in a table. """
+    def __init__(self, name):
+        self.name = name
+        self.handlers = {}
+        self.table = {}
+
+        def call(instance, node):
+            handler = self.table.get(node.__class__)
+            if handler is None:
+                handler = self.resolve(node.__class__)
+            return handler(instance, node)
+        self.call = call
+
+    def register(self, type_, handler):
+        self.handlers[type_] = handler
+        self.table.clear()
+
+    def resolve(self, cls):
+        for base in cls.__mro__:
+            handler = self.handlers.get(base)
+            if handler is not None:
+                self.table[cls] = handler
+                return handler
+        raise NotImplementedError(f'Could not find signature for {self.name}: <{cls.__name__}>')
+
+    def __set_name__(self, owner, name):
+        # Inherit the handlers of the homonymous dispatchers of base classes, unless overridden
+        for base in owner.__mro__[1:]:
+            inherited = base.__dict__.get(name)
+            if isinstance(inherited, TypeDispatcher):
+                for type_, handler in inherited.handlers.items():
+                    self.handlers.setdefault(type_, handler)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return MethodType(self.call, instance)
+
+
+def dispatch(type_):
+    """ Decorate a method so that it dispatches on the type of its argument. Several homonymous methods can be
+    declared in the same class body, each of them decorated with the type it handles, and a handler for `object` can
+    act as default. This is a drop-in replacement of the `multipledispatch` decorator, restricted to single dispatch:
+
+    >>> class MyWalker(FOLWalker):
+    >>>     @dispatch(object)
+    >>>     def visit(self, node):  # pylint: disable-msg=E0102
+    >>>         return self.default_handler(node)
+    >>>
+    >>>     @dispatch(Atom)
+    >>>     def visit(self, node):  # pylint: disable-msg=E0102
+    >>>         ...
+    """
+    def register(method):
+        # Find the dispatcher created for previous homonymous methods in the class body being executed, if any
+        dispatcher = sys._getframe(1).f_locals.get(method.__name__)  # pylint: disable=protected-access
+        if not isinstance(dispatcher, TypeDispatcher):
+            dispatcher = TypeDispatcher(method.__name__)
+        dispatcher.register(type_, method)
+        return dispatcher
+    return register
+
+
 class FOLWalker:
-    """ This is an experimental implementation of a visitor pattern based on single-dispatch.
-    At the moment we're using the "multipledispatch" package to implement single-argument dispatching.
-    It's far from perfect; it requires that the subclass declares the following "default" method:
+    """ An implementation of the visitor pattern based on single dispatch. Subclasses implement `visit`, which is
+    called on each node of the expression, from the leaves up, and whose return value replaces the node. To handle
+    different types of nodes differently, `visit` can be declared once per type with the `dispatch` decorator,
+    in which case subclasses need to declare the following "default" method:
 
     >>> @dispatch(object)
     >>> def visit(self, node):  # pylint: disable-msg=E0102
     >>>    return self.default_handler(node)
 
-    Whenever we move to support Python 3.8+, we could directly use:
-        https://docs.python.org/3/library/functools.html#functools.singledispatchmethod
+    If `recursive` is false, expressions are traversed with an explicit stack, rather than through recursive calls,
+    so that arbitrarily deep expressions can be processed.
     """
-    def __init__(self, raise_on_undefined=False):
+    def __init__(self, raise_on_undefined=False, recursive=True):
         self.default_handler = self._raise if raise_on_undefined else self._donothing
         self.context = None
+        self.recursive = recursive
 
     def visit(self, node):
         raise NotImplementedError()
@@ -53,35 +124,133 @@ class FOLWalker:
 
     def run(self, expression, inplace=True):
         # Simply dispatch according to type
-        expression = expression if inplace else copy.deepcopy(expression)
-        return self.visit_expression(expression, inplace=True)
+        return self.visit_expression(expression, inplace=inplace)
 
     def visit_expression(self, node, inplace=True):
-        # pylint: disable=import-outside-toplevel  # Avoiding circular references
-        from .formulas import CompoundFormula, QuantifiedFormula, Atom, Tautology, Contradiction
-        from .terms import Constant, Variable, CompoundTerm, IfThenElse    # pylint: disable=import-outside-toplevel
-        node = node if inplace else copy.deepcopy(node)
-
-        if isinstance(node, (Variable, Constant, Contradiction, Tautology)):
-            pass
+        """ Visit the given expression bottom-up. If `inplace` is false, the given expression is left untouched:
+        only the nodes whose children are changed by the visit are (shallowly) copied, and all other subexpressions
+        are shared between the given expression and the result. Hence, in this case `visit` must not modify the nodes
+        it receives, but return a new node instead. """
+        if not self.recursive:
+            return visit_expression_iteratively(node, self.visit, self.accept, inplace)
 
-        elif isinstance(node, (CompoundTerm, Atom)):
-            node.subterms = self.accept(self.visit_expression(sub, inplace=True) for sub in node.subterms)
+        kind = _node_kinds.get(node.__class__) or node_kind(node.__class__)
+        if kind is NodeKind.Compound:
+            node = _update(node, inplace, subterms=self.accept(
+                self.visit_expression(sub, inplace) for sub in node.subterms))
 
-        elif isinstance(node, CompoundFormula):
-            node.subformulas = self.accept(self.visit_expression(sub, inplace=True) for sub in node.subformulas)
+        elif kind is NodeKind.CompoundFormula:
+            node = _update(node, inplace, subformulas=self.accept(
+                self.visit_expression(sub, inplace) for sub in node.subformulas))
 
-        elif isinstance(node, IfThenElse):
-            node.condition = self.visit_expression(node.condition, inplace=True)
-            node.subterms = self.accept(self.visit_expression(sub, inplace=True) for sub in node.subterms)
+        elif kind is NodeKind.IfThenElse:
+            node = _update(node, inplace, condition=self.visit_expression(node.condition, inplace),
+                           subterms=self.accept(self.visit_expression(sub, inplace) for sub in node.subterms))
 
-        elif isinstance(node, QuantifiedFormula):
-            node.formula = self.visit_expression(node.formula, inplace=True)
-            node.variables = self.accept(self.visit_expression(eff, inplace=True) for eff in node.variables)
-        else:
-            raise RuntimeError(f'Unexpected expression "{node}" of type "{type(node)}"')
+        elif kind is NodeKind.Quantified:
+            node = _update(node, inplace, formula=self.visit_expression(node.formula, inplace),
+                           variables=self.accept(self.visit_expression(eff, inplace) for eff in node.variables))
 
         return self.visit(node)
 
     def accept(self, iterator):
         return [x for x in iterator if x is not WalkerAction.Supress]
+
+
+class NodeKind(Enum):
+    """ The different kinds of expression nodes, as far as the traversal of their children is concerned. """
+    Leaf = "leaf"
+    Compound = "compound"  # Compound terms and atoms
+    CompoundFormula = "compound-formula"
+    IfThenElse = "ite"
+    Quantified = "quantified"
+
+
+# A cache mapping each expression class to its NodeKind
+_node_kinds: Dict[type, NodeKind] = {}
+
+
+def node_kind(cls):
+    """ Return the NodeKind of the expressions of the given class. """
+    kind = _node_kinds.get(cls)
+    if kind is not None:
+        return kind
+
+    # pylint: disable=import-outside-toplevel  # Avoiding circular references
+    from .formulas import CompoundFormula, QuantifiedFormula, Atom, Tautology, Contradiction
+    from .terms import Constant, Variable, CompoundTerm, IfThenElse
+    for types, kind in [((Variable, Constant, Contradiction, Tautology), NodeKind.Leaf),
+                        ((CompoundTerm, Atom), NodeKind.Compound),
+                        (CompoundFormula, NodeKind.CompoundFormula),
+                        (IfThenElse, NodeKind.IfThenElse),
+                        (QuantifiedFormula, NodeKind.Quantified)]:
+        if issubclass(cls, types):
+            _node_kinds[cls] = kind
+            return kind
+    raise RuntimeError(f'Unexpected expression of type "{cls}"')
+
+
+def visit_expression_iteratively(root, visit, accept, inplace=True):
+    """ Visit all nodes of the given expression in the same (post-)order as `FOLWalker.visit_expression`, modifying
+    (or copying) the expression in the same way, but with an explicit stack instead of recursive calls. """
+    stack, results = [(root, False)], []
+    while stack:
+        node, expanded = stack.pop()
+        kind = _node_kinds.get(node.__class__) or node_kind(node.__class__)
+        if not expanded:
+            if kind is NodeKind.Leaf:
+                results.append(visit(node))
+                continue
+            if kind is NodeKind.Compound:
+                children = node.subterms
+            elif kind is NodeKind.CompoundFormula:
+                children = node.subformulas
+            elif kind is NodeKind.IfThenElse:
+                children = (node.condition, ) + tuple(node.subterms)
+            else:
+                children = (node.formula, ) + tuple(node.variables)
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+
+        # All children have been visited, and their results are on top of the results stack
+        if kind is NodeKind.Compound:
+            node = _update(node, inplace, subterms=accept(_pop(results, len(node.subterms))))
+        elif kind is NodeKind.CompoundFormula:
+            node = _update(node, inplace, subformulas=accept(_pop(results, len(node.subformulas))))
+        elif kind is NodeKind.IfThenElse:
+            visited = _pop(results, 1 + len(node.subterms))
+            node = _update(node, inplace, condition=visited[0], subterms=accept(visited[1:]))
+        else:
+            visited = _pop(results, 1 + len(node.variables))
+            node = _update(node, inplace, formula=visited[0], variables=accept(visited[1:]))
+        results.append(visit(node))
+
+    return results[0]
+
+
+def _update(node, inplace, **children):
+    """ Set the given (visited) children of the given node, either in place, or on a shallow copy of the node.
+    In the latter case, the node itself is returned if all children are the same objects it already has. """
+    if not inplace:
+        if all(_same(getattr(node, name), value) for name, value in children.items()):
+            return node
+        node = copy.copy(node)
+    for name, value in children.items():
+        setattr(node, name, value)
+    return node
+
+
+def _same(current, visited):
+    if isinstance(visited, list):
+        return len(current) == len(visited) and all(x is y for x, y in zip(current, visited))
+    return current is visited
+
+
+def _pop(stack, n):
+    """ Pop the top n elements of the given stack, and return them in stack order. """
+    if n == 0:
+        return []
+    popped = stack[-n:]
+    del stack[-n:]
+    return popped
@@ -135,7 +135,17 @@ def load_random_theory(lang):
 
 def create_casting_handler(lang, symbol, factory_method):
     """ """
-    def handler(lhs, rhs):
-        lhs, rhs = cast_to_closest_common_numeric_ancestor(lang, lhs, rhs)
-        return factory_method(symbol, lhs, rhs)
-    return handler
+    return CastingHandler(lang, symbol, factory_method)
+
+
+class CastingHandler:
+    """ An operator handler that casts both operands to their closest common numeric ancestor sort before creating the
+    term or atom. Defined as a class rather than as a closure so that languages can be pickled. """
+    def __init__(self, lang, symbol, factory_method):
+        self.lang = lang
+        self.symbol = symbol
+        self.factory_method = factory_method
+
+    def __call__(self, lhs, rhs):
+        lhs, rhs = cast_to_closest_common_numeric_ancestor(self.lang, lhs, rhs)
+        return self.factory_method(self.symbol, lhs, rhs)
@@ -0,0 +1,53 @@
+""" Helpers to work with (possibly large) iterables in a streaming fashion. """
+import queue
+import threading
+
+_END = object()
+
+
+def prefetch(iterable, size=128):
+    """ Iterate over the given iterable, consuming it in a background worker thread that keeps up to `size` elements
+    ready in a bounded buffer, so that producing and consuming the elements can overlap.
+    Exceptions raised by the iterable are re-raised in the consumer. If the consumer stops iterating before
+    exhausting the iterable (i.e. the generator is closed or garbage-collected), the worker thread stops as well.
+    """
+    if size <= 0:
+        raise ValueError(f'Prefetch buffer size must be positive, got "{size}"')
+    return _prefetch(iterable, size)
+
+
+def _prefetch(iterable, size):
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def work():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:  # pylint: disable=broad-except  # Re-raised in the consumer thread
+            put((_END, e))
+            return
+        put((_END, None))
+
+    worker = threading.Thread(target=work, name='tarski-prefetch', daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import tarski
+from tarski import errors
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.evaluators import BatchEvaluator, evaluate_batch
+from tarski.evaluators.simple import evaluate
+from tarski.grounding import LPGroundingStrategy
+from tarski.grounding.common import StateVariableLite
+from tarski.model import Model
+from tarski.search.operations import progress
+from tarski.syntax import land, lor, neg, top, bot, exists
+from tarski.syntax.arithmetic import special
+from tarski.theories import Theory
+from tarski.util import SymbolIndex
+
+
+def test_batch_evaluation_matches_evaluate():
+    problem = generate_strips_blocksworld_problem(nblocks=3)
+    lang = problem.language
+    clear, on, handempty, b1, b2, b3 = lang.get('clear', 'on', 'handempty', 'b1', 'b2', 'b3')
+    grounding = LPGroundingStrategy(problem)
+    operators = list(grounding.iterate_ground_operators())
+    index = grounding.ground_state_variables()
+
+    formulas = [problem.goal, top, bot, neg(clear(b1)), lor(on(b1, b2), handempty()), b1 == b2, b1 != b2,
+                land(clear(b1), neg(b1 == b3), lor(clear(b2), clear(b3), handempty()))]
+    formulas += [op.precondition for op in operators]
+
+    init = problem.init
+    states = [init] + [progress(init, op) for op in operators if evaluate(op.precondition, init)]
+    evaluator = BatchEvaluator(index, problem.init)
+    matrix = evaluator.states_to_matrix(states)
+    assert matrix.shape == (len(states), len(index)) and matrix.dtype == bool
+
+    result = evaluator.evaluate(formulas, matrix)
+    assert result.shape == (len(states), len(formulas)) and result.dtype == bool
+    expected = np.array([[evaluate(phi, state) for phi in formulas] for state in states])
+    assert (result == expected).all()
+
+    assert (evaluate_batch(formulas, states, index, problem.init) == expected).all()
+
+    x = lang.variable('x', lang.get('object'))
+    with pytest.raises(errors.TarskiError):
+        evaluator.evaluate([exists(x, clear(x))], matrix)
+
+
+def test_batch_evaluation_of_numeric_expressions():
+    lang = tarski.language(theories=[Theory.ARITHMETIC, Theory.SPECIAL])
+    f = lang.function('f', lang.Object, lang.Real)
+    g = lang.function('g', lang.Object, lang.Real)
+    o1, o2 = lang.constant("o1", lang.Object), lang.constant("o2", lang.Object)
+
+    static = Model(lang)
+    static.set(g(o1), 3.0)
+
+    index = SymbolIndex()
+    index.add(StateVariableLite(f, (o1, )))
+    index.add(StateVariableLite(f, (o2, )))
+    matrix = np.array([[1.0, 2.0], [4.0, 0.5], [-1.0, -1.0]])
+
+    one = lang.constant(1, lang.Real)
+    expressions = [f(o1), f(o1) + f(o2), f(o1) * g(o1), special.max(f(o1), f(o2)), special.abs(f(o1)),
+                   f(o1) < f(o2), land(f(o1) <= g(o1), f(o2) > one), g(o1) + 1]
+    result = evaluate_batch(expressions, matrix, index, static)
+    assert result.dtype == float
+    assert result.tolist() == [[1.0, 3.0, 3.0, 2.0, 1.0, 1.0, 1.0, 4.0],
+                               [4.0, 4.5, 12.0, 4.0, 4.0, 0.0, 0.0, 4.0],
+                               [-1.0, -2.0, -3.0, -1.0, 1.0, 0.0, 0.0, 4.0]]
+
+    # Terms that are neither state variables nor defined in the static model are undefined
+    with pytest.raises(errors.UndefinedTerm):
+        evaluate_batch([g(o2)], matrix, index)
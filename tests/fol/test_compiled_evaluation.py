@@ -0,0 +1,64 @@
+import pytest
+
+import tarski
+from tarski import errors
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.evaluators import compile_expression, StaticLayout
+from tarski.evaluators.simple import evaluate
+from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
+from tarski.model import Model
+from tarski.search.operations import progress
+from tarski.syntax import land, lor, neg, top, bot
+from tarski.theories import Theory
+
+
+def test_compiled_evaluation_matches_evaluate():
+    problem = generate_strips_blocksworld_problem(nblocks=3)
+    lang = problem.language
+    clear, on, handempty, b1, b2, b3 = lang.get('clear', 'on', 'handempty', 'b1', 'b2', 'b3')
+    operators = ground_problem_schemas_into_plain_operators(problem)
+
+    formulas = [problem.goal, top, bot, neg(clear(b1)), lor(on(b1, b2), handempty()), b1 == b2, b1 != b2,
+                land(clear(b1), neg(b1 == b3), lor(clear(b2), clear(b3), handempty()))]
+    formulas += [op.precondition for op in operators]
+
+    states = [problem.init]
+    states += [progress(problem.init, op) for op in operators if evaluate(op.precondition, problem.init)]
+    for phi in formulas:
+        compiled = compile_expression(phi)
+        for state in states:
+            assert compiled(state) == evaluate(phi, state)
+
+
+def test_compiled_evaluation_of_terms_and_static_folding():
+    lang = tarski.language(theories=[Theory.ARITHMETIC])
+    leq = lang.predicate('leq', lang.Integer, lang.Integer)
+    f = lang.function('f', lang.Object, lang.Integer)
+    g = lang.function('g', lang.Object, lang.Integer)
+    o1, o2 = lang.constant("o1", lang.Object), lang.constant("o2", lang.Object)
+
+    model = Model(lang)
+    model.set(f(o1), 1)
+    model.set(f(o2), 2)
+    for x in range(0, 5):
+        for y in range(x, 5):
+            model.add(leq, x, y)
+
+    for term in [f(o1), f(o1) + 1, f(o2) * f(o1)]:
+        assert compile_expression(term)(model).symbol == evaluate(term, model).symbol
+    for phi in [leq(f(o1), f(o2)), leq(f(o2), f(o1)), f(o1) < f(o2)]:
+        assert compile_expression(phi)(model) == evaluate(phi, model)
+
+    # If all symbols are static, the expression is evaluated at compilation time
+    phi = land(leq(f(o1), f(o2)), f(o1) < f(o2))
+    compiled = compile_expression(phi, StaticLayout(model, {leq, f}))
+    assert compiled(Model(lang)) is True
+
+    # If f is fluent, only leq lookups are direct
+    compiled = compile_expression(phi, StaticLayout(model, {leq}))
+    assert compiled(model) is True
+    with pytest.raises(errors.UndefinedTerm):
+        compiled(Model(lang))
+
+    with pytest.raises(errors.UndefinedTerm):
+        compile_expression(g(o1))(model)
@@ -8,7 +8,8 @@ from tarski import errors
 
 from ..common import numeric
 from tarski.evaluators.simple import evaluate
-from tarski.syntax import Constant, ite, symref
+from tarski.syntax import Constant, ite, symref, exists, forall, implies
+from tarski.syntax.transform import remove_quantifiers, QuantifierEliminationMode
 from tarski.theories import Theory
 from tarski.modules import import_scipy_special
 
@@ -363,6 +364,41 @@ def test_predicate_extensions():
         model.remove(pred, o1, o2)
 
 
+def test_model_hashing_and_equality():
+    lang = tarski.language(theories=[Theory.ARITHMETIC])
+    pred = lang.predicate('pred', lang.Object, lang.Object)
+    f = lang.function('f', lang.Object, lang.Integer)
+    o1, o2 = lang.constant("o1", lang.Object), lang.constant("o2", lang.Object)
+
+    m1, m2 = Model(lang), Model(lang)
+    assert m1 == m2 and hash(m1) == hash(m2)
+
+    m1.add(pred, o1, o2)
+    m1.add(pred, o2, o1)
+    m1.set(f(o1), 3)
+    m2.set(f(o1), 2)
+    m2.add(pred, o2, o1)
+    m2.add(pred, o1, o2)
+    m2.add(pred, o1, o2)  # Adding an atom twice does not alter the hash
+    assert m1 != m2
+    m2.set(f(o1), 3)
+    assert m1 == m2 and hash(m1) == hash(m2)
+    assert len({m1, m2}) == 1
+
+    # A model with an empty extension for some symbol is equal to one where that symbol was never used
+    m1.discard(pred, o1, o2)
+    m1.remove(pred, o2, o1)
+    m1.discard(pred, o2, o1)
+    m3 = Model(lang)
+    m3.set(f(o1), 3)
+    assert m1 == m3 and hash(m1) == hash(m3)
+
+    # Direct manipulation of extensions requires recomputing the hash
+    m3.predicate_extensions[pred.signature] = set(m2.predicate_extensions[pred.signature])
+    m3.recompute_hash()
+    assert m3 == m2 and hash(m3) == hash(m2)
+
+
 def test_predicate_without_equality():
     lang = tarski.language(theories=[Theory.ARITHMETIC])
     leq = lang.predicate('leq', lang.Integer, lang.Integer)
@@ -511,3 +547,83 @@ def test_matrix_evaluation_case_2():
     x0.set(z(), 3.0)
     # print(x0[I @ v][2, 0])
     assert x0[I @ v][2, 0].is_syntactically_equal(lang.constant(3.0, lang.Real))
+
+
+def test_quantified_formula_evaluation():
+    problem = tarski.benchmarks.blocksworld.generate_strips_blocksworld_problem(nblocks=4)
+    lang = problem.language
+    clear, on, ontable, handempty = lang.get('clear', 'on', 'ontable', 'handempty')
+    x, y, z = (lang.variable(name, lang.get_sort('object')) for name in 'xyz')
+    init = problem.init
+
+    formulas = [exists(x, clear(x)), exists(x, y, on(x, y) & on(y, x)), forall(x, implies(clear(x), ontable(x))),
+                exists(x, forall(y, ~on(y, x))), forall(x, exists(y, on(x, y) | ontable(x))),
+                exists(x, y, z, on(x, y) & on(y, z)), exists(x, y, on(x, y) & (x != y)), exists(x, on(x, x)),
+                forall(x, y, implies(on(x, y), ~on(y, x))), exists(x, handempty())]
+    for phi in formulas:
+        expanded = remove_quantifiers(lang, phi, QuantifierEliminationMode.All)
+        assert evaluate(phi, init) == evaluate(expanded, init)
+
+    # Free variables are given a value through the substitution sigma
+    assert evaluate(exists(y, on(x, y)), init, {symref(x): lang.get('b1')}) == \
+        evaluate(exists(y, on(lang.get('b1'), y)), init)
+
+
+def test_model_query():
+    problem = tarski.benchmarks.blocksworld.generate_strips_blocksworld_problem(nblocks=4)
+    lang = problem.language
+    on, clear = lang.get('on', 'clear')
+    b1, b2, b3, b4 = lang.get('b1', 'b2', 'b3', 'b4')
+    x = lang.variable('x', lang.get_sort('object'))
+
+    model = Model(lang)
+    model.add(on, b1, b2)
+    model.add(on, b1, b3)
+    model.add(on, b4, b4)
+
+    def names(tuples):
+        return sorted(tuple(c.name for c in t) for t in tuples)
+
+    assert names(model.query(on, (b1, None))) == [('b1', 'b2'), ('b1', 'b3')]
+    assert names(model.query(on, (None, b3))) == [('b1', 'b3')]
+    assert names(model.query(on, (None, None))) == [('b1', 'b2'), ('b1', 'b3'), ('b4', 'b4')]
+    assert names(model.query(on, (x, x))) == [('b4', 'b4')]
+    assert names(model.query(on, (b1, b2))) == [('b1', 'b2')]
+    assert model.query(clear, (None, )) == [] and model.query(on, (b2, None)) == []
+
+    # Indexes are maintained incrementally once built
+    model.add(on, b1, b4)
+    model.remove(on, b1, b2)
+    model.discard(on, b1, b3)
+    assert names(model.query(on, (b1, None))) == [('b1', 'b4')]
+    model.remove_symbol(on)
+    assert model.query(on, (b1, None)) == []
+
+    with pytest.raises(errors.ArityMismatch):
+        model.query(on, (b1, ))
+
+
+def test_model_bulk_loading():
+    lang = tarski.language(theories=[Theory.ARITHMETIC])
+    pred = lang.predicate('pred', lang.Object, lang.Object)
+    f = lang.function('f', lang.Object, lang.Integer)
+    o1, o2, o3 = (lang.constant(f'o{i}', lang.Object) for i in range(1, 4))
+
+    m1, m2 = Model(lang), Model(lang)
+    assert m1.query(pred, (o1, None)) == []  # Build some index, which needs to be maintained by add_many
+    m1.add_many(pred, [(o1, o2), (o2, o3), (o1, o2), (o1, o3)])
+    m1.set_many(f, [((o1, ), 1), ((o2, ), 2), ((o1, ), 3)])
+    for point in [(o1, o2), (o2, o3), (o1, o3)]:
+        m2.add(pred, *point)
+    m2.set(f(o2), 2)
+    m2.set(f(o1), 3)
+    assert m1 == m2 and hash(m1) == hash(m2)
+    assert sorted(c.name for _, c in m1.query(pred, (o1, None))) == ['o2', 'o3']
+    assert m1.value(f, (o1, )).symbol == 3
+
+    with pytest.raises(errors.ArityMismatch):
+        m1.add_many(pred, [(o1, o2), (o1, )])
+    with pytest.raises(errors.SortMismatch):
+        m1.set_many(f, [((o1, ), 1), ((o2, ), o3)])
+    with pytest.raises(errors.SemanticError):
+        m1.add_many(f, [(o1, )])
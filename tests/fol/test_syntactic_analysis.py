@@ -1,6 +1,8 @@
 
-from tarski.syntax import neg, land, lor, exists, symref, forall, Variable, Constant, Atom
+from tarski.syntax import neg, land, lor, exists, symref, forall, Variable, Constant, Atom, Term
 from tarski.syntax.ops import free_variables, flatten, collect_unique_nodes, all_variables
+from tarski.syntax.transform.substitutions import ExpressionSubstitutionWalker
+from tarski.syntax.walker import FOLWalker, dispatch
 from tests.common import tarskiworld
 from tests.common.blocksworld import generate_bw_loc_and_clear
 
@@ -68,3 +70,85 @@ def test_node_collection():
     assert len(collect_unique_nodes(e)) == 12
     assert len(collect_unique_nodes(e, lambda x: isinstance(x, Variable))) == 1
 
+
+class _DispatchingWalker(FOLWalker):
+    def __init__(self, recursive=True):
+        super().__init__(recursive=recursive)
+        self.visited = []
+
+    @dispatch(object)
+    def visit(self, node):  # pylint: disable-msg=E0102
+        self.visited.append(str(node))
+        return self.default_handler(node)
+
+    @dispatch(Term)
+    def visit(self, node):  # pylint: disable-msg=E0102  # noqa: F811
+        self.visited.append(f'term:{node}')
+        return node
+
+
+class _ConstantOnlyWalker(_DispatchingWalker):
+    @dispatch(Constant)
+    def visit(self, node):  # pylint: disable-msg=E0102  # noqa: F811
+        self.visited.append(f'constant:{node}')
+        return node
+
+
+class _CountingWalker(FOLWalker):
+    def __init__(self, recursive=True):
+        super().__init__(recursive=recursive)
+        self.count = 0
+
+    def visit(self, node):
+        self.count += 1
+        return node
+
+
+def test_type_dispatching_walkers():
+    lang = generate_bw_loc_and_clear(3)
+    b1, b2, b3, clear, loc = lang.get('b1', 'b2', 'b3', 'clear', 'loc')
+    v = Variable('x', lang.Object)
+    e = forall(v, clear(b1) | (loc(v) == b3) & neg(clear(loc(b2))))
+
+    walker = _DispatchingWalker()
+    walker.run(e)
+    # Handlers are resolved by MRO: Variables, Constants and CompoundTerms all go to the Term handler
+    assert walker.visited[:3] == ['term:b1', 'clear(b1)', 'term:x']
+
+    # Handlers are inherited, and can be overridden for some subclasses only
+    walker = _ConstantOnlyWalker()
+    walker.run(e)
+    assert walker.visited[:3] == ['constant:b1', 'clear(b1)', 'term:x']
+
+    # The non-recursive traversal visits the same nodes in the same order
+    iterative = _ConstantOnlyWalker(recursive=False)
+    iterative.run(e)
+    assert iterative.visited == walker.visited
+
+    # Expressions deeper than the recursion limit can be traversed
+    deep = clear(b1)
+    for _ in range(5000):
+        deep = neg(deep)
+    walker = _CountingWalker(recursive=False)
+    assert walker.run(deep) is deep and walker.count == 5002
+
+
+def test_non_inplace_walks_share_unmodified_subexpressions():
+    lang = generate_bw_loc_and_clear(3)
+    b1, b2, b3, clear, loc = lang.get('b1', 'b2', 'b3', 'clear', 'loc')
+    v = Variable('x', lang.Object)
+    untouched = neg(clear(loc(b2)))
+    e = land(clear(v), loc(b3) == b1, untouched, flat=True)
+    text = str(e)
+
+    for recursive in (True, False):
+        walker = ExpressionSubstitutionWalker({symref(v): b2})
+        walker.recursive = recursive
+        result = walker.run(e, inplace=False)
+        assert str(result) == str(land(clear(b2), loc(b3) == b1, untouched, flat=True)) and str(e) == text
+        # Only the nodes along the path to the substituted variable are new
+        assert result is not e and result.subformulas[0] is not e.subformulas[0]
+        assert result.subformulas[1] is e.subformulas[1] and result.subformulas[2] is untouched
+
+        # If nothing changes, no node is copied at all
+        assert walker.run(untouched, inplace=False) is untouched
@@ -1,5 +1,6 @@
 
 import copy
+import pickle
 from collections import defaultdict
 
 import pytest
@@ -8,11 +9,12 @@ from tarski import theories, Term, Constant
 from tarski.benchmarks.blocksworld import generate_strips_bw_language
 from tarski.fstrips import fstrips
 from tarski.syntax import symref, CompoundFormula, Atom, ite, AggregateCompoundTerm, CompoundTerm, lor, Tautology, \
-    Contradiction, land, top, bot
+    Contradiction, land, top, bot, exists, neg, InterningFactory, is_canonical, Connective
 from tarski.theories import Theory
 from tarski import errors as err
 from tarski import fstrips as fs
 from tarski.syntax.algebra import Matrix
+from tarski.syntax.transform.substitutions import substitute_expression
 
 from ..common import numeric
 
@@ -142,6 +144,29 @@ def test_copying_and_equality():
     # TODO Test equality
 
 
+def test_slotted_expressions_copying_and_pickling():
+    lang = fstrips.language('arith', [Theory.EQUALITY, Theory.ARITHMETIC])
+    p = lang.predicate('p', lang.Integer)
+    f = lang.function('f', lang.Object, lang.Integer)
+    o = lang.constant("o", lang.Object)
+    z = lang.variable('z', lang.Integer)
+    phi = exists(z, land(p(z), neg(f(o) <= z)))
+    effects = [fs.AddEffect(p(f(o)), phi), fs.FunctionalEffect(f(o), f(o) + 1), fs.UniversalEffect([z], [])]
+
+    for element in [phi, phi.formula, f(o), o, z, symref(f(o))] + effects:
+        assert not hasattr(element, '__dict__')
+        assert str(copy.deepcopy(element)) == str(element)
+        assert str(pickle.loads(pickle.dumps(element))) == str(element)
+
+    restored = pickle.loads(pickle.dumps(phi))
+    assert restored == phi and symref(restored.formula.subformulas[1]) == symref(phi.formula.subformulas[1])
+
+    # Copies of canonical expressions are not canonical
+    factory = InterningFactory()
+    t1 = factory.term(f, o)
+    assert is_canonical(t1) and not is_canonical(copy.copy(t1)) and not is_canonical(copy.deepcopy(t1))
+
+
 def test_duplicate_detection_and_global_getter():
     lang = fstrips.language("test")
 
@@ -230,6 +255,50 @@ def test_term_refs_compound():
     assert tr1 != tr3
 
 
+def test_interned_expressions():
+    lang = fstrips.language(theories=[Theory.ARITHMETIC])
+    f = lang.function('f', lang.Object, lang.Integer)
+    p = lang.predicate('p', lang.Object, lang.Integer)
+    o1, o2 = lang.constant("o1", lang.Object), lang.constant("o2", lang.Object)
+    x = lang.variable('x', lang.Object)
+
+    factory = InterningFactory()
+    t1 = factory.term(f, o1)
+    assert t1 is factory.intern(f(o1)) and t1 is factory.term(f, o1)
+    assert t1 is not factory.term(f, o2) and is_canonical(t1) and not is_canonical(f(o1))
+    assert factory.intern(o1) is o1
+
+    a1 = factory.atom(p, o1, f(o1))
+    assert a1.subterms[1] is t1 and factory.intern(p(o1, f(o1))) is a1
+    phi = factory.intern(exists(x, land(p(x, f(x)), neg(p(o1, f(o1))))))
+    assert phi is factory.intern(exists(x, land(p(x, f(x)), neg(p(o1, f(o1))))))
+    assert phi.formula.subformulas[1].subformulas[0] is a1
+
+    # The container of the subformulas is irrelevant, and canonical formulas always hold them in tuples
+    conj = factory.intern(CompoundFormula(Connective.And, [p(o1, f(o1)), p(o2, f(o2))]))
+    assert conj is factory.intern(CompoundFormula(Connective.And, (p(o1, f(o1)), p(o2, f(o2)))))
+    assert isinstance(conj.subformulas, tuple) and conj.subformulas[0] is a1
+    assert factory.intern(neg(a1)) is factory.intern(CompoundFormula(Connective.Not, (a1, )))
+
+    # Cached hashes agree with the standard ones, so that canonical and non-canonical expressions can be mixed
+    for expression in [t1, a1, phi, o1]:
+        assert hash(symref(expression)) == expression.hash()
+    counter = {symref(t1): 1, symref(a1): 2}
+    assert counter[symref(f(o1))] == 1 and counter[symref(p(o1, f(o1)))] == 2
+    assert symref(t1) == symref(f(o1)) and symref(t1) != symref(factory.term(f, o2))
+
+    with pytest.raises(err.TarskiError):
+        factory.intern(ite(p(o1, lang.constant(1, lang.Integer)), o1, o2))
+
+    # Expressions owned by the caller never become canonical, as the caller might later modify them in place
+    t3 = f(lang.constant("o3", lang.Object))
+    canonical = factory.intern(t3)
+    assert canonical is not t3 and not is_canonical(t3) and factory.intern(t3) is canonical
+    substitute_expression(t3, {symref(t3.subterms[0]): o1}, inplace=True)
+    assert str(canonical) == 'f(o3)' and factory.intern(t3) is t1
+    assert hash(symref(canonical)) == canonical.hash()
+
+
 def test_formula_refs():
     lang = fstrips.language('arith', [Theory.EQUALITY, Theory.ARITHMETIC])
 
@@ -1,13 +1,16 @@
+import itertools
 from collections import OrderedDict
 
+from tarski import fstrips as fs
 from tarski.fstrips import DelEffect, UniversalEffect, AddEffect
 from tarski.fstrips.action import PlainOperator
+from tarski.fstrips.manipulation import Simplify
 from tarski.fstrips.representation import is_ground
 from tarski.grounding import ProblemGrounding
 from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
-from tarski.syntax import symref
+from tarski.syntax import symref, exists
 from tarski.syntax.transform.action_grounding import ground_schema_into_plain_operator, \
-    ground_schema_into_plain_operator_from_grounding
+    ground_schema_into_plain_operator_from_grounding, compile_action_template
 from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
 
 from tests.common import blocksworld
@@ -74,3 +77,45 @@ def test_complex_action_grounding():
     eff = op.effects[0]
 
     assert all(is_ground(sube.atom) for sube in eff.effects)
+
+
+def test_template_based_action_grounding():
+    problem = generate_strips_blocksworld_problem(nblocks=3)
+    lang = problem.language
+    handempty, clear, on, b1, b2 = lang.get('handempty', 'clear', 'on', 'b1', 'b2')
+    x, y = lang.variable('x', 'object'), lang.variable('y', 'object')
+
+    problem.action('complex', [x],
+                   precondition=exists(y, on(x, y) & clear(y)) & handempty(),
+                   effects=[UniversalEffect([y], effects=[AddEffect(clear(y), on(x, y))]), DelEffect(handempty())])
+
+    for action in problem.actions.values():
+        template = compile_action_template(action)
+        for grounding in itertools.permutations([b1, b2], len(action.parameters)):
+            expected = ground_schema_into_plain_operator_from_grounding(action, grounding)
+            operator = template.instantiate([c.name for c in grounding])
+            assert operator.name == expected.name and operator.precondition == expected.precondition
+            assert str(operator.effects) == str(expected.effects)
+            assert all(is_ground(eff.atom) for eff in operator.effects if isinstance(eff, (AddEffect, DelEffect)))
+
+
+def test_template_based_operators_do_not_share_mutable_subexpressions():
+    lang = fs.language('sharing')
+    a, b = lang.constant('a', 'object'), lang.constant('b', 'object')
+    q, r, s = [lang.predicate(name, 'object') for name in 'qrs']
+    x = lang.variable('x', 'object')
+    problem = fs.create_fstrips_problem(lang, problem_name='sharing', domain_name='sharing')
+    problem.init.add(q, a)
+
+    # s is static and false everywhere, so simplification removes s(a) from the disjunction, which does not mention x
+    action = problem.action('act', [x], precondition=q(x) & (s(a) | r(a) | r(b)), effects=[AddEffect(r(x))])
+    schema_precondition = str(action.precondition)
+    template = compile_action_template(action)
+    operator, sibling = template.instantiate(['a']), template.instantiate(['b'])
+    sibling_precondition = str(sibling.precondition)
+
+    assert Simplify(problem, problem.init).simplify_action(operator, inplace=True) is not None
+    assert 's(a)' not in str(operator.precondition) and 's(a)' in schema_precondition
+    assert str(action.precondition) == schema_precondition
+    assert str(sibling.precondition) == sibling_precondition
+    assert str(template.instantiate(['b']).precondition) == sibling_precondition
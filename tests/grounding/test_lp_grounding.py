@@ -3,8 +3,10 @@ import pytest
 
 from tarski.grounding import LPGroundingStrategy, NaiveGroundingStrategy
 from tarski.grounding.errors import ReachabilityLPUnsolvable
-from tarski.grounding.lp_grounding import compute_action_groundings
-from tarski.reachability import create_reachability_lp
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.grounding.lp_grounding import compute_action_groundings, ground_problem_schemas_into_plain_operators, \
+    iterate_problem_schemas_into_plain_operators
+from tarski.reachability import create_reachability_lp, clingo_module_available
 from tarski.syntax import neg
 from tests.common.benchmarks import get_lenient_benchmarks
 
@@ -12,7 +14,7 @@ from tests.common.gripper import create_sample_problem
 from tests.common.simple import create_simple_problem
 from ..io.common import reader, collect_strips_benchmarks, parse_benchmark_instance
 
-if shutil.which("gringo") is None:
+if shutil.which("gringo") is None and not clingo_module_available():
     pytest.skip('Install the Clingo ASP solver and put the "gringo" binary on your PATH in order to test ASP-based '
                 "reachability analysis", allow_module_level=True)
 
@@ -191,3 +193,19 @@ def test_ignore_unused_types():
 
     actions = compute_action_groundings(problem)
     assert actions['oxidationofborane'] == set()
+
+
+def test_streaming_operator_grounding():
+    problem = generate_strips_blocksworld_problem(nblocks=4)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+
+    grounding = LPGroundingStrategy(problem)
+    stream = grounding.iterate_ground_operators()
+    assert next(stream).name == operators[0].name
+    assert [op.name for op in stream] == [op.name for op in operators[1:]]
+
+    assert len(list(grounding.iterate_schema_ground_operators('stack'))) == 12
+    assert len(list(grounding.iterate_over_schema_groundings('stack'))) == 12
+
+    prefetched = iterate_problem_schemas_into_plain_operators(problem, prefetch=5)
+    assert [op.name for op in prefetched] == [op.name for op in operators]
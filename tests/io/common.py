@@ -5,11 +5,11 @@ from tarski.io import FstripsReader
 from tarski.io.utils import find_domain_filename
 
 
-def reader(theories=None, strict_with_requirements=True, case_insensitive=False):
+def reader(theories=None, strict_with_requirements=True, case_insensitive=False, fast_parser=False):
     """ Return a reader configured to raise exceptions on syntax errors """
     return FstripsReader(raise_on_error=True, theories=theories,
                          strict_with_requirements=strict_with_requirements,
-                         case_insensitive=case_insensitive)
+                         case_insensitive=case_insensitive, fast_parser=fast_parser)
 
 
 def get_benchmark_dir_if_exists(envvar):
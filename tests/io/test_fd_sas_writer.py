@@ -1,11 +1,12 @@
-import pytest
-
+import io
 import tempfile
 
+import pytest
+
 import tarski as tsk
 from tarski.theories import Theory
 from tarski.syntax import land, symref
-from tarski.io.sas.fd import Writer
+from tarski.io.sas.fd import Writer, load, ParsingError
 from tarski.sas import Action
 from tarski.util import SymbolIndex
 
@@ -186,4 +187,109 @@ def test_gripper_instance():
                goal=goal_state).dump(outstream)
         outstream.seek(0)
         written_data = outstream.read()
-        print(written_data)
\ No newline at end of file
+
+    lines = written_data.splitlines()
+    assert lines[:7] == ['begin_version', '3', 'end_version', 'begin_metric', '0', 'end_metric', '7']
+    assert lines[8:12] == ['var0', '-1', '5', 'carry(ball0, right)']
+    assert lines[lines.index('begin_state'):lines.index('end_state') + 1] == \
+        ['begin_state', '0', '0', '0', '2', '2', '0', '0', 'end_state']
+    assert lines[lines.index('begin_goal'):lines.index('end_goal') + 1] == \
+        ['begin_goal', '4', '2 1', '3 1', '4 1', '5 1', 'end_goal']
+    # The robot location is a prevail condition, the other two transitions are effects
+    assert lines[lines.index('begin_operator'):] == \
+        ['begin_operator', 'drop ball0 rooma left', '1', '6 0', '2', '0 1 3 1', '0 3 2 0', '1', 'end_operator', '0']
+
+    # Operators produced lazily are written the same way
+    stream = io.StringIO()
+    Writer(theory=L2, state_variables=X, domains=D, actions=(a for a in Act), initial=initial_state,
+           goal=goal_state).dump(stream)
+    assert stream.getvalue() == written_data
+
+    # Reading the instance back and writing it again results in the same instance
+    stream = io.StringIO()
+    Writer(**load(io.StringIO(written_data))).dump(stream)
+    assert stream.getvalue() == written_data
+
+
+FD_SAS_OUTPUT = """\
+begin_version
+3
+end_version
+begin_metric
+1
+end_metric
+2
+begin_variable
+var0
+-1
+2
+Atom at(a)
+Atom at(b)
+end_variable
+begin_variable
+var1
+-1
+2
+Atom visited(b)
+NegatedAtom visited(b)
+end_variable
+1
+begin_mutex_group
+2
+0 0
+0 1
+end_mutex_group
+begin_state
+0
+1
+end_state
+begin_goal
+1
+1 0
+end_goal
+2
+begin_operator
+move a b
+0
+2
+0 0 0 1
+0 1 -1 0
+5
+end_operator
+begin_operator
+move b a
+0
+1
+0 0 1 0
+5
+end_operator
+0
+"""
+
+
+@pytest.mark.sas
+def test_fd_sas_reader():
+    data = load(io.StringIO(FD_SAS_OUTPUT))
+    assert not data['unit_costs']
+    assert [str(x.expr) for x in data['state_variables']] == ['var0()', 'var1()']
+    assert [str(a.name) for a in data['actions']] == ['move', 'move']
+    assert [str(arg) for arg in data['actions'][0].arguments] == ['a', 'b']
+    assert [a.cost for a in data['actions']] == [5, 5]
+    assert len(data['mutexes']) == 1
+
+    x, v, w = data['actions'][0].transitions[1]
+    assert symref(x) == symref(data['state_variables'].get_object(1).expr)
+    assert v is None and str(w) == 'Atom visited(b)'
+
+    stream = io.StringIO()
+    Writer(**data).dump(stream)
+    assert stream.getvalue() == FD_SAS_OUTPUT
+
+    with pytest.raises(ParsingError):
+        load(io.StringIO(FD_SAS_OUTPUT.replace('begin_version\n3', 'begin_version\n4')))
+
+    with pytest.raises(ParsingError):  # Conditional effects are not supported
+        load(io.StringIO(FD_SAS_OUTPUT.replace('0 0 1 0', '1 1 0 0 1 0')))
+
+    with pytest.raises(ParsingError):  # Truncated file
+        load(io.StringIO(FD_SAS_OUTPUT[:100]))
\ No newline at end of file
@@ -1,14 +1,22 @@
 
+import os
+import subprocess
+import sys
+
 import pytest
+
+import tarski
 from tarski.errors import UndefinedSort, UndefinedPredicate
 from tarski.fstrips import AddEffect, FunctionalEffect
 from tarski.fstrips.errors import InvalidEffectError
-from tarski.io.fstrips import ParsingError, FstripsReader
+from tarski.io.fstrips import ParsingError, FstripsReader, FstripsWriter
+from tarski.io._fstrips.reader import UnsupportedLanguageFeature
 from tarski.syntax import Atom, CompoundFormula, Tautology
 from tarski.syntax.util import get_symbols
 from tarski.theories import Theory
 
 from tests.common.spider import generate_spider_language
+from tests.data import resolve_path
 from tests.io.common import reader, parse_benchmark_instance
 
 
@@ -321,3 +329,123 @@ def test_increase_effects():
     increase = output[1][0]
     assert isinstance(increase, FunctionalEffect) and isinstance(increase.condition, Tautology)
     assert str(increase.rhs) == '+(total-cost(), 1.0)'
+
+
+def _print_problem(problem):
+    writer = FstripsWriter(problem)
+    # Compare line sets, as the order in which e.g. init atoms are printed is not fixed
+    return sorted(writer.print_domain().splitlines()), sorted(writer.print_instance().splitlines())
+
+
+@pytest.mark.parametrize("domain, instance", [
+    ("grid/domain.pddl", "grid/grid3x3.pddl"),
+    ("ipc/visitall-sat11-strips/domain.pddl", "ipc/visitall-sat11-strips/problem12.pddl"),
+    ("ipc/flashfill-sat18/domain-p01.pddl", "ipc/flashfill-sat18/p01.pddl"),
+    ("issue114/domain.pddl", "issue114/problem.pddl"),
+])
+def test_fast_parser_matches_antlr_parser(domain, instance):
+    domain, instance = resolve_path(f'pddl/{domain}'), resolve_path(f'pddl/{instance}')
+    problems = [reader(strict_with_requirements=False, fast_parser=fast).read_problem(domain, instance)
+                for fast in (False, True)]
+    assert _print_problem(problems[0]) == _print_problem(problems[1])
+    assert str(problems[0].goal) == str(problems[1].goal)
+
+
+def test_fast_parser():
+    r = reader(fast_parser=True)
+    r.parse_domain_string("""
+    ; A comment
+    (define (domain Test)
+      (:requirements :strips :typing :equality)
+      (:types block table -object)
+      (:constants t1 - table)
+      (:predicates (on ?x - block ?y) (clear ?x))
+      (:action Move
+        :parameters (?x - block ?y)
+        :precondition (and (clear ?x) (not (= ?x ?y)) (exists (?z - block) (on ?x ?z)))
+        :effect (and (on ?x ?y) (not (clear ?y)) (forall (?z - block) (when (on ?z ?y) (not (on ?z ?y)))))))
+    """)
+    problem = r.parse_instance_string("""
+    (define (problem p1) (:domain Test)
+      (:objects b1 b2 - block)
+      (:init (on b1 B2) (clear b1) (not (clear b2)))
+      (:goal (and (on b2 b1))))
+    """)
+    assert problem.domain_name == 'Test' and problem.name == 'p1'
+    assert problem.language.get_sort('block').name == 'block'
+    action = problem.get_action('Move')
+    assert [str(p) for p in action.parameters] == ['?x', '?y']
+    assert str(action.precondition) == '(clear(?x) and (not =(?x,?y)) and exists ?z : (on(?x,?z)))'
+    assert len(action.effects) == 3
+    assert str(problem.goal) == 'on(b2,b1)'
+    on, b1, b2 = problem.language.get('on', 'b1', 'b2')
+    assert problem.init.holds(on, (b1, b2)) and not problem.init.holds(on, (b2, b1))
+
+    with pytest.raises(ParsingError):
+        reader(fast_parser=True).parse_domain_string("(define (domain test) (:predicates (p))")
+
+
+def test_fast_parser_fallback():
+    # Derived predicates are not supported by the fast parser, but they are detected before modifying the problem,
+    # and the file is processed by the ANTLR parser, which raises the same exception than without the fast parser
+    with pytest.raises(UnsupportedLanguageFeature):
+        reader(fast_parser=True).parse_domain(resolve_path('pddl/derived_predicates/min_cut/domain.pddl'))
+
+    with pytest.raises(UnsupportedLanguageFeature, match="either"):
+        reader(fast_parser=True).parse_domain_string("""
+        (define (domain test) (:types a b c - (either a b)) (:predicates (p ?x - c)))
+        """)
+
+
+def test_problem_cache(tmp_path, monkeypatch):
+    domain, instance = resolve_path('pddl/grid/domain.pddl'), resolve_path('pddl/grid/grid3x3.pddl')
+    cache_dir = tmp_path / 'cache'
+    expected = _print_problem(reader().read_problem(domain, instance))
+
+    problem = FstripsReader(cache_dir=cache_dir).read_problem(domain, instance)
+    assert _print_problem(problem) == expected
+    assert len(list(cache_dir.glob('*.pickle'))) == 2  # One for the domain, one for the whole problem
+
+    # Files with the same contents are not parsed again, regardless of their name
+    copy = tmp_path / 'copy.pddl'
+    copy.write_text(instance.read_text())
+    with monkeypatch.context() as m:
+        m.setattr(FstripsReader, 'parse_file', lambda *args: pytest.fail('Problem should be loaded from cache'))
+        problem = FstripsReader(cache_dir=cache_dir).read_problem(domain, copy)
+        assert _print_problem(problem) == expected
+        domain_only = FstripsReader(cache_dir=cache_dir)
+        domain_only.parse_domain(domain)
+
+    # A problem whose domain is cached can be parsed as usual
+    assert _print_problem(domain_only.parse_instance(instance)) == expected
+
+    # Different reader options lead to different cache entries
+    FstripsReader(cache_dir=cache_dir, case_insensitive=True).parse_domain(domain)
+    assert len(list(cache_dir.glob('*.pickle'))) == 3
+
+    with pytest.raises(ValueError):
+        FstripsReader(cache_dir=cache_dir, lang=generate_spider_language())
+
+
+CACHE_CHECK_SCRIPT = """
+import sys
+from tarski.io.fstrips import FstripsReader
+domain, instance, cache_dir = sys.argv[1:]
+cached = FstripsReader(cache_dir=cache_dir).read_problem(domain, instance)
+fresh = FstripsReader().read_problem(domain, instance)
+assert cached.init == fresh.init and hash(cached.init) == hash(fresh.init)
+atom = next(iter(fresh.init.as_atoms()))
+cached.init.discard(atom.predicate, *atom.subterms)
+fresh.init.discard(atom.predicate, *atom.subterms)
+assert cached.init == fresh.init and hash(cached.init) == hash(fresh.init)
+"""
+
+
+def test_problem_cache_across_processes(tmp_path):
+    # Cached problems are loaded correctly by processes other than the one that stored them, where strings (and hence
+    # models) hash differently
+    domain, instance = resolve_path('pddl/grid/domain.pddl'), resolve_path('pddl/grid/grid3x3.pddl')
+    for seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=os.path.dirname(os.path.dirname(tarski.__file__)))
+        subprocess.run([sys.executable, '-c', CACHE_CHECK_SCRIPT, str(domain), str(instance), str(tmp_path)],
+                       env=env, check=True)
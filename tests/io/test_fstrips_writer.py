@@ -1,3 +1,4 @@
+import io
 import tempfile
 from typing import Optional, List
 
@@ -7,6 +8,7 @@ from tarski.benchmarks.counters import get_counters_elements, generate_fstrips_c
 from tarski.fstrips import AddEffect, DelEffect, FunctionalEffect, UniversalEffect
 from tarski.io import FstripsWriter
 from tarski.io._fstrips.common import get_requirements_string
+from tarski.io.common import write_tpl
 from tarski.io.fstrips import print_effects, print_effect, print_objects, print_metric, print_formula, print_term
 from tarski.syntax import forall, exists, Constant
 from tarski.theories import Theory
@@ -133,6 +135,31 @@ def test_blocksworld_writing_with_different_constants():
     )""" in instance_model_string
 
 
+def test_streaming_writing():
+    problem, _, _, _, table = get_bw_elements()
+    writer = FstripsWriter(problem)
+    domf, instf = write_problem(problem, domain_constants=[table])
+    with open(domf.name, encoding='utf8') as file:
+        assert file.read() == writer.print_domain([table])
+    with open(instf.name, encoding='utf8') as file:
+        assert file.read() == writer.print_instance([table])
+
+    class RecordingStream(io.StringIO):
+        def __init__(self):
+            super().__init__()
+            self.writes = 0
+
+        def write(self, s):
+            self.writes += 1
+            return super().write(s)
+
+    # Fields can be strings or iterables of strings, written in chunks of about `buffer_size` characters
+    stream = RecordingStream()
+    write_tpl(stream, "({a} {{b}}\n{c})", dict(a="x", c=(str(i) for i in range(1000))), buffer_size=100)
+    assert stream.getvalue() == "(x {b}\n" + "".join(str(i) for i in range(1000)) + ")"
+    assert 20 < stream.writes < 40
+
+
 def test_requirements_string():
     problem = parcprinter.create_small_task()
 
@@ -0,0 +1,68 @@
+import pytest
+
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.grounding import LPGroundingStrategy
+from tarski.reachability import create_reachability_lp, run_clingo_in_process, clingo_module_available, \
+    DatalogEngine, run_datalog
+from tarski.reachability.asp import LogicProgram, GOAL
+from tarski.reachability.datalog import parse_lp_rule
+
+from ..common.gripper import create_sample_problem
+
+
+def test_lp_rule_parsing():
+    head, body = parse_lp_rule("action_move(X, Y) :- type_object(X), atom_on(X, b1), X != Y, 1 = 1.")
+    assert head.symbol == "action_move" and head.args == ["X", "Y"]
+    assert [str(b) for b in body] == ["type_object(X)", "atom_on(X, b1)", "X != Y", "1 = 1"]
+    assert body[2].infix and body[2].symbol == "!="
+
+    head, body = parse_lp_rule("goal().")
+    assert head.symbol == "goal" and head.args == [] and body == []
+
+    # Negation, directives and other non-Datalog literals are rejected rather than read as plain atoms
+    for rule in ("p(X) :- q(X), not r(X).", "p(X) :- q(X), not r.", "#show p/1.", "p(X) :- q(X), #count{Y: r(Y)} > 1.",
+                 "p(X) :- q(X), r(X;Y).", "p(X) :- q(X), X != @f(X)."):
+        with pytest.raises(RuntimeError):
+            parse_lp_rule(rule)
+
+
+def test_datalog_engine():
+    lp = LogicProgram()
+    for rule in ["edge(a, b).", "edge(b, c).", "edge(c, d).", "edge(d, d).",
+                 "path(X, Y) :- edge(X, Y).",
+                 "path(X, Z) :- path(X, Y), edge(Y, Z).",
+                 "strict(X, Y) :- path(X, Y), X != Y.",
+                 "loop(X) :- path(X, X).",
+                 "goal() :- path(a, d), 1 = 1."]:
+        lp.rules.append(rule)
+
+    model = DatalogEngine(lp).solve()
+    assert len(model["path"]) == 4 + 2 + 1  # 4 edges, plus paths a-c, b-d (length 2) and a-d (length 3)
+    assert ("a", "d") in model["strict"] and ("d", "d") not in model["strict"]
+    assert model["loop"] == {("d", )}
+    assert model["goal"] == {()}
+
+    # Facts are derived lazily
+    facts = DatalogEngine(lp).facts()
+    assert next(facts) == ("edge", ("a", "b"))
+
+
+@pytest.mark.skipif(not clingo_module_available(), reason="requires the clingo Python bindings")
+def test_datalog_engine_matches_clingo():
+    for problem in [create_sample_problem(), generate_strips_blocksworld_problem(nblocks=5)]:
+        for ground_actions in (True, False):
+            for inequalities in (True, False):
+                lp, tr = create_reachability_lp(problem, ground_actions, inequalities)
+                model = run_datalog(lp, tr)
+                assert model == run_clingo_in_process(lp, tr) and len(model[GOAL]) == 1
+
+
+def test_datalog_grounding_backend():
+    problem = generate_strips_blocksworld_problem(nblocks=4)
+    grounding = LPGroundingStrategy(problem, backend='datalog')
+    actions = grounding.ground_actions()
+    assert len(actions['pick-up']) == 4 and len(actions['stack']) == 12
+    assert len(grounding.ground_state_variables()) == 4 + 4 + 4 + 12 + 1  # holding, ontable, clear, on, handempty
+
+    with pytest.raises(ValueError):
+        LPGroundingStrategy(problem, backend='unknown')
@@ -1,5 +1,15 @@
 
-from tarski.reachability.asp import create_reachability_lp, LogicProgram, ReachabilityLPCompiler, LPAtom
+import os
+import subprocess
+import sys
+
+import pytest
+
+import tarski
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.reachability import run_clingo, run_clingo_in_process, parse_model, clingo_module_available
+from tarski.reachability.asp import create_reachability_lp, LogicProgram, ReachabilityLPCompiler, LPAtom, GOAL
+from tarski.utils.command import silentremove
 from tarski.syntax import exists
 from tarski import fstrips as fs
 from tests.io.common import parse_benchmark_instance
@@ -75,3 +85,25 @@ def test_lp_translation():
     assert lp.rules == [
         'action_gripper(G) :- type_object(G), atom_gripper(G).',
         'atom_gripper(G) :- action_gripper(G).']
+
+
+@pytest.mark.skipif(not clingo_module_available(), reason="requires the clingo Python bindings")
+def test_in_process_grounding_matches_gringo_output():
+    problem = generate_strips_blocksworld_problem(nblocks=4)
+    lp, tr = create_reachability_lp(problem, ground_actions=True, include_variable_inequalities=True)
+
+    model_filename, theory_filename = run_clingo(lp)
+    expected = parse_model(filename=model_filename, symbol_mapping=tr)
+    silentremove(model_filename)
+    silentremove(theory_filename)
+
+    model = run_clingo_in_process(lp, tr)
+    assert model == expected and len(model[GOAL]) == 1
+
+
+@pytest.mark.parametrize("statement", ["from tarski.reachability import create_reachability_lp",
+                                       "import tarski.reachability.asp"])
+def test_reachability_imports_in_fresh_interpreter(statement):
+    # Importing the reachability modules before any other module must not run into circular imports
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(tarski.__file__)))
+    subprocess.run([sys.executable, '-c', statement], env=env, check=True)
@@ -0,0 +1,99 @@
+"""
+ Tests for the heuristic search engines
+"""
+import pytest
+
+from tarski import fstrips as fs
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
+from tarski.search import GroundForwardSearchModel, BreadthFirstSearch, AStarSearch, GreedyBestFirstSearch, \
+    WeightedAStarSearch, create_state_layout
+from tarski.search.bestfirst import BucketOpenList
+from tarski.search.operations import is_applicable, progress
+from tarski.syntax.transform.action_grounding import ground_schema_into_plain_operator_from_grounding
+from tarski.theories import Theory
+
+
+# A fixed instance that reverses a tower of three blocks on top of a fourth one, with optimal plans of length 6
+BW_INIT = [('b1', 'table'), ('b2', 'b1'), ('b3', 'b2'), ('b4', 'table')]
+BW_GOAL = [('b1', 'b2'), ('b2', 'b3'), ('b3', 'b4'), ('b4', 'table')]
+
+
+def validate_plan(model, plan):
+    state = model.init()
+    for op in plan:
+        assert is_applicable(state, op)
+        state = progress(state, op)
+    return model.is_goal(state)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_astar_finds_optimal_plans(packed):
+    problem = generate_strips_blocksworld_problem(nblocks=4, init=BW_INIT, goal=BW_GOAL)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+    layout = create_state_layout(problem, operators) if packed else None
+    model = GroundForwardSearchModel(problem, operators, layout)
+
+    bfs_space, _ = BreadthFirstSearch(model).run()
+    assert len(bfs_space.plan) == 6 and validate_plan(model, bfs_space.plan)
+
+    for open_list in ('heap', 'bucket'):
+        space, stats = AStarSearch(model, open_list=open_list).run()
+        assert validate_plan(model, space.plan)
+        assert len(space.plan) == len(bfs_space.plan)
+        assert stats.nexpansions > 0 and stats.peak_open > 0 and stats.expansions_per_second() >= 0
+
+
+def test_suboptimal_search_engines():
+    problem = generate_strips_blocksworld_problem(nblocks=4, init=BW_INIT, goal=BW_GOAL)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+    model = GroundForwardSearchModel(problem, operators, create_state_layout(problem, operators))
+
+    def goal_count(state):
+        return sum(1 for atom in problem.goal.subformulas if not state.holds(atom.predicate, atom.subterms))
+
+    for engine in (GreedyBestFirstSearch(model, goal_count), WeightedAStarSearch(model, goal_count, weight=3)):
+        space, _ = engine.run()
+        assert validate_plan(model, space.plan)
+
+    # A heuristic that recognizes every state as a dead end prunes the whole search space
+    space, stats = AStarSearch(model, lambda s: None).run()
+    assert space.plan is None and space.complete and stats.nexpansions == 0
+
+
+def test_astar_with_action_costs():
+    lang = fs.language('costs', theories=[Theory.EQUALITY, Theory.ARITHMETIC])
+    p, q, r = [lang.predicate(name) for name in 'pqr']
+    problem = fs.create_fstrips_problem(lang, problem_name='costs', domain_name='costs')
+    problem.init.add(p)
+    problem.goal = q()
+
+    def cost(value):
+        return fs.action.AdditiveActionCost(lang.constant(value, lang.Integer))
+
+    problem.action('direct', [], p(), [fs.AddEffect(q())], cost(5))
+    problem.action('first', [], p(), [fs.AddEffect(r())], cost(1))
+    problem.action('second', [], r(), [fs.AddEffect(q())], cost(1))
+    operators = [ground_schema_into_plain_operator_from_grounding(a, ()) for a in problem.actions.values()]
+    model = GroundForwardSearchModel(problem, operators)
+    assert [model.cost(op) for op in operators] == [5, 1, 1]
+
+    # Costs of throwaway operators must not be served to later operators that happen to reuse their memory address
+    for value in range(2, 10):
+        assert model.cost(fs.action.PlainOperator(lang, 'throwaway', p(), [], cost(value))) == value
+
+    space, _ = BreadthFirstSearch(model).run()
+    assert [op.name for op in space.plan] == ['direct()']
+
+    space, _ = AStarSearch(model).run()
+    assert [op.name for op in space.plan] == ['first()', 'second()']
+
+
+def test_bucket_open_list():
+    openlist = BucketOpenList()
+    for priority, node in [((3, 0), 'a'), ((1, 1), 'b'), ((3, 1), 'c'), ((1, 0), 'd')]:
+        openlist.push(priority, node)
+    assert [openlist.pop() for _ in range(len(openlist))] == ['b', 'd', 'a', 'c']
+
+    with pytest.raises(ValueError):
+        openlist.push(0.5, 'e')
@@ -0,0 +1,54 @@
+"""
+ Tests for the compilation of ground operators into atom indexes
+"""
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.fstrips import AddEffect, DelEffect
+from tarski.fstrips.action import PlainOperator
+from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
+from tarski.search import GroundForwardSearchModel, BreadthFirstSearch, PackedState, create_state_layout, \
+    CompiledOperator, compile_operator, compile_operators
+from tarski.search.compilation import InterpretedOperator
+from tarski.search.operations import is_applicable, progress
+from tarski.syntax import land, neg, lor
+
+
+def test_strips_operator_compilation():
+    problem = generate_strips_blocksworld_problem(nblocks=3)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+    layout = create_state_layout(problem, operators)
+    compiled = compile_operators(operators, layout)
+    assert all(isinstance(c, CompiledOperator) for c in compiled)
+
+    s0 = PackedState.from_model(problem.init, layout)
+    for c in compiled:
+        assert c.is_applicable(s0) == is_applicable(s0, c.operator)
+        if c.is_applicable(s0):
+            assert c.progress(s0) == progress(s0, c.operator)
+
+
+def test_conditional_and_negative_operator_compilation():
+    problem = generate_strips_blocksworld_problem(nblocks=2)
+    lang = problem.language
+    clear, ontable, holding, handempty = lang.get('clear', 'ontable', 'holding', 'handempty')
+    b1, b2 = lang.get('b1', 'b2')
+
+    op = PlainOperator(lang, 'weird', land(clear(b1), neg(holding(b2))),
+                       [DelEffect(clear(b1)), AddEffect(holding(b1), ontable(b1)), DelEffect(handempty(), clear(b2))])
+    operators = ground_problem_schemas_into_plain_operators(problem) + [op]
+    layout = create_state_layout(problem, operators)
+    compiled = compile_operator(op, layout)
+    assert isinstance(compiled, CompiledOperator)
+    assert len(compiled.pre) == 1 and len(compiled.neg) == 1 and len(compiled.conditional) == 2
+
+    s0 = PackedState.from_model(problem.init, layout)
+    assert compiled.is_applicable(s0) == is_applicable(s0, op)
+    assert compiled.progress(s0) == progress(s0, op)
+
+    # Disjunctive preconditions cannot be compiled, but are still supported by the search model
+    disjunctive = PlainOperator(lang, 'disj', lor(clear(b1), clear(b2)), [DelEffect(clear(b1))])
+    assert compile_operator(disjunctive, layout) is None
+    assert isinstance(compile_operators([disjunctive], layout)[0], InterpretedOperator)
+
+    model = GroundForwardSearchModel(problem, operators + [disjunctive], layout)
+    _, stats = BreadthFirstSearch(model).run()
+    assert stats.nexpansions > 0
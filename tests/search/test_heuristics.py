@@ -0,0 +1,57 @@
+"""
+ Tests for the delete-relaxation heuristics
+"""
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
+from tarski.search import GroundForwardSearchModel, BreadthFirstSearch, AStarSearch, GreedyBestFirstSearch, \
+    create_state_layout, HMaxHeuristic, HAddHeuristic, HFFHeuristic
+from tarski.search.operations import is_applicable, progress
+
+
+# A fixed instance that reverses a tower of three blocks on top of a fourth one, with optimal plans of length 6
+BW_INIT = [('b1', 'table'), ('b2', 'b1'), ('b3', 'b2'), ('b4', 'table')]
+BW_GOAL = [('b1', 'b2'), ('b2', 'b3'), ('b3', 'b4'), ('b4', 'table')]
+
+
+def create_model():
+    problem = generate_strips_blocksworld_problem(nblocks=4, init=BW_INIT, goal=BW_GOAL)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+    return GroundForwardSearchModel(problem, operators, create_state_layout(problem, operators))
+
+
+def test_relaxation_heuristics_on_initial_state():
+    model = create_model()
+    hmax, hadd, hff = HMaxHeuristic(model), HAddHeuristic(model), HFFHeuristic(model)
+    s0 = model.init()
+
+    space, _ = BreadthFirstSearch(model).run()
+    optimal = len(space.plan)
+    assert optimal == 6
+
+    assert 0 < hmax(s0) <= optimal
+    assert hmax(s0) <= hff(s0) <= hadd(s0)
+
+    # The heuristics can also be evaluated on standard models
+    assert hadd(model.problem.init) == hadd(s0)
+
+    # The relaxed plan is a valid plan in the delete relaxation
+    relaxed_plan = hff.relaxed_plan(s0)
+    assert len(relaxed_plan) == hff(s0)
+
+    # All heuristics are 0 on goal states
+    state = s0
+    for op in space.plan:
+        assert is_applicable(state, op)
+        state = progress(state, op)
+    assert hmax(state) == hadd(state) == hff(state) == 0
+
+
+def test_search_with_relaxation_heuristics():
+    model = create_model()
+    blind_space, blind_stats = AStarSearch(model).run()
+    space, stats = AStarSearch(model, HMaxHeuristic(model)).run()
+    assert len(space.plan) == len(blind_space.plan)
+    assert stats.nexpansions <= blind_stats.nexpansions
+
+    space, _ = GreedyBestFirstSearch(model, HFFHeuristic(model)).run()
+    assert space.plan is not None
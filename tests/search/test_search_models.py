@@ -3,8 +3,9 @@
 """
 from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
 from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
-from tarski.search import GroundForwardSearchModel, BreadthFirstSearch
+from tarski.search import GroundForwardSearchModel, BreadthFirstSearch, PackedState, create_state_layout
 from tarski.search.model import progress
+from tarski.search.operations import is_applicable
 from tarski.syntax.transform.action_grounding import ground_schema_into_plain_operator_from_grounding
 from tarski.utils import parse_model
 from tests.io.common import parse_benchmark_instance
@@ -56,5 +57,21 @@ def test_basic_search():
     assert stats.nexpansions == 3
 
 
+def test_packed_state_search():
+    problem = generate_strips_blocksworld_problem(nblocks=3)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+    layout = create_state_layout(problem, operators)
 
+    s0 = PackedState.from_model(problem.init, layout)
+    assert s0.to_model() == problem.init
+    assert PackedState.from_model(s0.to_model(), layout) == s0
 
+    # Progressing packed states must be equivalent to progressing standard models
+    for op in operators:
+        if is_applicable(s0, op):
+            assert progress(s0, op).to_model() == progress(problem.init, op)
+            assert hash(progress(s0, op)) == hash(PackedState.from_model(progress(problem.init, op), layout))
+
+    _, stats = BreadthFirstSearch(GroundForwardSearchModel(problem, operators)).run()
+    _, packed_stats = BreadthFirstSearch(GroundForwardSearchModel(problem, operators, layout)).run()
+    assert stats.nexpansions == packed_stats.nexpansions == 22
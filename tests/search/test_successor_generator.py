@@ -0,0 +1,31 @@
+"""
+ Tests for the decision-tree successor generator
+"""
+from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
+from tarski.search import GroundForwardSearchModel, BreadthFirstSearch, create_state_layout, \
+    create_successor_generator
+
+
+def test_successor_generator_matches_linear_scan():
+    problem = generate_strips_blocksworld_problem(nblocks=4)
+    operators = ground_problem_schemas_into_plain_operators(problem)
+    layout = create_state_layout(problem, operators)
+    generator = create_successor_generator(operators, layout)
+    assert generator.count_nodes() > 1
+
+    # Collect all reachable states through an exhaustive search and compare the applicable operators on each of them
+    model = GroundForwardSearchModel(problem, operators, layout)
+    states, frontier = {model.init()}, [model.init()]
+    while frontier:
+        state = frontier.pop()
+        expected = set(c.operator.name for c in generator.operators if c.is_applicable(state))
+        assert set(c.operator.name for c in generator.applicable(state)) == expected
+        for _, succ in model.successors(state):
+            if succ not in states:
+                states.add(succ)
+                frontier.append(succ)
+
+    assert len(states) == 125
+    _, stats = BreadthFirstSearch(model).run()
+    assert stats.nexpansions == 125
@@ -1,5 +1,10 @@
 
+import itertools
+
+import pytest
+
 from tarski.utils import resources
+from tarski.utils.iterators import prefetch
 
 
 def test_timer_class():
@@ -11,3 +16,24 @@ def test_timer_class():
     with resources.timing("\tHello world", newline=True):
         x += 1
     assert x == 2
+
+
+def test_prefetch():
+    assert list(prefetch(range(100), size=3)) == list(range(100))
+
+    def failing():
+        yield 1
+        raise RuntimeError("failure")
+
+    it = prefetch(failing(), size=2)
+    assert next(it) == 1
+    with pytest.raises(RuntimeError):
+        next(it)
+
+    with pytest.raises(ValueError):
+        prefetch(range(10), size=0)
+
+    # The consumer can stop at any point
+    it = prefetch(itertools.count(), size=2)
+    assert next(it) == 0 and next(it) == 1
+    it.close()
@@ -1,3 +1,6 @@
+import io
+import itertools
+
 import pytest
 
 import tarski.benchmarks.blocksworld
@@ -12,6 +15,10 @@ from tarski.syntax.transform import CNFTransformation, QuantifierElimination, re
     QuantifierEliminationMode
 from tarski.syntax.transform import NegatedBuiltinAbsorption
 from tarski.syntax.transform.errors import TransformationError
+from tarski.syntax.transform.quantifier_elimination import iterate_instantiations
+from tarski.syntax.ops import flatten
+from tarski.evaluators import StaticLayout
+from tarski.model import Model
 
 
 def test_nnf_conjunction():
@@ -155,6 +162,44 @@ def test_existential_elimination2():
     assert is_quantifier_free(result)
 
 
+def test_static_aware_quantifier_elimination():
+    lang, x, y = create_small_world_elements(3)
+    obj1, obj2, obj3 = lang.get("obj1", "obj2", "obj3")
+    static = Model(lang)
+    static.add(lang.LeftOf, obj1, obj2)
+    static.add(lang.LeftOf, obj2, obj3)
+    static.add(lang.Cube, obj3)
+    layout = StaticLayout(static, {lang.LeftOf, lang.Cube})
+
+    # Only instantiations where the static conjuncts hold are generated, without the static conjuncts
+    phi = exists(x, y, land(lang.LeftOf(x, y), lang.BackOf(x, y), neg(lang.Cube(y))))
+    assert len(list(iterate_instantiations(phi))) == 9
+    assert [str(f) for f in iterate_instantiations(phi, layout)] == ['BackOf(obj1,obj2)']
+
+    # Dually, for universal formulas, instantiations where some static disjunct holds are discarded
+    phi = forall(x, y, implies(lang.LeftOf(x, y), lang.BackOf(x, y)))
+    assert len(list(iterate_instantiations(phi))) == 9
+    result = remove_quantifiers(lang, phi, QuantifierEliminationMode.All, layout=layout)
+    assert _parts(result) == {'BackOf(obj1,obj2)', 'BackOf(obj2,obj3)'}
+
+    # Static literals can decide the whole formula, and guards on variables bound later are checked later
+    assert remove_quantifiers(lang, exists(x, lang.LeftOf(x, x)), QuantifierEliminationMode.All, layout=layout) == bot
+    result = remove_quantifiers(lang, forall(x, lor(lang.Cube(x), lang.Dodec(x))), QuantifierEliminationMode.All,
+                                layout=layout)
+    assert _parts(result) == {'Dodec(obj1)', 'Dodec(obj2)'}
+    phi = exists(x, forall(y, lor(lang.LeftOf(y, x), lang.Dodec(y), x == y)))
+    result = remove_quantifiers(lang, phi, QuantifierEliminationMode.All, layout=layout)
+    disjuncts = {frozenset(_parts(sub)) for sub in flatten(result).subformulas}
+    assert disjuncts == {frozenset({'Dodec(obj2)', 'Dodec(obj3)'}), frozenset({'Dodec(obj3)'}),
+                         frozenset({'Dodec(obj1)'})}
+
+
+def _parts(phi):
+    """ The string representation of the operands of the given (flattened) conjunction or disjunction. """
+    phi = flatten(phi)
+    return {str(sub) for sub in phi.subformulas} if isinstance(phi, CompoundFormula) else {str(phi)}
+
+
 def test_builtin_negation_absorption():
     bw = tarski.benchmarks.blocksworld.generate_fstrips_bw_language()
     block = bw.get_sort('block')
@@ -204,3 +249,67 @@ def test_cnf_conversion_complex():
     # Now remove the quantifiers after tranforming to PNNF
     result = remove_quantifiers(lang, to_prenex_negation_normal_form(lang, phi), QuantifierEliminationMode.All)
     assert len(to_conjunctive_normal_form_clauses(lang, result)) == 126
+
+
+def test_transformations_share_unmodified_subformulas():
+    lang, x, y = create_small_world_elements(2)
+    obj1 = lang.get('obj1')
+
+    untouched = land(lang.Cube(obj1), lang.Tet(obj1))
+    phi = land(untouched, neg(lor(lang.Dodec(obj1), lang.Tet(obj1))))
+    text = str(phi)
+    nnf = NNFTransformation.rewrite(phi).nnf
+    assert str(nnf) == str(land(untouched, land(neg(lang.Dodec(obj1)), neg(lang.Tet(obj1)))))
+    assert nnf.subformulas[0] is untouched and str(phi) == text
+
+    # Formulas that need no rewriting at all are returned as they are
+    assert NNFTransformation.rewrite(untouched).nnf is untouched
+    assert CNFTransformation.rewrite(lang, untouched).cnf is untouched
+
+    phi = land(untouched, forall(x, lor(lang.Cube(x), exists(y, lang.LeftOf(x, y)))))
+    text = str(phi)
+    expanded = remove_quantifiers(lang, phi, QuantifierEliminationMode.Exists)
+    assert expanded.subformulas[0] is untouched and str(phi) == text
+    prenex = to_prenex_negation_normal_form(lang, phi)
+    assert isinstance(prenex, QuantifiedFormula) and prenex.formula.subformulas[0] is untouched
+    assert str(phi) == text
+
+
+def _is_satisfiable(dimacs, assumptions=()):
+    """ Check by brute force whether the given DimacsCNF and unit clauses are satisfiable. """
+    clauses = dimacs.clauses + [[lit] for lit in assumptions]
+    for values in itertools.product((False, True), repeat=dimacs.num_variables):
+        if all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses):
+            return True
+    return False
+
+
+def test_tseitin_cnf_conversion():
+    tw = tarskiworld.create_small_world()
+    obj1, obj2 = tw.constant('obj1', tw.Object), tw.constant('obj2', tw.Object)
+    cube1, cube2, tet1, tet2 = tw.Cube(obj1), tw.Cube(obj2), tw.Tet(obj1), tw.Tet(obj2)
+
+    # A DNF formula, whose CNF obtained by distribution is exponentially larger
+    phi = lor(land(cube1, neg(tet2)), land(cube2, neg(tet1)), land(tet1, tet2), flat=True)
+    dimacs = CNFTransformation(tw, phi, tseitin=True).convert_to_dimacs()
+    assert dimacs.num_variables == 4 + 3 and len(dimacs.clauses) == 1 + 3 * 2
+    assert [str(a) for a in dimacs.atoms] == ['None', 'Cube(obj1)', 'Tet(obj2)', 'None', 'Cube(obj2)', 'Tet(obj1)',
+                                              'None']
+    assert dimacs.clauses[-1] == [1, 4, 7]
+
+    # The encoding is equisatisfiable with the original formula, under any assignment to the original atoms
+    expected = CNFTransformation(tw, phi).convert_to_dimacs()
+    for values in itertools.product((False, True), repeat=4):
+        assignment = dict(zip([cube1, cube2, tet1, tet2], values))
+        assumptions = [dimacs.variables[symref(a)] * (1 if v else -1) for a, v in assignment.items()]
+        expected_assumptions = [expected.variables[symref(a)] * (1 if v else -1) for a, v in assignment.items()]
+        assert _is_satisfiable(dimacs, assumptions) == _is_satisfiable(expected, expected_assumptions)
+
+    # In terms of formulas, auxiliary variables are atoms of fresh nullary predicates
+    clauses = to_conjunctive_normal_form_clauses(tw, phi, tseitin=True)
+    assert len(clauses) == 7 and [str(c) for c in clauses[-1]] == ['_tseitin0()', '_tseitin1()', '_tseitin2()']
+    assert tw.has_predicate('_tseitin2') and not tw.has_predicate('_tseitin3')
+
+    output = io.StringIO()
+    dimacs.dump(output)
+    assert output.getvalue().splitlines()[:2] == ['p cnf 7 7', '-1 2 0']